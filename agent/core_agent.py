@@ -1,18 +1,55 @@
 import csv
 import logging
 import os
+import sys
+import uuid
 from datetime import datetime
 from typing import Optional
 
 import trino
+
 from agent.gaid_agent import GaidAgent
 from agent.sql_agent import SqlAgent
 from config.logger_config import setup_logger
 from config.config import TRINO_CONFIG
 
+# trino-mcp不是python包，追加到搜索路径末尾以复用其中的连接池等模块
+TRINO_MCP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trino-mcp")
+if TRINO_MCP_DIR not in sys.path:
+    sys.path.append(TRINO_MCP_DIR)
+from admission import AdmissionController  # noqa: E402
+from coordinator_router import CoordinatorRouter, parse_coordinators  # noqa: E402
+from query_stats import QueryStatsRecorder  # noqa: E402
+
 setup_logger()
 logger = logging.getLogger(__name__)
 
+# 进程内共享的Trino连接池（每个集群一个），API每个请求都会新建CoreAgent，连接在请求之间复用；
+# 配置了多个集群时按健康状态和排队查询数选择集群
+trino_router = CoordinatorRouter(
+    parse_coordinators(TRINO_CONFIG['TRINO_COORDINATORS'], int(TRINO_CONFIG['TRINO_PORT']))
+    or [(TRINO_CONFIG['TRINO_HOST'], int(TRINO_CONFIG['TRINO_PORT']))],
+    {
+        "user": TRINO_CONFIG['TRINO_USER'],
+        "catalog": 'hive',
+        "schema": 'default',
+    },
+    pool_size=int(TRINO_CONFIG['TRINO_POOL_SIZE']),
+)
+
+# 进程内共享的准入控制：限制同时在Trino上执行的查询数，按排队时间和耗时以AIMD方式调整上限，
+# 突发请求在客户端按先后顺序等待，而不是同时挤进Trino的队列
+admission = AdmissionController(
+    int(TRINO_CONFIG['TRINO_ADMISSION_MAX_LIMIT'] or TRINO_CONFIG['TRINO_POOL_SIZE']),
+    target_queue_ms=float(TRINO_CONFIG['TRINO_ADMISSION_TARGET_QUEUE_MS']),
+)
+
+# 每次从Trino拉取的行数
+FETCH_BATCH_SIZE = 10000
+
+# 进程内最近查询的运行统计（耗时、CPU、扫描量、峰值内存），由API的/metrics接口输出
+query_stats = QueryStatsRecorder()
+
 class CoreAgent:
     """核心代理类，协调GAID代理和SQL代理完成数据分析工作流"""
     
@@ -24,10 +61,23 @@ class CoreAgent:
             sql_agent: SQL处理代理实例，如果为None则创建新实例
         """
         logger.info("初始化CoreAgent")
-        
+
+        # 整个工作流固定在同一个集群：GAID临时表的创建和之后的关联查询必须在同一集群执行
+        self.routing_key = uuid.uuid4().hex
+        host, port = trino_router.route(self.routing_key).rsplit(":", 1)
+        # 使用共享MCP服务时，路由键和选定的集群随请求头传给服务端
+        self.trino_config = {
+            **TRINO_CONFIG,
+            "TRINO_HOST": host,
+            "TRINO_PORT": port,
+            "TRINO_COORDINATORS": "",
+            "TRINO_ROUTING_KEY": self.routing_key,
+        }
+        logger.info(f"工作流使用Trino集群: {host}:{port}")
+
         try:
-            self.gaid_agent = gaid_agent if gaid_agent is not None else GaidAgent()
-            self.sql_agent = sql_agent if sql_agent is not None else SqlAgent()
+            self.gaid_agent = gaid_agent if gaid_agent is not None else GaidAgent(trino_config=self.trino_config)
+            self.sql_agent = sql_agent if sql_agent is not None else SqlAgent(trino_config=self.trino_config)
             logger.info("CoreAgent初始化成功")
         except Exception as e:
             logger.error(f"CoreAgent初始化失败: {e}")
@@ -81,36 +131,31 @@ class CoreAgent:
         if not sql.startswith("SELECT"):
             return "错误：SQL语句必须以SELECT开头"
         
-        conn = None
-        cursor = None
         try:
-            logger.info("开始连接Trino数据库")
-            
-            conn = trino.dbapi.connect(
-                host=TRINO_CONFIG['TRINO_HOST'],
-                port=int(TRINO_CONFIG['TRINO_PORT']),
-                user=TRINO_CONFIG['TRINO_USER'],
-                catalog='hive',
-                schema='default'
-            )
-            
-            cursor = conn.cursor()
-            logger.debug(f"执行SQL: {sql}")
-            
-            cursor.execute(sql)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            
-            # 保存为CSV文件
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            csv_filename = f"output/query_result_{timestamp}.csv"
+            logger.info("从连接池获取Trino连接")
             
-            with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(columns)  # 写入列名
-                writer.writerows(results)  # 写入数据
+            with admission.slot() as ticket:
+                _, pool = trino_router.pool(self.routing_key)
+                with pool.connection() as conn:
+                    cursor = conn.cursor()
+                    logger.debug(f"执行SQL: {sql}")
+
+                    # 保存为CSV文件
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    csv_filename = f"output/query_result_{timestamp}.csv"
+
+                    error_name = None
+                    try:
+                        cursor.execute(sql)
+                        rows = self._write_csv(cursor, csv_filename)
+                    except trino.exceptions.TrinoQueryError as e:
+                        error_name = e.error_name
+                        raise
+                    finally:
+                        query_stats.record(cursor.stats, {"tool": "execute_sql", "agent": "core_agent"})
+                        ticket.record(cursor.stats, error_name)
             
-            logger.info(f"SQL执行完成，结果已保存到: {csv_filename}")
+            logger.info(f"SQL执行完成，共{rows}行，结果已保存到: {csv_filename}")
 
             
             return os.path.abspath(csv_filename)
@@ -119,11 +164,30 @@ class CoreAgent:
             error_msg = f"SQL执行失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return f"错误：{error_msg}"
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()            
+
+    @staticmethod
+    def _write_csv(cursor, csv_filename: str) -> int:
+        """边拉取边写入CSV文件，内存中最多保留一批结果
+
+        值按Trino客户端返回的原样写入，格式与一次性fetchall后写入时相同：CRLF换行，
+        带时区的时间戳保留原来的时区。写入失败时删除不完整的文件。
+
+        Returns:
+            int: 写入的行数
+        """
+        os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
+        rows = 0
+        try:
+            with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow([desc[0] for desc in cursor.description])  # 写入列名
+                for batch in iter(lambda: cursor.fetchmany(FETCH_BATCH_SIZE), []):
+                    writer.writerows(batch)  # 写入数据
+                    rows += len(batch)
+        except BaseException:
+            os.remove(csv_filename)
+            raise
+        return rows
 
     def run(self,user_input) ->str:
         sql = self.process_workflow(user_input)
@@ -4,15 +4,14 @@ import os
 os.environ["AWS_REGION"] = "ap-southeast-1"
 
 from strands import Agent
-from mcp import StdioServerParameters, stdio_client
 from strands.handlers.callback_handler import PrintingCallbackHandler
 from strands.models import BedrockModel
-from strands.tools.mcp import MCPClient
 from strands_tools import file_read, file_write, shell, use_aws, python_repl
 from config.logger_config import setup_logger
 from config.config import TRINO_CONFIG
 from config.config import model
 from handler.handler import AgentHandler
+from agent.mcp_client import create_trino_mcp_client
 
 setup_logger()
 logger = logging.getLogger(__name__)
@@ -42,14 +41,16 @@ class GaidAgent:
     根据数据量大小决定返回列表或创建临时表
     """
     
-    def __init__(self, sys_prompt: Optional[str] = None):
+    def __init__(self, sys_prompt: Optional[str] = None, trino_config: Optional[dict] = None):
         """初始化GAID代理
         
         Args:
             sys_prompt: 系统提示词，默认使用内置提示词
+            trino_config: Trino连接配置，默认使用TRINO_CONFIG；CoreAgent用它把工作流固定到选定的集群
         """
+        self.trino_config = trino_config if trino_config is not None else TRINO_CONFIG
         self.sys_prompt = sys_prompt if sys_prompt is not None else SYSTEM_PROMPT
-        self.sys_prompt = self.sys_prompt.format(**TRINO_CONFIG)
+        self.sys_prompt = self.sys_prompt.format(**self.trino_config)
         self.server = None
         logger.info("初始化GaidAgent")
 
@@ -65,17 +66,8 @@ class GaidAgent:
     def _initialize_mcp_server(self):
         """初始化MCP服务器连接"""
         try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            mcp_server_file = os.path.join(
-                os.path.dirname(base_dir), "trino-mcp/server.py")
-            params = StdioServerParameters(
-                command="python",
-                args=[mcp_server_file],
-                env=TRINO_CONFIG
-            )
-
-            # 创建MCP客户端
-            self.server = MCPClient(lambda: stdio_client(params))
+            # 创建MCP客户端：连接共享MCP服务，或启动stdio子进程
+            self.server = create_trino_mcp_client(self.trino_config, "gaid_agent")
             self.server.start()
             logger.debug("MCP服务器连接成功")
 
@@ -0,0 +1,46 @@
+import logging
+import os
+
+from mcp import StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from strands.tools.mcp import MCPClient
+
+logger = logging.getLogger(__name__)
+
+MCP_SERVER_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trino-mcp/server.py")
+
+# 共享MCP服务识别调用方的请求头，与trino-mcp/server.py中的定义一致
+AGENT_HEADER = "x-trino-mcp-agent"
+ROUTING_KEY_HEADER = "x-trino-routing-key"
+COORDINATOR_HEADER = "x-trino-coordinator"
+
+
+def create_trino_mcp_client(trino_config: dict, agent_name: str) -> MCPClient:
+    """创建Trino MCP客户端
+
+    配置了TRINO_MCP_URL时连接常驻的共享MCP服务（streamable HTTP），不再为每个代理启动子进程，
+    元数据缓存和连接池在请求之间复用；代理名称、工作流的路由键和选定的集群通过请求头传给服务端。
+    未配置时为当前代理启动一个stdio子进程。
+
+    Args:
+        trino_config: Trino连接配置
+        agent_name: 代理名称，用于查询统计
+
+    Returns:
+        MCPClient: 尚未启动的MCP客户端
+    """
+    url = trino_config.get("TRINO_MCP_URL")
+    if url:
+        headers = {AGENT_HEADER: agent_name}
+        if trino_config.get("TRINO_ROUTING_KEY"):
+            headers[ROUTING_KEY_HEADER] = trino_config["TRINO_ROUTING_KEY"]
+            headers[COORDINATOR_HEADER] = f"{trino_config['TRINO_HOST']}:{trino_config['TRINO_PORT']}"
+        logger.debug(f"连接共享MCP服务: {url}")
+        return MCPClient(lambda: streamablehttp_client(url, headers=headers))
+
+    params = StdioServerParameters(
+        command="python",
+        args=[MCP_SERVER_FILE],
+        env={**trino_config, "TRINO_MCP_AGENT": agent_name}
+    )
+    return MCPClient(lambda: stdio_client(params))
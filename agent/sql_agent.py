@@ -1,17 +1,15 @@
 import logging
-import os
 from typing import Optional
 
-from mcp import StdioServerParameters, stdio_client
 from strands import Agent
 from strands.handlers.callback_handler import PrintingCallbackHandler
 from strands.models import BedrockModel
-from strands.tools.mcp import MCPClient
 from strands_tools import file_read, file_write, shell, use_aws, python_repl
 from config.logger_config import setup_logger
 from config.config import TRINO_CONFIG
 from config.config import model
 from handler.handler import AgentHandler
+from agent.mcp_client import create_trino_mcp_client
 
 setup_logger()
 logger = logging.getLogger(__name__)
@@ -78,8 +76,8 @@ SYSTEM_PROMPT = """
         ...
         )
     ## 不要尝试和执行不满足条件的查询，严格按照上述要求获取数据
-    ## 请在生成sql前，阅读表结构，根据字段类型格式化条件数据
-    ## 请生成sql语句后，务必验证sql的正确性
+    ## 请在生成sql前，阅读表结构，根据字段类型格式化条件数据；表结构、分区键和pkg_name、event_name的常见取值见下方的表结构摘要，无需再调用工具读取；摘要中缺少所需的表时，再使用describe_tables工具一次读取，不要逐表调用describe_table
+    ## 请生成sql语句后，务必使用validate_query工具验证sql的正确性，它只做语法、语义检查和执行计划估算，不会扫描数据，不要为验证而执行完整查询；需要执行多条验证、计数等查询时，请使用execute_batch工具一次提交，不要逐条调用execute_query
 # 请始终用中文输出和交互
 # 请严格按照如下要求输出结果：
     ## 只输出最终的sql语句，在sql语句前不要加任何内容，不要添加任何前导总结、解释、前缀或后缀
@@ -95,18 +93,22 @@ class SqlAgent:
     连接Trino数据库并提供数据分析功能
     """
     
-    def __init__(self, sys_prompt: Optional[str] = None):
+    def __init__(self, sys_prompt: Optional[str] = None, trino_config: Optional[dict] = None):
         """初始化SQL代理
         
         Args:
             sys_prompt: 系统提示词，默认使用内置提示词
+            trino_config: Trino连接配置，默认使用TRINO_CONFIG；CoreAgent用它把工作流固定到选定的集群
         """
+        self.trino_config = trino_config if trino_config is not None else TRINO_CONFIG
         self.sys_prompt = sys_prompt if sys_prompt is not None else SYSTEM_PROMPT
         self.server = None
+        self.schema_digest = ""
         logger.info("初始化SqlAgent")
         
         try:
             self._initialize_mcp_server()
+            self.schema_digest = self._load_schema_digest()
             logger.info("SqlAgent初始化成功")
         except Exception as e:
             logger.error(f"SqlAgent初始化失败: {e}")
@@ -115,16 +117,8 @@ class SqlAgent:
     def _initialize_mcp_server(self):
         """初始化MCP服务器连接"""
         try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            mcp_server_file = os.path.join(os.path.dirname(base_dir), "trino-mcp/server.py")
-            params = StdioServerParameters(
-                command="python",
-                args=[mcp_server_file],
-                env=TRINO_CONFIG
-            )
-            
-            # 创建MCP客户端
-            self.server = MCPClient(lambda: stdio_client(params))
+            # 创建MCP客户端：连接共享MCP服务，或启动stdio子进程
+            self.server = create_trino_mcp_client(self.trino_config, "sql_agent")
             self.server.start()
             logger.debug("MCP服务器连接成功")
             
@@ -132,6 +126,24 @@ class SqlAgent:
             logger.error(f"MCP服务器连接失败: {e}")
             raise
     
+    def _load_schema_digest(self) -> str:
+        """读取MCP服务缓存的表结构摘要，在代理创建时一次性放入系统提示词
+
+        Returns:
+            str: 表结构摘要，读取失败时返回空字符串，由代理自行调用工具读取表结构
+        """
+        try:
+            result = self.server.call_tool_sync("schema_digest", "show_schema_digest", {})
+            if result.get("status") != "success":
+                logger.warning(f"读取表结构摘要失败: {result}")
+                return ""
+            digest = "\n".join(item.get("text", "") for item in result.get("content", []))
+            logger.debug(f"已读取表结构摘要，长度: {len(digest)}")
+            return digest
+        except Exception as e:
+            logger.warning(f"读取表结构摘要失败: {e}")
+            return ""
+
     def _create_agent(self) -> Agent:
         """创建并配置 Agent 实例
         
@@ -146,10 +158,14 @@ class SqlAgent:
                 tools.extend(self.server.list_tools_sync())
                 logger.debug(f"已添加MCP工具，总工具数: {len(tools)}")
             
+            system_prompt = self.sys_prompt
+            if self.schema_digest:
+                system_prompt += f"\n# 表结构摘要\n{self.schema_digest}\n"
+            
             agent = Agent(
                 model=model,
                 tools=tools,
-                system_prompt=self.sys_prompt,
+                system_prompt=system_prompt,
                 callback_handler=AgentHandler()
             )
             
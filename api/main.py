@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 import os
 
+from agent.core_agent import admission, query_stats, trino_router
 from api.data_query import router as data_query_router
 from config.logger_config import setup_logger
 
@@ -34,6 +35,16 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics(limit: int = 20):
+    """返回本进程最近执行的Trino查询统计，按工具和代理汇总分位数，准入控制状态，以及各集群的健康状态和负载"""
+    return {
+        **query_stats.summary(),
+        "recent": query_stats.recent(limit),
+        "admission": admission.status(),
+        "coordinators": trino_router.status(),
+    }
+
 @app.get("/download/{filename}")
 async def download_file(filename: str):
     # 使用绝对路径
@@ -1,11 +1,27 @@
 # Trino数据库连接配置
 from strands.models import BedrockModel
 import os
+import tempfile
 
 TRINO_CONFIG = {
     "TRINO_HOST": os.getenv("TRINO_HOST") or "172.31.38.156",
     "TRINO_PORT": os.getenv("TRINO_PORT") or "8889",
-    "TRINO_USER": os.getenv("TRINO_USER") or "hadoop"
+    "TRINO_USER": os.getenv("TRINO_USER") or "hadoop",
+    "TRINO_POOL_SIZE": os.getenv("TRINO_POOL_SIZE") or "8",
+    # 多个集群时用逗号分隔的host:port列表，为空则只使用TRINO_HOST:TRINO_PORT
+    "TRINO_COORDINATORS": os.getenv("TRINO_COORDINATORS") or "",
+    # 准入控制：同时执行的查询数上限（为空则等于连接池大小），以及触发降低上限的排队时间
+    "TRINO_ADMISSION_MAX_LIMIT": os.getenv("TRINO_ADMISSION_MAX_LIMIT") or "",
+    "TRINO_ADMISSION_TARGET_QUEUE_MS": os.getenv("TRINO_ADMISSION_TARGET_QUEUE_MS") or "1000",
+    # MCP服务查询结果的本地列式缓存目录（Arrow文件），各MCP服务进程共用，超过TTL秒未使用的文件会被清理
+    "TRINO_SPOOL_DIR": os.getenv("TRINO_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "trino-mcp-spool"),
+    "TRINO_SPOOL_TTL": os.getenv("TRINO_SPOOL_TTL") or "3600",
+    # MCP服务export_spooled_result导出文件的目录，只接受文件名，不能写到该目录之外
+    "TRINO_EXPORT_DIR": os.getenv("TRINO_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "trino-mcp-exports"),
+    # 共享MCP服务地址（streamable HTTP），如 http://127.0.0.1:8001/mcp；为空则每个代理启动自己的stdio子进程
+    "TRINO_MCP_URL": os.getenv("TRINO_MCP_URL") or "",
+    # 表结构摘要包含的表（hive.default），SQL代理启动时一次性读取，代替逐表读取表结构
+    "TRINO_SCHEMA_DIGEST_TABLES": os.getenv("TRINO_SCHEMA_DIGEST_TABLES") or "t_conversion1,t_conversion2,t_event"
 }
 model = BedrockModel(
                 model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
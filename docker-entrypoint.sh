@@ -1,5 +1,11 @@
 #!/bin/bash
 
+# 启动共享的Trino MCP服务（后台运行），各代理通过HTTP连接，不再每个请求启动子进程
+export TRINO_MCP_PORT=${TRINO_MCP_PORT:-8001}
+export TRINO_MCP_URL=${TRINO_MCP_URL:-http://127.0.0.1:${TRINO_MCP_PORT}/mcp}
+export TRINO_SCHEMA_DIGEST_TABLES=${TRINO_SCHEMA_DIGEST_TABLES:-t_conversion1,t_conversion2,t_event}
+TRINO_MCP_TRANSPORT=streamable-http python trino-mcp/server.py &
+
 # 启动后端API服务（后台运行）
 python app.py &
 
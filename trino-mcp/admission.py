@@ -0,0 +1,205 @@
+"""Client-side admission control of Trino queries.
+
+Bursts of requests would otherwise all be submitted at once and wait in the coordinator's
+queue, where they compete for the same resources. This module caps the number of queries
+in flight and lets further callers wait in FIFO order on the client instead.
+
+The cap adapts AIMD style to what the coordinator reports for finished queries: it grows
+by one query per cap's worth of queries that were not queued longer than the target
+(additive increase), and halves when a query was queued or ran longer than its target, or
+was rejected for lack of resources (multiplicative decrease). Only queries admitted after
+the last decrease can trigger the next one, so the queries that were already in flight
+when the cap was halved do not halve it again.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+# Trino error names that mean the cluster is overloaded rather than the query being wrong.
+OVERLOAD_ERRORS = frozenset(
+    {"QUERY_QUEUE_FULL", "CLUSTER_OUT_OF_MEMORY", "EXCEEDED_GLOBAL_MEMORY_LIMIT", "INSUFFICIENT_RESOURCES"}
+)
+
+
+class AdmissionTimeoutError(TimeoutError):
+    """Error raised when a query is not admitted within the admission timeout."""
+
+    def __init__(self, timeout: float):
+        self.message = f"Query not admitted after {timeout} seconds, too many queries in flight"
+        super().__init__(self.message)
+
+
+class Ticket:
+    """Admission of one query; report the coordinator's stats through :meth:`record`."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.admitted_at = time.monotonic()
+        self.recorded = False
+
+    def record(self, stats: dict | None = None, error_name: str | None = None) -> None:
+        """Feed the queue time and elapsed time of the finished query back to the controller.
+
+        Args:
+            stats: ``cursor.stats`` of the query.
+            error_name: Trino error name if the query failed.
+        """
+        if self.recorded:
+            return
+        self.recorded = True
+        stats = stats or {}
+        self.controller.record(
+            self.admitted_at,
+            stats.get("queuedTimeMillis") or 0,
+            stats.get("elapsedTimeMillis") or 0,
+            error_name in OVERLOAD_ERRORS,
+        )
+
+
+class AdmissionController:
+    """Caps the queries in flight with an AIMD-adjusted limit and a FIFO wait queue.
+
+    Attributes:
+        min_limit (int): The cap never drops below this many queries.
+        max_limit (int): The cap never grows beyond this many queries.
+        target_queue_ms (float): Coordinator queue time above which the cap is decreased.
+        target_latency_ms (float): Elapsed time above which the cap is decreased; 0 disables it.
+        timeout (float): Seconds a caller waits for admission before giving up.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        target_queue_ms: float = 1000.0,
+        target_latency_ms: float = 0.0,
+        timeout: float = 300.0,
+        backoff: float = 0.5,
+    ):
+        """Initialize the controller with the cap at its maximum.
+
+        Args:
+            max_limit: Upper bound of the cap, and its initial value.
+            min_limit: Lower bound of the cap.
+            target_queue_ms: Coordinator queue time above which the cap is decreased.
+            target_latency_ms: Elapsed time above which the cap is decreased; 0 disables it.
+            timeout: Seconds a caller waits for admission before giving up.
+            backoff: Factor applied to the cap on a decrease.
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.target_queue_ms = target_queue_ms
+        self.target_latency_ms = target_latency_ms
+        self.timeout = timeout
+        self.backoff = backoff
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._waiters: deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self._counters = {"admitted": 0, "waited": 0, "timeouts": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self, check: Callable[[], None] | None = None) -> Iterator[Ticket]:
+        """Hold one of the query slots for the duration of a ``with`` block.
+
+        Args:
+            check: Called periodically while waiting; if it raises, e.g. because the caller's
+                cancel scope was cancelled, the wait is abandoned and the error propagates.
+
+        Yields:
+            Ticket: Use it to report the stats of the query run in the slot.
+
+        Raises:
+            AdmissionTimeoutError: If no slot frees up within ``timeout``.
+        """
+        self._acquire(check)
+        ticket = Ticket(self)
+        try:
+            yield ticket
+        finally:
+            self._release()
+
+    def _acquire(self, check: Callable[[], None] | None) -> None:
+        """Take a slot, or queue behind earlier callers until one is handed over."""
+        with self._lock:
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                self._counters["admitted"] += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+            self._counters["waited"] += 1
+        deadline = time.monotonic() + self.timeout
+        try:
+            while not event.wait(min(0.5, max(0.0, deadline - time.monotonic()))):
+                if check is not None:
+                    check()
+                if time.monotonic() >= deadline:
+                    raise AdmissionTimeoutError(self.timeout)
+        except BaseException as e:
+            with self._lock:
+                if isinstance(e, AdmissionTimeoutError):
+                    self._counters["timeouts"] += 1
+                if not event.is_set():
+                    self._waiters.remove(event)
+                    raise
+            # A slot was handed over while giving up; pass it on.
+            self._release()
+            raise
+        with self._lock:
+            self._counters["admitted"] += 1
+
+    def _release(self) -> None:
+        """Free a slot and hand free slots to the longest waiting callers."""
+        with self._lock:
+            self._in_flight -= 1
+            self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            self._waiters.popleft().set()
+
+    def record(self, admitted_at: float, queued_ms: float, elapsed_ms: float, overloaded: bool = False) -> None:
+        """Adjust the cap from the outcome of a finished query.
+
+        Args:
+            admitted_at: ``time.monotonic()`` at which the query was admitted.
+            queued_ms: Time the query spent in the coordinator's queue.
+            elapsed_ms: Total time of the query on the coordinator.
+            overloaded: Whether the query was rejected for lack of cluster resources.
+        """
+        slow = queued_ms > self.target_queue_ms or (self.target_latency_ms and elapsed_ms > self.target_latency_ms)
+        with self._lock:
+            if overloaded or slow:
+                if admitted_at >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = time.monotonic()
+                    self._counters["decreases"] += 1
+                return
+            if self._limit < self.max_limit:
+                before = self.limit
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+                if self.limit > before:
+                    self._counters["increases"] += 1
+                    self._admit_waiters()
+
+    def status(self) -> dict:
+        """Return the current cap, occupancy and counters."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                **self._counters,
+            }
@@ -0,0 +1,165 @@
+"""Asyncio interface to the Trino client.
+
+The Trino DB API blocks on HTTP for every request, so this module runs the blocking
+calls on a bounded worker pool and awaits them. Query results are polled batch by
+batch, which keeps the event loop free while a query runs, and every call has a
+timeout that cancels its queries on the coordinator when it expires.
+"""
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from query_stats import tag_queries
+from trino_client import DEFAULT_FETCH_SIZE, QueryCancelScope, TrinoClient, TrinoError, current_cancel_scope
+
+
+class QueryTimeoutError(TrinoError):
+    """Error raised when a call does not finish within its timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Query timed out after {timeout} seconds and was cancelled")
+
+
+class AsyncTrinoClient:
+    """An asyncio variant of :class:`TrinoClient`.
+
+    Every public method of the wrapped client is available as a coroutine with the same
+    arguments plus an optional ``timeout`` keyword, e.g.
+    ``await async_client.describe_table(catalog, schema, table, timeout=30)``.
+
+    Attributes:
+        client (TrinoClient): The synchronous client doing the actual work.
+        timeout (float): Default per-call timeout in seconds.
+    """
+
+    def __init__(self, client: TrinoClient, max_workers: int, timeout: float):
+        """Initialize the async client.
+
+        Args:
+            client (TrinoClient): The synchronous client doing the actual work.
+            max_workers (int): Maximum number of blocking calls running at the same time.
+            timeout (float): Default per-call timeout in seconds.
+        """
+        self.client = client
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trino-async")
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """Expose the public methods of the wrapped client as coroutine functions."""
+        method = getattr(self.client, name)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        @functools.wraps(method)
+        async def call(*args: Any, timeout: float | None = None, **kwargs: Any) -> Any:
+            return await self.run(method, *args, timeout=timeout, **kwargs)
+
+        return call
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: float | None = None, **kwargs: Any) -> Any:
+        """Run a blocking client call on the worker pool.
+
+        Args:
+            func: The blocking function to run.
+            *args: Positional arguments for ``func``.
+            timeout: Seconds to wait before cancelling; defaults to ``self.timeout``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            Any: The return value of ``func``.
+
+        Raises:
+            QueryTimeoutError: If the call does not finish within the timeout.
+        """
+        timeout = timeout or self.timeout
+        with tag_queries(tool=getattr(func, "__name__", "unknown")):
+            call = functools.partial(func, *args, **kwargs)
+            return await self._run_in_scope(QueryCancelScope(), timeout, call)
+
+    async def _run_in_scope(self, scope: QueryCancelScope, timeout: float, func: Callable[[], Any]) -> Any:
+        """Run ``func`` on the worker pool with ``scope`` active, cancelling the scope on timeout.
+
+        The caller's context variables, such as the query tags, are visible to ``func``.
+        """
+
+        def call_in_scope() -> Any:
+            token = current_cancel_scope.set(scope)
+            try:
+                return func()
+            finally:
+                current_cancel_scope.reset(token)
+
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, context.run, call_in_scope)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            await self._cancel(scope)
+            await asyncio.gather(future, return_exceptions=True)
+            raise QueryTimeoutError(timeout) from None
+        except asyncio.CancelledError:
+            await self._cancel(scope)
+            raise
+
+    async def stream_query(
+        self,
+        query: str,
+        output_format: str = "ndjson",
+        batch_size: int = DEFAULT_FETCH_SIZE,
+        timeout: float | None = None,
+        params: list | None = None,
+    ) -> AsyncIterator[str]:
+        """Execute a query and yield encoded chunks as the worker pool fetches them.
+
+        Each batch is fetched by a separate worker call, so other coroutines run between
+        batches. The timeout applies to the whole stream.
+
+        Args:
+            query: The SQL query to execute.
+            output_format: ``"ndjson"`` or ``"columns"``, see :meth:`TrinoClient.stream_query`.
+            batch_size: Number of rows fetched per round trip.
+            timeout: Seconds before the query is cancelled; defaults to ``self.timeout``.
+            params: Values bound to the ``?`` placeholders of the query, in order.
+
+        Yields:
+            str: A chunk of encoded rows.
+
+        Raises:
+            QueryTimeoutError: If the stream does not finish within the timeout.
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        scope = QueryCancelScope()
+        chunks = self.client.stream_query(query, output_format, batch_size, params)
+
+        def fetch_next() -> str | None:
+            with tag_queries(tool="stream_query"):
+                return next(chunks, None)
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    await self._cancel(scope)
+                    raise QueryTimeoutError(timeout)
+                chunk = await self._run_in_scope(scope, remaining, fetch_next)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Closing the generator cancels the query if it did not run to completion.
+            await loop.run_in_executor(self._executor, chunks.close)
+
+    @staticmethod
+    async def _cancel(scope: QueryCancelScope) -> None:
+        """Cancel the queries of a scope without waiting behind busy workers."""
+        await asyncio.get_running_loop().run_in_executor(None, scope.cancel)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool once running calls have finished."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,140 @@
+"""Benchmark of the JSON encoding of query results.
+
+Compares the typed :class:`result_format.RowEncoder` path with the previous per-row
+``json.dumps(dict(zip(...)), default=str)`` encoding on synthetic rows shaped like the
+Iceberg ``$files`` metadata table, including decimal and timestamp-with-time-zone
+partition values, metric maps and nested rows. No Trino server is needed.
+
+Usage:
+    python benchmarks/encoding_benchmark.py --rows 20000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_format import OUTPUT_FORMATS, encode_result, orjson  # noqa: E402
+
+# Column names and types as reported in cursor.description for a partitioned "$files" table.
+FILES_COLUMNS = [
+    ("content", "integer"),
+    ("file_path", "varchar"),
+    ("file_format", "varchar"),
+    ("spec_id", "integer"),
+    ("partition", "row(event_date date, event_hour timestamp(6) with time zone, price_bucket decimal(12,2))"),
+    ("record_count", "bigint"),
+    ("file_size_in_bytes", "bigint"),
+    ("column_sizes", "map(integer, bigint)"),
+    ("value_counts", "map(integer, bigint)"),
+    ("null_value_counts", "map(integer, bigint)"),
+    ("nan_value_counts", "map(integer, bigint)"),
+    ("lower_bounds", "map(integer, varchar)"),
+    ("upper_bounds", "map(integer, varchar)"),
+    ("key_metadata", "varbinary"),
+    ("split_offsets", "array(bigint)"),
+    ("equality_ids", "array(integer)"),
+    ("sort_order_id", "integer"),
+    ("readable_metrics", "json"),
+]
+
+# Number of table columns described by the metric maps of each file.
+TABLE_COLUMNS = 24
+
+
+def files_rows(count: int, seed: int = 0) -> list[tuple]:
+    """Generate ``$files``-shaped rows."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        hour = start + timedelta(hours=i % 2000)
+        field_ids = range(1, TABLE_COLUMNS + 1)
+        rows.append(
+            (
+                0,
+                f"s3://warehouse/ads/events/data/event_date={hour.date()}/{i:08d}-{rng.getrandbits(64):016x}.parquet",
+                "PARQUET",
+                0,
+                (hour.date(), hour, Decimal(rng.randint(0, 99999)) / 100),
+                rng.randint(1_000, 5_000_000),
+                rng.randint(1 << 20, 512 << 20),
+                {field: rng.randint(100, 1 << 24) for field in field_ids},
+                {field: rng.randint(1_000, 5_000_000) for field in field_ids},
+                {field: rng.randint(0, 1_000) for field in field_ids},
+                {},
+                {field: f"a{rng.randint(0, 9999)}" for field in field_ids},
+                {field: f"z{rng.randint(0, 9999)}" for field in field_ids},
+                None,
+                [4, 67_108_868, 134_217_732],
+                None,
+                0,
+                json.dumps({"event_id": {"column_size": rng.randint(100, 1 << 20), "value_count": 1000}}),
+            )
+        )
+    return rows
+
+
+def batches_of(rows: list, size: int = 1000) -> list[list]:
+    return [rows[i : i + size] for i in range(0, len(rows), size)]
+
+
+def previous_json(columns: list[tuple[str, str]], batches: list[list]) -> str:
+    """The encoding used by ``execute_query`` before the typed encoder."""
+    names = [name for name, _ in columns]
+    records = (json.dumps(dict(zip(names, row, strict=True)), default=str) for rows in batches for row in rows)
+    return "[" + ", ".join(records) + "]"
+
+
+def measure(func, repeat: int) -> float:
+    """Return the median wall time of ``func`` in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="number of synthetic $files rows")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant, the median is reported")
+    args = parser.parse_args()
+
+    batches = batches_of(files_rows(args.rows))
+    previous = previous_json(FILES_COLUMNS, batches)
+    typed = encode_result(FILES_COLUMNS, batches, "json")
+    if json.loads(previous) != json.loads(typed):
+        sys.exit("typed encoder output differs from the previous encoding")
+
+    baseline = measure(lambda: previous_json(FILES_COLUMNS, batches), args.repeat)
+    backend = "orjson" if orjson is not None else "json (standard library)"
+    print(f"{args.rows} $files rows, median of {args.repeat} runs, serializer: {backend}")
+    print(f"{'variant':<24}{'seconds':>10}{'rows/s':>12}{'speedup':>10}{'MB':>10}")
+    print(
+        f"{'json (previous)':<24}{baseline:>10.3f}{args.rows / baseline:>12,.0f}"
+        f"{1:>10.2f}{len(previous) / 1e6:>10.1f}"
+    )
+    for output_format in OUTPUT_FORMATS:
+        try:
+            encoded = encode_result(FILES_COLUMNS, batches, output_format)
+        except ValueError as e:
+            print(f"{output_format:<24}skipped: {e}")
+            continue
+        seconds = measure(lambda f=output_format: encode_result(FILES_COLUMNS, batches, f), args.repeat)
+        print(
+            f"{output_format:<24}{seconds:>10.3f}{args.rows / seconds:>12,.0f}"
+            f"{baseline / seconds:>10.2f}{len(encoded) / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark of the MCP server startup.
+
+Measures the time from spawning ``server.py`` over stdio, as the agents do, until the
+first ``list_tools`` response, and fails if the median exceeds the budget. The default
+budget is about 1.5 times the median of 0.7-0.9 s measured with lazy startup, tight enough
+to catch a regression. It also fails if importing the server loads any of the modules that
+are meant to be loaded on the first tool call only. No Trino server is needed: nothing
+connects before a tool is called.
+
+Usage:
+    python benchmarks/startup_benchmark.py --repeat 5 --budget 1.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters, stdio_client
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_FILE = os.path.join(SERVER_DIR, "server.py")
+
+# Modules that importing the server must not load; the Trino client and the services
+# built on it import them on the first tool call.
+DEFERRED_MODULES = ("trino", "requests", "numpy", "pyarrow", "trino_client", "columnar_spool", "maintenance")
+
+
+async def time_to_list_tools() -> tuple[float, int]:
+    """Spawn the server and return the seconds until ``list_tools`` answered, and the tool count."""
+    params = StdioServerParameters(command=sys.executable, args=[SERVER_FILE], env=dict(os.environ), cwd=SERVER_DIR)
+    started = time.perf_counter()
+    async with stdio_client(params) as (read, write), ClientSession(read, write) as session:
+        await session.initialize()
+        tools = await session.list_tools()
+        return time.perf_counter() - started, len(tools.tools)
+
+
+def loaded_deferred_modules() -> list[str]:
+    """Return the deferred modules that importing the server loads."""
+    probe = f"import json, sys; import server; print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="server spawns, the median is reported")
+    parser.add_argument("--budget", type=float, default=1.3, help="maximum median seconds to the first list_tools")
+    args = parser.parse_args()
+
+    loaded = loaded_deferred_modules()
+    if loaded:
+        sys.exit(f"importing server.py loads modules that should be deferred: {', '.join(loaded)}")
+
+    timings = []
+    for _ in range(args.repeat):
+        seconds, tools = asyncio.run(time_to_list_tools())
+        timings.append(seconds)
+    median = statistics.median(timings)
+    print(f"{tools} tools, {args.repeat} spawns")
+    print(f"{'median':<10}{median:>8.3f} s")
+    print(f"{'min':<10}{min(timings):>8.3f} s")
+    print(f"{'max':<10}{max(timings):>8.3f} s")
+    if median > args.budget:
+        sys.exit(f"time to first list_tools {median:.3f} s exceeds the budget of {args.budget:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Local columnar spool of query results.
+
+Large results are written batch by batch to an Arrow IPC file as they are fetched, instead
+of being collected in memory and encoded once. The file is read back through a memory map
+without copying, and can be sliced or exported as CSV, TSV, Parquet, Arrow or JSON any
+number of times without querying Trino again.
+
+Spool files are named after their spool ID, so any process sharing the spool directory,
+such as the API process and the short-lived MCP server processes, can read them. Files are
+removed once they have not been written or exported for longer than the TTL. Exports are
+only written inside the configured export directory.
+"""
+
+import csv
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from result_format import ArrowEncoder, RowEncoder, delimited_value, dumps, encode_result
+
+# Formats a spooled result can be exported to.
+EXPORT_FORMATS = ("csv", "tsv", "parquet", "arrow", "ndjson", "json")
+
+SPOOL_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Rows converted per step when an export goes through Python values.
+EXPORT_BATCH_SIZE = 10_000
+
+
+class SpoolError(ValueError):
+    """Error raised for unknown or expired spool IDs, unsupported export formats and invalid export file names."""
+
+
+def export_file_path(export_dir: str, file_name: str) -> str:
+    """Return the path of a file in an export directory, creating the directory if needed.
+
+    Args:
+        export_dir: The directory exports are confined to.
+        file_name: Name of the file; not a path.
+
+    Raises:
+        SpoolError: If the name contains a directory part, or resolves, for example
+            through a symbolic link, to a path outside the export directory.
+    """
+    if not file_name or file_name in (".", "..") or os.path.basename(file_name) != file_name or "\\" in file_name:
+        msg = f"Invalid export file name: {file_name!r}. Pass a file name without a directory"
+        raise SpoolError(msg)
+    os.makedirs(export_dir, exist_ok=True)
+    directory = os.path.realpath(export_dir)
+    path = os.path.realpath(os.path.join(directory, file_name))
+    if os.path.dirname(path) != directory:
+        msg = f"Export file {file_name!r} resolves outside the export directory"
+        raise SpoolError(msg)
+    return path
+
+
+@dataclass
+class SpoolInfo:
+    """Location, schema and size of one spooled result."""
+
+    spool_id: str
+    path: str
+    columns: list[dict]
+    rows: int
+    bytes: int
+
+    def describe(self) -> dict:
+        return asdict(self)
+
+
+class ColumnarSpool:
+    """Writes query results to Arrow IPC files and serves them from memory maps.
+
+    Attributes:
+        directory (str): Directory holding the spool files.
+        ttl (float): Idle seconds after which a spool file is removed.
+        export_dir (str): Directory the exported files are written to.
+    """
+
+    def __init__(self, directory: str, ttl: float, export_dir: str):
+        """Initialize the spool.
+
+        Args:
+            directory (str): Directory holding the spool files; created if missing.
+            ttl (float): Idle seconds after which a spool file is removed.
+            export_dir (str): Directory the exported files are written to; created on the first export.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.export_dir = export_dir
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, columns: list[tuple[str, str]], batches: Iterable[list]) -> SpoolInfo:
+        """Write a result to a new spool file, one record batch per row batch.
+
+        Only one batch of rows is held in memory at a time. The file appears under its
+        final name once it is complete.
+
+        Args:
+            columns: ``(name, type)`` pairs of the result columns.
+            batches: Lists of rows, consumed once. Closed when the write ends, also on
+                failure, so that a generator releases its cursor.
+
+        Returns:
+            SpoolInfo: The spool ID, path, schema, row count and file size.
+        """
+        self._expire()
+        spool_id = uuid.uuid4().hex
+        path = self.path(spool_id)
+        encoder = ArrowEncoder(columns)
+        rows = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, encoder.schema) as writer:
+                for batch in batches:
+                    if batch:
+                        writer.write_batch(encoder.batch(batch))
+                        rows += len(batch)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        finally:
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+        return self._info(spool_id, encoder.schema, rows)
+
+    def path(self, spool_id: str) -> str:
+        """Return the file of a spool ID.
+
+        Raises:
+            SpoolError: If the ID is malformed.
+        """
+        if not SPOOL_ID_PATTERN.match(spool_id):
+            msg = f"Invalid spool ID: {spool_id}"
+            raise SpoolError(msg)
+        return os.path.join(self.directory, f"{spool_id}.arrow")
+
+    def read(self, spool_id: str) -> pa.Table:
+        """Open a spooled result as a table backed by a memory map of its file.
+
+        Raises:
+            SpoolError: If the spool ID is unknown or has expired.
+        """
+        path = self.path(spool_id)
+        try:
+            source = pa.memory_map(path, "r")
+        except FileNotFoundError:
+            msg = f"Unknown or expired spool ID: {spool_id}"
+            raise SpoolError(msg) from None
+        os.utime(path)
+        return pa.ipc.open_file(source).read_all()
+
+    def delete(self, spool_id: str) -> None:
+        """Remove a spooled result, e.g. once it has been exported and is no longer needed."""
+        try:
+            os.remove(self.path(spool_id))
+        except FileNotFoundError:
+            pass
+
+    def info(self, spool_id: str) -> SpoolInfo:
+        """Return the schema, row count and size of a spooled result."""
+        table = self.read(spool_id)
+        return self._info(spool_id, table.schema, table.num_rows)
+
+    def fetch(
+        self,
+        spool_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
+        """Encode a slice of a spooled result like a query result.
+
+        Args:
+            spool_id: The spool ID returned by :meth:`write`.
+            offset: Index of the first row.
+            limit: Maximum number of rows.
+            output_format: One of ``OUTPUT_FORMATS``.
+            columns: Columns to return, in this order; defaults to all.
+
+        Returns:
+            str: The rows in the requested encoding.
+        """
+        table = self.read(spool_id).slice(offset, limit)
+        return encode_result(ArrowEncoder.columns(table.schema), [ArrowEncoder.rows(table)], output_format, columns)
+
+    def export(self, spool_id: str, export_format: str, file_name: str) -> str:
+        """Convert a spooled result to a file in the export directory, without querying Trino again.
+
+        CSV and TSV are written like the ``csv`` output format; Parquet and Arrow keep the
+        column types; ``ndjson`` and ``json`` write JSON objects keyed by column name.
+
+        Args:
+            spool_id: The spool ID returned by :meth:`write`.
+            export_format: One of ``EXPORT_FORMATS``.
+            file_name: Name of the file to write in the export directory; not a path.
+
+        Returns:
+            str: Absolute path of the written file.
+
+        Raises:
+            SpoolError: If the format is not supported, the file name is not a plain name
+                inside the export directory, or the spool ID is unknown.
+        """
+        if export_format not in EXPORT_FORMATS:
+            msg = f"Unsupported export format: {export_format}. Supported formats: {', '.join(EXPORT_FORMATS)}"
+            raise SpoolError(msg)
+        destination = self.export_path(file_name)
+        table = self.read(spool_id)
+        if export_format == "parquet":
+            pq.write_table(table, destination)
+        elif export_format == "arrow":
+            with pa.OSFile(destination, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            self._export_rows(table, export_format, destination)
+        return destination
+
+    def export_path(self, file_name: str) -> str:
+        """Return the path of an export file, creating the export directory if needed.
+
+        Raises:
+            SpoolError: If the name contains a directory part, or resolves, for example
+                through a symbolic link, to a path outside the export directory.
+        """
+        return export_file_path(self.export_dir, file_name)
+
+    @staticmethod
+    def _export_rows(table: pa.Table, export_format: str, destination: str) -> None:
+        """Write a table as delimited text or JSON, a slice at a time."""
+        columns = ArrowEncoder.columns(table.schema)
+        encoder = RowEncoder(columns)
+        with open(destination, "w", newline="", encoding="utf-8") as f:
+            writer = None
+            if export_format in ("csv", "tsv"):
+                writer = csv.writer(f, delimiter="," if export_format == "csv" else "\t", lineterminator="\n")
+                writer.writerow(encoder.names)
+            elif export_format == "json":
+                f.write("[")
+            first = True
+            for offset in range(0, table.num_rows, EXPORT_BATCH_SIZE):
+                rows = ArrowEncoder.rows(table.slice(offset, EXPORT_BATCH_SIZE))
+                if writer is not None:
+                    writer.writerows([delimited_value(value) for value in row] for row in encoder.convert(rows))
+                elif export_format == "ndjson":
+                    f.writelines(f"{record}\n" for record in encoder.json_lines(rows))
+                elif rows:
+                    f.write(("" if first else ",") + dumps(encoder.records(rows))[1:-1])
+                    first = False
+            if export_format == "json":
+                f.write("]")
+
+    def _info(self, spool_id: str, schema: pa.Schema, rows: int) -> SpoolInfo:
+        path = self.path(spool_id)
+        return SpoolInfo(
+            spool_id=spool_id,
+            path=path,
+            columns=[{"name": name, "type": type_} for name, type_ in ArrowEncoder.columns(schema)],
+            rows=rows,
+            bytes=os.path.getsize(path),
+        )
+
+    def _expire(self) -> None:
+        """Remove spool files that have been idle for longer than the TTL."""
+        deadline = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < deadline:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
@@ -1,11 +1,17 @@
 """Configuration module for Trino connection settings."""
 
 import os
-from dataclasses import dataclass
+import tempfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-import trino
 from dotenv import load_dotenv
 
+from coordinator_router import parse_coordinators
+
+if TYPE_CHECKING:
+    import trino
+
 
 @dataclass
 class TrinoConfig:
@@ -17,23 +23,145 @@ class TrinoConfig:
     catalog: str | None = None
     schema: str | None = None
     http_scheme: str = "http"
-    auth: trino.auth.BasicAuthentication | None = None
+    auth: "trino.auth.BasicAuthentication | None" = None
     source: str = "mcp-trino-python"
+    pool_size: int = 8
+    pool_timeout: float = 30.0
+    pool_health_check_interval: float = 60.0
+    metadata_cache_size: int = 1024
+    metadata_cache_ttl: float = 300.0
+    catalog_tree_workers: int = 4
+    batch_workers: int = 4
+    tool_timeout: float = 300.0
+    result_cache_dir: str = field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-results"))
+    result_cache_max_bytes: int = 0
+    result_handle_dir: str = field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-handles"))
+    result_handle_ttl: float = 600.0
+    result_page_size: int = 100
+    spool_dir: str = field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-spool"))
+    spool_ttl: float = 3600.0
+    export_dir: str = field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-exports"))
+    query_stats_capacity: int = 1000
+    agent_name: str = "unknown"
+    maintenance_catalogs: list[str] = field(default_factory=list)
+    maintenance_interval: float = 3600.0
+    maintenance_concurrency: int = 2
+    maintenance_cooldown: float = 6 * 3600.0
+    maintenance_small_file_bytes: int = 100 * 1024 * 1024
+    maintenance_min_small_files: int = 20
+    maintenance_snapshot_retention: str = "7d"
+    maintenance_min_expired_snapshots: int = 10
+    maintenance_scan_workers: int = 4
+    scan_budget_bytes: int = 0
+    maintenance_state_file: str = field(
+        default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-maintenance.json")
+    )
+    coordinators: list[tuple[str, int]] = field(default_factory=list)
+    coordinator_probe_interval: float = 10.0
+    routing_sticky_ttl: float = 3600.0
+    admission_max_limit: int = 0
+    admission_min_limit: int = 1
+    admission_target_queue_ms: float = 1000.0
+    admission_target_latency_ms: float = 0.0
+    admission_timeout: float = 300.0
+    schema_digest_catalog: str = "hive"
+    schema_digest_schema: str = "default"
+    schema_digest_tables: list[str] = field(default_factory=list)
+    schema_digest_domain_columns: list[str] = field(default_factory=lambda: ["pkg_name", "event_name"])
+    schema_digest_domain_limit: int = 20
+    schema_digest_sample_percent: float = 1.0
+    schema_digest_ttl: float = 6 * 3600.0
+    schema_digest_file: str = field(
+        default_factory=lambda: os.path.join(tempfile.gettempdir(), "trino-mcp-schema-digest.json")
+    )
+    mcp_transport: str = "stdio"
+    mcp_host: str = "127.0.0.1"
+    mcp_port: int = 8001
 
 
 def load_config() -> TrinoConfig:
     """Load Trino configuration from environment variables."""
     load_dotenv(override=True)
 
+    host = os.getenv("TRINO_HOST", "localhost")
+    port = int(os.getenv("TRINO_PORT", "8080"))
+    auth = None
+    if os.getenv("TRINO_PASSWORD", None) is not None:
+        # Imported only when needed, so that loading the configuration does not load the Trino client.
+        import trino.auth
+
+        auth = trino.auth.BasicAuthentication(os.getenv("TRINO_USER", None), os.getenv("TRINO_PASSWORD", None))
     return TrinoConfig(
-        host=os.getenv("TRINO_HOST", "localhost"),
-        port=int(os.getenv("TRINO_PORT", "8080")),
+        host=host,
+        port=port,
         user=os.getenv("TRINO_USER", os.getenv("USER", "trino")),
         catalog=os.getenv("TRINO_CATALOG"),
         schema=os.getenv("TRINO_SCHEMA"),
         http_scheme=os.getenv("TRINO_HTTP_SCHEME", "http"),
-        auth=None
-        if os.getenv("TRINO_PASSWORD", None) is None
-        else trino.auth.BasicAuthentication(os.getenv("TRINO_USER", None), os.getenv("TRINO_PASSWORD", None)),
+        auth=auth,
         source="mcp-trino-python",
+        pool_size=int(os.getenv("TRINO_POOL_SIZE", "8")),
+        pool_timeout=float(os.getenv("TRINO_POOL_TIMEOUT", "30")),
+        pool_health_check_interval=float(os.getenv("TRINO_POOL_HEALTH_CHECK_INTERVAL", "60")),
+        metadata_cache_size=int(os.getenv("TRINO_METADATA_CACHE_SIZE", "1024")),
+        metadata_cache_ttl=float(os.getenv("TRINO_METADATA_CACHE_TTL", "300")),
+        catalog_tree_workers=int(os.getenv("TRINO_CATALOG_TREE_WORKERS", "4")),
+        batch_workers=int(os.getenv("TRINO_BATCH_WORKERS", "4")),
+        tool_timeout=float(os.getenv("TRINO_TOOL_TIMEOUT", "300")),
+        result_cache_dir=os.getenv("TRINO_RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "trino-mcp-results")),
+        result_cache_max_bytes=int(os.getenv("TRINO_RESULT_CACHE_MAX_BYTES", "0")),
+        result_handle_dir=os.getenv(
+            "TRINO_RESULT_HANDLE_DIR", os.path.join(tempfile.gettempdir(), "trino-mcp-handles")
+        ),
+        result_handle_ttl=float(os.getenv("TRINO_RESULT_HANDLE_TTL", "600")),
+        result_page_size=int(os.getenv("TRINO_RESULT_PAGE_SIZE", "100")),
+        spool_dir=os.getenv("TRINO_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "trino-mcp-spool")),
+        spool_ttl=float(os.getenv("TRINO_SPOOL_TTL", "3600")),
+        export_dir=os.getenv("TRINO_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "trino-mcp-exports")),
+        query_stats_capacity=int(os.getenv("TRINO_QUERY_STATS_CAPACITY", "1000")),
+        agent_name=os.getenv("TRINO_MCP_AGENT", "unknown"),
+        maintenance_catalogs=[
+            catalog.strip()
+            for catalog in os.getenv("TRINO_MAINTENANCE_CATALOGS", os.getenv("TRINO_CATALOG", "")).split(",")
+            if catalog.strip()
+        ],
+        maintenance_interval=float(os.getenv("TRINO_MAINTENANCE_INTERVAL", "3600")),
+        maintenance_concurrency=int(os.getenv("TRINO_MAINTENANCE_CONCURRENCY", "2")),
+        maintenance_cooldown=float(os.getenv("TRINO_MAINTENANCE_COOLDOWN", str(6 * 3600))),
+        maintenance_small_file_bytes=int(os.getenv("TRINO_MAINTENANCE_SMALL_FILE_BYTES", str(100 * 1024 * 1024))),
+        maintenance_min_small_files=int(os.getenv("TRINO_MAINTENANCE_MIN_SMALL_FILES", "20")),
+        maintenance_snapshot_retention=os.getenv("TRINO_MAINTENANCE_SNAPSHOT_RETENTION", "7d"),
+        maintenance_min_expired_snapshots=int(os.getenv("TRINO_MAINTENANCE_MIN_EXPIRED_SNAPSHOTS", "10")),
+        maintenance_scan_workers=int(os.getenv("TRINO_MAINTENANCE_SCAN_WORKERS", "4")),
+        scan_budget_bytes=int(os.getenv("TRINO_SCAN_BUDGET_BYTES", "0")),
+        maintenance_state_file=os.getenv(
+            "TRINO_MAINTENANCE_STATE_FILE", os.path.join(tempfile.gettempdir(), "trino-mcp-maintenance.json")
+        ),
+        coordinators=parse_coordinators(os.getenv("TRINO_COORDINATORS"), port) or [(host, port)],
+        coordinator_probe_interval=float(os.getenv("TRINO_COORDINATOR_PROBE_INTERVAL", "10")),
+        routing_sticky_ttl=float(os.getenv("TRINO_ROUTING_STICKY_TTL", "3600")),
+        admission_max_limit=int(os.getenv("TRINO_ADMISSION_MAX_LIMIT", "0")),
+        admission_min_limit=int(os.getenv("TRINO_ADMISSION_MIN_LIMIT", "1")),
+        admission_target_queue_ms=float(os.getenv("TRINO_ADMISSION_TARGET_QUEUE_MS", "1000")),
+        admission_target_latency_ms=float(os.getenv("TRINO_ADMISSION_TARGET_LATENCY_MS", "0")),
+        admission_timeout=float(os.getenv("TRINO_ADMISSION_TIMEOUT", "300")),
+        schema_digest_catalog=os.getenv("TRINO_SCHEMA_DIGEST_CATALOG", "hive"),
+        schema_digest_schema=os.getenv("TRINO_SCHEMA_DIGEST_SCHEMA", "default"),
+        schema_digest_tables=[
+            table.strip() for table in os.getenv("TRINO_SCHEMA_DIGEST_TABLES", "").split(",") if table.strip()
+        ],
+        schema_digest_domain_columns=[
+            column.strip()
+            for column in os.getenv("TRINO_SCHEMA_DIGEST_DOMAIN_COLUMNS", "pkg_name,event_name").split(",")
+            if column.strip()
+        ],
+        schema_digest_domain_limit=int(os.getenv("TRINO_SCHEMA_DIGEST_DOMAIN_LIMIT", "20")),
+        schema_digest_sample_percent=float(os.getenv("TRINO_SCHEMA_DIGEST_SAMPLE_PERCENT", "1")),
+        schema_digest_ttl=float(os.getenv("TRINO_SCHEMA_DIGEST_TTL", str(6 * 3600))),
+        schema_digest_file=os.getenv(
+            "TRINO_SCHEMA_DIGEST_FILE", os.path.join(tempfile.gettempdir(), "trino-mcp-schema-digest.json")
+        ),
+        mcp_transport=os.getenv("TRINO_MCP_TRANSPORT", "stdio"),
+        mcp_host=os.getenv("TRINO_MCP_HOST", "127.0.0.1"),
+        mcp_port=int(os.getenv("TRINO_MCP_PORT", "8001")),
     )
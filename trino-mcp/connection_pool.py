@@ -0,0 +1,152 @@
+"""Thread-safe connection pool for Trino.
+
+This module keeps a bounded set of Trino DB API connections that share one keep-alive
+HTTP connection pool, so concurrent callers neither serialize on a single connection nor
+pay connection setup on every query. Each connection has its own HTTP session, because the
+Trino client stores per-connection request headers, such as prepared statements, on it.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import requests
+import trino
+from requests.adapters import HTTPAdapter
+
+
+class PoolTimeoutError(TimeoutError):
+    """Error raised when no connection becomes available within the checkout timeout."""
+
+    def __init__(self, timeout: float):
+        self.message = f"No Trino connection available after {timeout} seconds"
+        super().__init__(self.message)
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of Trino DB API connections.
+
+    Connections are handed out through :meth:`connection` and returned automatically when
+    the ``with`` block exits. Idle connections are health checked before reuse once they
+    have been idle for longer than ``health_check_interval`` seconds.
+
+    Attributes:
+        connect_kwargs (dict): Keyword arguments passed to ``trino.dbapi.connect``.
+        max_size (int): Maximum number of connections checked out at the same time.
+        checkout_timeout (float): Seconds to wait for a free connection before giving up.
+        health_check_interval (float): Idle seconds after which a connection is verified.
+    """
+
+    def __init__(
+        self,
+        connect_kwargs: dict,
+        max_size: int = 8,
+        checkout_timeout: float = 30.0,
+        health_check_interval: float = 60.0,
+    ):
+        """Initialize the pool. Connections are created lazily on first checkout.
+
+        Args:
+            connect_kwargs (dict): Keyword arguments passed to ``trino.dbapi.connect``.
+            max_size (int): Maximum number of connections checked out at the same time.
+            checkout_timeout (float): Seconds to wait for a free connection before giving up.
+            health_check_interval (float): Idle seconds after which a connection is verified.
+        """
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._adapter = HTTPAdapter(pool_connections=max_size, pool_maxsize=max_size)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: list[tuple[trino.dbapi.Connection, float]] = []
+        self._in_use = 0
+
+    def _create_session(self) -> requests.Session:
+        """Create the HTTP session of one connection, sending through the shared keep-alive adapter."""
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        return session
+
+    def _create_connection(self) -> trino.dbapi.Connection:
+        """Create a new connection bound to an HTTP session of its own."""
+        return trino.dbapi.connect(**self.connect_kwargs, http_session=self._create_session())
+
+    @staticmethod
+    def _is_healthy(conn: trino.dbapi.Connection) -> bool:
+        """Check that the coordinator still answers on this connection."""
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+        except Exception:  # noqa: BLE001 - any failure means the connection must be replaced
+            return False
+        return True
+
+    def _checkout(self) -> trino.dbapi.Connection:
+        """Take the most recently used idle connection, or create a new one."""
+        with self._lock:
+            conn, last_used = self._idle.pop() if self._idle else (None, 0.0)
+            self._in_use += 1
+        try:
+            if conn is not None and time.monotonic() - last_used > self.health_check_interval:
+                if not self._is_healthy(conn):
+                    conn = None
+            return conn if conn is not None else self._create_connection()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def _checkin(self, conn: trino.dbapi.Connection, reusable: bool) -> None:
+        """Return a connection to the idle list, or drop it if it is no longer usable."""
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self) -> Iterator[trino.dbapi.Connection]:
+        """Check out a connection for the duration of a ``with`` block.
+
+        Yields:
+            trino.dbapi.Connection: A connection reserved for the caller.
+
+        Raises:
+            PoolTimeoutError: If no connection is available within ``checkout_timeout``.
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PoolTimeoutError(self.checkout_timeout)
+        try:
+            conn = self._checkout()
+            reusable = True
+            try:
+                yield conn
+            except (
+                requests.exceptions.RequestException,
+                trino.exceptions.OperationalError,
+                trino.exceptions.HttpError,
+            ):
+                reusable = False
+                raise
+            finally:
+                self._checkin(conn, reusable)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Return the current pool occupancy.
+
+        Returns:
+            dict: ``max_size``, ``in_use`` and ``idle`` connection counts.
+        """
+        with self._lock:
+            return {"max_size": self.max_size, "in_use": self._in_use, "idle": len(self._idle)}
+
+    def close(self) -> None:
+        """Drop all idle connections and close the shared keep-alive HTTP connections."""
+        with self._lock:
+            self._idle.clear()
+        self._adapter.close()
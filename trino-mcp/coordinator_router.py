@@ -0,0 +1,267 @@
+"""Load-aware routing of queries across several Trino coordinators.
+
+This module keeps one connection pool per coordinator and sends each query to the
+healthy coordinator with the fewest queued and running queries, as reported by its
+``system.runtime.queries`` table. The load is probed at most every ``probe_interval``
+seconds; a coordinator that fails a probe or a connection is avoided until it answers
+a later probe.
+
+Work that must stay on one cluster, such as creating a temporary table and joining it
+afterwards, runs under a routing key (see :func:`sticky_routing`): the first query of a
+key picks a coordinator and every later query of that key goes to the same one.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from connection_pool import ConnectionPool
+
+# Routing key of the queries started in the current context; None routes each query on its own.
+routing_key: ContextVar[str | None] = ContextVar("routing_key", default=None)
+
+# Counts the queued and running queries of a coordinator; failing means the coordinator is unhealthy.
+LOAD_QUERY = "SELECT count_if(state = 'QUEUED'), count_if(state = 'RUNNING') FROM system.runtime.queries"
+
+
+@contextmanager
+def sticky_routing(key: str) -> Iterator[None]:
+    """Route every query started inside the block to the coordinator chosen for ``key``."""
+    token = routing_key.set(key)
+    try:
+        yield
+    finally:
+        routing_key.reset(token)
+
+
+def parse_coordinators(value: str | None, default_port: int) -> list[tuple[str, int]]:
+    """Parse a comma-separated list of ``host[:port]`` coordinators.
+
+    Args:
+        value: The list, e.g. ``trino-a:8080,trino-b``; empty or None gives an empty list.
+        default_port: Port of the entries without one.
+
+    Returns:
+        list[tuple[str, int]]: ``(host, port)`` pairs in the given order.
+    """
+    coordinators = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(":") if ":" in entry else (entry, "", "")
+        coordinators.append((host, int(port) if port else default_port))
+    return coordinators
+
+
+@dataclass
+class CoordinatorState:
+    """Health and load of one coordinator as of its last probe."""
+
+    host: str
+    port: int
+    healthy: bool = True
+    queued: int = 0
+    running: int = 0
+    checked_at: float = 0.0
+    error: str | None = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+class CoordinatorRouter:
+    """Chooses a coordinator per query by health and load, with sticky routing keys.
+
+    With a single coordinator no probe is ever sent and every query uses its pool.
+
+    Attributes:
+        pools (dict[str, ConnectionPool]): Connection pool of each coordinator, by ``host:port``.
+        probe_interval (float): Seconds a probe result is used before the load is read again.
+        sticky_ttl (float): Idle seconds after which a routing key is forgotten.
+    """
+
+    def __init__(
+        self,
+        coordinators: list[tuple[str, int]],
+        connect_kwargs: dict,
+        pool_size: int = 8,
+        checkout_timeout: float = 30.0,
+        health_check_interval: float = 60.0,
+        probe_interval: float = 10.0,
+        sticky_ttl: float = 3600.0,
+    ):
+        """Initialize the router. Connections and probes are created lazily.
+
+        Args:
+            coordinators: ``(host, port)`` of each coordinator; must not be empty.
+            connect_kwargs: Keyword arguments of ``trino.dbapi.connect`` other than host and port.
+            pool_size: Maximum connections per coordinator.
+            checkout_timeout: Seconds to wait for a free connection before giving up.
+            health_check_interval: Idle seconds after which a pooled connection is verified.
+            probe_interval: Seconds a probe result is used before the load is read again.
+            sticky_ttl: Idle seconds after which a routing key is forgotten.
+        """
+        # The Trino client is imported here rather than with the module, so that the configuration
+        # can use parse_coordinators without loading it.
+        from connection_pool import ConnectionPool
+
+        if not coordinators:
+            msg = "At least one Trino coordinator must be configured"
+            raise ValueError(msg)
+        self.connect_kwargs = connect_kwargs
+        self.probe_interval = probe_interval
+        self.sticky_ttl = sticky_ttl
+        self._states = {state.address: state for state in (CoordinatorState(host, port) for host, port in coordinators)}
+        self.pools = {
+            address: ConnectionPool(
+                {**connect_kwargs, "host": state.host, "port": state.port},
+                max_size=pool_size,
+                checkout_timeout=checkout_timeout,
+                health_check_interval=health_check_interval,
+            )
+            for address, state in self._states.items()
+        }
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._sticky: dict[str, tuple[str, float]] = {}
+
+    def route(self, key: str | None = None) -> str:
+        """Return the ``host:port`` of the coordinator for a query.
+
+        Args:
+            key: Routing key; defaults to the key of the current context. Queries with the
+                same key go to the same coordinator while it stays healthy.
+
+        Returns:
+            str: Address of the chosen coordinator.
+        """
+        if len(self._states) == 1:
+            return next(iter(self._states))
+        key = key if key is not None else routing_key.get()
+        self._probe_if_stale()
+        now = time.monotonic()
+        with self._lock:
+            if key is not None:
+                self._prune_sticky(now)
+                sticky = self._sticky.get(key)
+                if sticky is not None and self._states[sticky[0]].healthy:
+                    self._sticky[key] = (sticky[0], now)
+                    return sticky[0]
+            address = min(self._states, key=self._load)
+            if key is not None:
+                self._sticky[key] = (address, now)
+        return address
+
+    def pool(self, key: str | None = None) -> "tuple[str, ConnectionPool]":
+        """Return the address and connection pool of the coordinator for a query, see :meth:`route`."""
+        address = self.route(key)
+        return address, self.pools[address]
+
+    def pin(self, key: str, address: str) -> bool:
+        """Route the queries of a key to a given coordinator, e.g. one chosen by another process.
+
+        Nothing is stored with a single coordinator, where every query goes to it anyway.
+
+        Returns:
+            bool: False if the address is not one of the configured coordinators.
+        """
+        if address not in self._states:
+            return False
+        if len(self._states) == 1:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._prune_sticky(now)
+            self._sticky[key] = (address, now)
+        return True
+
+    def _prune_sticky(self, now: float) -> None:
+        """Drop the routing keys not used for longer than the sticky TTL; called with the lock held."""
+        self._sticky = {k: v for k, v in self._sticky.items() if now - v[1] < self.sticky_ttl}
+
+    def mark_unhealthy(self, address: str, error: Exception) -> None:
+        """Avoid a coordinator after a connection failure until a later probe succeeds."""
+        with self._lock:
+            state = self._states.get(address)
+            if state is not None:
+                state.healthy = False
+                state.error = str(error)
+                state.checked_at = time.monotonic()
+
+    def _load(self, address: str) -> tuple:
+        """Sort key of a coordinator: healthy first, then by queued, running and local queries."""
+        state = self._states[address]
+        return (not state.healthy, state.queued, state.running + self.pools[address].stats()["in_use"])
+
+    def _probe_if_stale(self) -> None:
+        """Probe the coordinators if the last probe is older than the interval.
+
+        Only one thread probes at a time; the others route on the previous results.
+        """
+        deadline = time.monotonic() - self.probe_interval
+        if all(state.checked_at > deadline for state in self._states.values()):
+            return
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        try:
+            for address, state in list(self._states.items()):
+                if state.checked_at <= deadline:
+                    self._probe(address)
+        finally:
+            self._probe_lock.release()
+
+    def _probe(self, address: str) -> None:
+        """Read the queued and running query counts of one coordinator."""
+        import trino
+
+        state = self._states[address]
+        try:
+            conn = trino.dbapi.connect(
+                **{**self.connect_kwargs, "host": state.host, "port": state.port},
+                request_timeout=min(self.probe_interval, 10.0),
+                max_attempts=1,
+            )
+            try:
+                cur = conn.cursor()
+                cur.execute(LOAD_QUERY)
+                queued, running = cur.fetchone()
+            finally:
+                conn.close()
+        except Exception as e:  # noqa: BLE001 - any failure means the coordinator is unhealthy
+            with self._lock:
+                state.healthy, state.error, state.checked_at = False, str(e), time.monotonic()
+            return
+        with self._lock:
+            state.healthy, state.error, state.checked_at = True, None, time.monotonic()
+            state.queued, state.running = queued or 0, running or 0
+
+    def status(self) -> list[dict]:
+        """Return the health, load and pool occupancy of each coordinator."""
+        with self._lock:
+            sticky_keys: dict[str, int] = {}
+            for address, _ in self._sticky.values():
+                sticky_keys[address] = sticky_keys.get(address, 0) + 1
+            return [
+                {
+                    "address": address,
+                    "healthy": state.healthy,
+                    "queued": state.queued,
+                    "running": state.running,
+                    "error": state.error,
+                    "sticky_keys": sticky_keys.get(address, 0),
+                    "pool": self.pools[address].stats(),
+                }
+                for address, state in self._states.items()
+            ]
+
+    def close(self) -> None:
+        """Close the connection pools of every coordinator."""
+        for pool in self.pools.values():
+            pool.close()
@@ -0,0 +1,206 @@
+"""File layout analysis of Iceberg tables.
+
+Listing ``$files`` returns one row per data file, which is not actionable for tables with
+hundreds of thousands of files. This module reads only the columns it needs from
+``$files`` in large batches into NumPy arrays and reduces them to a file-size histogram,
+per-partition size skew, small-file counts and delete-file ratios, with a short
+compaction recommendation per partition.
+"""
+
+import math
+
+import numpy as np
+import trino
+
+from config import TrinoConfig
+from query_stats import tag_queries
+from trino_client import CatalogSchemaError, TrinoClient
+
+# Rows fetched per round trip; the analyzer only keeps a few numeric columns per row.
+ANALYZER_BATCH_SIZE = 50_000
+
+# Iceberg's default write.target-file-size-bytes.
+DEFAULT_TARGET_FILE_BYTES = 512 * 1024 * 1024
+
+# Upper bounds of the file-size histogram buckets, in MB.
+HISTOGRAM_BOUNDS_MB = (1, 8, 32, 64, 128, 256, 512)
+
+# Values of the ``content`` column of ``$files``.
+DATA_CONTENT = 0
+
+# A partition is reported as skewed when it is this many times larger than the median partition.
+SKEW_FACTOR = 4.0
+
+# Deletes are worth rewriting when delete files reach this share of a partition's data files.
+DELETE_FILE_RATIO = 0.1
+
+MB = 1024 * 1024
+
+
+class FileLayoutAnalyzer:
+    """Summarizes the data and delete files of Iceberg tables.
+
+    Attributes:
+        client (TrinoClient): Client used to read the metadata tables.
+        config (TrinoConfig): Supplies the small-file threshold and minimum small-file count
+            shared with the maintenance scheduler.
+    """
+
+    def __init__(self, client: TrinoClient, config: TrinoConfig):
+        """Initialize the analyzer.
+
+        Args:
+            client (TrinoClient): Client used to read the metadata tables.
+            config (TrinoConfig): Supplies the small-file thresholds.
+        """
+        self.client = client
+        self.config = config
+
+    def analyze(
+        self,
+        catalog: str,
+        schema: str,
+        table: str,
+        top: int = 20,
+        target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    ) -> dict:
+        """Analyze the file layout of an Iceberg table.
+
+        Args:
+            catalog: The catalog name. If None, uses configured default.
+            schema: The schema name. If None, uses configured default.
+            table: The name of the table.
+            top: Number of partitions to report, most in need of maintenance first.
+            target_file_bytes: File size compaction should produce.
+
+        Returns:
+            dict: Table totals, the file-size histogram of data files, and for the ``top``
+            partitions their file counts, sizes, skew, delete ratios and a recommendation.
+
+        Raises:
+            CatalogSchemaError: If either catalog or schema is not specified and not configured.
+        """
+        catalog = catalog or self.config.catalog
+        schema = schema or self.config.schema
+        if not catalog or not schema:
+            raise CatalogSchemaError
+        with tag_queries(tool="analyze_files"):
+            keys, files = self._read_files(catalog, schema, table)
+        return self._summarize(f"{catalog}.{schema}.{table}", keys, *files, top, target_file_bytes)
+
+    def _read_files(self, catalog: str, schema: str, table: str) -> tuple[list[str], list[np.ndarray]]:
+        """Read content, partition, size and record count of every file into arrays.
+
+        Returns:
+            tuple: The distinct partition keys, and the arrays holding per file its content
+            type, partition index into the keys, size in bytes and record count.
+        """
+        files_table = f'"{catalog}"."{schema}"."{table}$files"'
+        query = (
+            "SELECT content, json_format(CAST(partition AS JSON)), file_size_in_bytes, record_count "
+            f"FROM {files_table}"
+        )
+        try:
+            _, batches = self.client.open_result(query, ANALYZER_BATCH_SIZE)
+        except trino.exceptions.TrinoQueryError:
+            # Unpartitioned tables have no partition column.
+            query = f"SELECT content, '', file_size_in_bytes, record_count FROM {files_table}"
+            _, batches = self.client.open_result(query, ANALYZER_BATCH_SIZE)
+
+        partitions: dict[str, int] = {}
+        chunks = []
+        for rows in batches:
+            # One column-major pass per batch; Python only touches the partition keys.
+            content, keys, sizes, records = zip(*rows, strict=True)
+            codes = np.fromiter((partitions.setdefault(key, len(partitions)) for key in keys), np.int64, len(keys))
+            chunks.append(
+                (
+                    np.asarray(content, dtype=np.int8),
+                    codes,
+                    np.asarray(sizes, dtype=np.int64),
+                    np.asarray(records, dtype=np.int64),
+                )
+            )
+        if not chunks:
+            return [], [np.empty(0, dtype=dtype) for dtype in (np.int8, np.int64, np.int64, np.int64)]
+        return list(partitions), [np.concatenate(arrays) for arrays in zip(*chunks, strict=True)]
+
+    def _summarize(
+        self,
+        name: str,
+        keys: list[str],
+        content: np.ndarray,
+        codes: np.ndarray,
+        sizes: np.ndarray,
+        records: np.ndarray,
+        top: int,
+        target_file_bytes: int,
+    ) -> dict:
+        """Reduce the per-file arrays to table and partition statistics."""
+        count = len(keys)
+        data = content == DATA_CONTENT
+        small = data & (sizes < self.config.maintenance_small_file_bytes)
+        deletes = ~data
+
+        data_files = np.bincount(codes[data], minlength=count)
+        data_bytes = np.bincount(codes[data], weights=sizes[data], minlength=count)
+        data_records = np.bincount(codes[data], weights=records[data], minlength=count)
+        small_files = np.bincount(codes[small], minlength=count)
+        small_bytes = np.bincount(codes[small], weights=sizes[small], minlength=count)
+        delete_files = np.bincount(codes[deletes], minlength=count)
+        delete_records = np.bincount(codes[deletes], weights=records[deletes], minlength=count)
+
+        median_bytes = float(np.median(data_bytes)) if count else 0.0
+        skew = data_bytes / median_bytes if median_bytes else np.zeros(count)
+        delete_ratio = np.divide(delete_files, data_files, out=np.zeros(count), where=data_files > 0)
+        # Rank by the work compaction would save: files merged away plus delete files applied.
+        urgency = np.maximum(small_files - 1, 0) + delete_files
+        order = np.lexsort((-data_bytes, -urgency))[:top]
+
+        bounds = np.array([0, *HISTOGRAM_BOUNDS_MB, np.inf]) * MB
+        histogram, _ = np.histogram(sizes[data], bins=bounds)
+        labels = [f"<{HISTOGRAM_BOUNDS_MB[0]}MB"]
+        labels += [f"{low}-{high}MB" for low, high in zip(HISTOGRAM_BOUNDS_MB, HISTOGRAM_BOUNDS_MB[1:])]
+        labels.append(f">={HISTOGRAM_BOUNDS_MB[-1]}MB")
+
+        partitions = []
+        for i in order.tolist():
+            stats = {
+                "partition": keys[i] or None,
+                "data_files": int(data_files[i]),
+                "data_mb": round(float(data_bytes[i]) / MB, 1),
+                "records": int(data_records[i]),
+                "small_files": int(small_files[i]),
+                "avg_file_mb": round(float(data_bytes[i]) / MB / data_files[i], 1) if data_files[i] else 0.0,
+                "skew": round(float(skew[i]), 2),
+                "delete_files": int(delete_files[i]),
+                "delete_file_ratio": round(float(delete_ratio[i]), 3),
+                "deleted_records": int(delete_records[i]),
+            }
+            stats["recommendation"] = self._recommend(stats, float(small_bytes[i]), target_file_bytes)
+            partitions.append(stats)
+
+        return {
+            "table": name,
+            "partitions": count,
+            "data_files": int(data.sum()),
+            "delete_files": int(deletes.sum()),
+            "data_mb": round(float(sizes[data].sum()) / MB, 1),
+            "small_files": int(small.sum()),
+            "small_file_threshold_mb": round(self.config.maintenance_small_file_bytes / MB, 1),
+            "median_partition_mb": round(median_bytes / MB, 1),
+            "file_size_histogram": dict(zip(labels, histogram.tolist(), strict=True)),
+            "top_partitions": partitions,
+        }
+
+    def _recommend(self, stats: dict, small_bytes: float, target_file_bytes: int) -> str:
+        """Turn the statistics of a partition into a one-line recommendation."""
+        advice = []
+        if stats["small_files"] >= self.config.maintenance_min_small_files:
+            target_files = max(1, math.ceil(small_bytes / target_file_bytes))
+            advice.append(f"compact {stats['small_files']} small files into about {target_files}")
+        if stats["delete_files"] and stats["delete_file_ratio"] >= DELETE_FILE_RATIO:
+            advice.append(f"rewrite to apply {stats['delete_files']} delete files")
+        if stats["skew"] >= SKEW_FACTOR:
+            advice.append(f"{stats['skew']}x the median partition size, consider finer partitioning")
+        return "; ".join(advice) if advice else "no action needed"
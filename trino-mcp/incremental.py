@@ -0,0 +1,241 @@
+"""Incremental reads of Iceberg tables between snapshots.
+
+Recurring analyses re-export a whole date range although only a few snapshots were
+appended since the last run. Given the snapshot an export was built from, this module
+reads only the data files those later snapshots added and appends their rows to the
+export, pinned to the current snapshot with ``FOR VERSION AS OF``.
+
+The data files are found from the table metadata: ``$history`` and ``$snapshots`` give
+the snapshots committed since, and ``$entries`` the live data files each of them added.
+Reads are restricted to those files with the ``$path`` hidden column. Only appends can be
+merged this way; if a later snapshot replaced, overwrote or deleted data, or the stored
+snapshot is no longer an ancestor of the table (e.g. after a rollback), the export is
+rebuilt in full.
+
+Exports are only written inside the configured export directory, like the exports of
+spooled results.
+"""
+
+import csv
+import io
+import os
+import tempfile
+from collections.abc import Callable
+
+from columnar_spool import export_file_path
+from config import TrinoConfig
+from query_stats import tag_queries
+from result_format import RowEncoder, delimited_value
+from trino_client import CatalogSchemaError, TrinoClient, TrinoError
+
+# Snapshot operations that only add data files.
+APPEND_OPERATIONS = ("append",)
+
+
+class IncrementalReader:
+    """Keeps CSV exports of an Iceberg table query up to date by reading only new data files.
+
+    Attributes:
+        client (TrinoClient): Client used to read the metadata tables and the new rows.
+        config (TrinoConfig): Supplies the default catalog and schema, and the export directory.
+    """
+
+    def __init__(self, client: TrinoClient, config: TrinoConfig):
+        """Initialize the reader.
+
+        Args:
+            client (TrinoClient): Client used to read the metadata tables and the new rows.
+            config (TrinoConfig): Supplies the default catalog and schema, and the export directory.
+        """
+        self.client = client
+        self.config = config
+
+    def read_since(
+        self,
+        catalog: str,
+        schema: str,
+        table: str,
+        file_name: str,
+        since_snapshot_id: int | None = None,
+        columns: list[str] | None = None,
+        where: str | None = None,
+        params: list | None = None,
+        distinct: bool = False,
+        check: Callable[[str, list | None], None] | None = None,
+    ) -> dict:
+        """Bring a CSV export of ``SELECT columns FROM table WHERE where`` up to the current snapshot.
+
+        Args:
+            catalog: The catalog name. If None, uses configured default.
+            schema: The schema name. If None, uses configured default.
+            table: The name of the Iceberg table.
+            file_name: Name of the CSV file in the export directory holding the previous export,
+                with a header line; created if missing. Not a path.
+            since_snapshot_id: Snapshot the export was built from; None rebuilds the export.
+            columns: Columns to export, in this order; defaults to all columns.
+            where: Optional filter condition, inserted into the query as raw SQL; may use ``?``
+                placeholders.
+            params: Values bound to the ``?`` placeholders of ``where``, in order.
+            distinct: Export distinct rows, also across the previous export and the new rows.
+            check: Called with the data query and its values before it runs, e.g. the scan
+                budget check; an error it raises leaves the previous export unchanged.
+
+        Returns:
+            dict: The ``mode`` (``incremental``, ``full`` or ``unchanged``) and why, the
+            ``snapshot_id`` to store for the next call, the snapshots and data files read,
+            the rows added and the export file name.
+
+        Raises:
+            CatalogSchemaError: If either catalog or schema is not specified and not configured.
+            SpoolError: If the file name is not a plain name inside the export directory.
+            TrinoError: If the table has no snapshot, or the export header does not match the columns.
+        """
+        catalog = catalog or self.config.catalog
+        schema = schema or self.config.schema
+        if not catalog or not schema:
+            raise CatalogSchemaError
+        export_path = export_file_path(self.config.export_dir, file_name)
+        prefix = f'"{catalog}"."{schema}"."{table}'
+        with tag_queries(tool="read_incremental"):
+            ancestry = self._ancestry(prefix)
+            if not ancestry:
+                msg = f"Table {catalog}.{schema}.{table} has no snapshot to read"
+                raise TrinoError(msg)
+            current = ancestry[-1][0]
+            mode, reason, added = self._plan(ancestry, since_snapshot_id, export_path)
+            result = {
+                "mode": mode,
+                "reason": reason,
+                "since_snapshot_id": since_snapshot_id,
+                "snapshot_id": current,
+                "snapshots_read": len(added),
+                "data_files_read": None,
+                "rows_added": 0,
+                "file_name": file_name,
+            }
+            if mode == "unchanged":
+                return result
+
+            conditions = [f"({where})"] if where else []
+            query_params = list(params or [])
+            if mode == "incremental":
+                files = self._added_files(prefix, added)
+                result["data_files_read"] = len(files)
+                if not files:
+                    # The appends only added delete files or empty commits.
+                    return {**result, "mode": "unchanged", "reason": "no data files were added"}
+                conditions.append(f'"$path" IN ({", ".join("?" for _ in files)})')
+                query_params.extend(files)
+            select = ", ".join('"{}"'.format(column.replace('"', '""')) for column in columns) if columns else "*"
+            query = (
+                f"SELECT {'DISTINCT ' if distinct else ''}{select} "
+                f'FROM {prefix}" FOR VERSION AS OF {int(current)}'
+            )
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            if check:
+                check(query, query_params)
+            result["rows_added"] = self._write(export_path, query, query_params, mode == "incremental", distinct)
+        return result
+
+    def _ancestry(self, prefix: str) -> list[tuple[int, str]]:
+        """Return the snapshot ID and operation of each ancestor of the current snapshot, oldest first."""
+        columns, batches = self.client.open_result(
+            f'SELECT h.snapshot_id, s.operation FROM {prefix}$history" h '
+            f'JOIN {prefix}$snapshots" s ON s.snapshot_id = h.snapshot_id '
+            "WHERE h.is_current_ancestor ORDER BY h.made_current_at"
+        )
+        return [(snapshot_id, operation) for rows in batches for snapshot_id, operation in rows]
+
+    @staticmethod
+    def _plan(
+        ancestry: list[tuple[int, str]], since_snapshot_id: int | None, export_path: str
+    ) -> tuple[str, str, list[int]]:
+        """Decide between an incremental read, a full rebuild or nothing to do.
+
+        Returns:
+            tuple: The mode, the reason, and the IDs of the snapshots to read incrementally.
+        """
+        if since_snapshot_id is None:
+            return "full", "no previous snapshot given", []
+        if not os.path.exists(export_path):
+            return "full", "no previous export", []
+        ids = [snapshot_id for snapshot_id, _ in ancestry]
+        if since_snapshot_id not in ids:
+            return "full", f"snapshot {since_snapshot_id} is not an ancestor of the current snapshot", []
+        later = ancestry[ids.index(since_snapshot_id) + 1 :]
+        if not later:
+            return "unchanged", "no snapshot was committed since", []
+        rewrites = sorted({operation for _, operation in later if operation not in APPEND_OPERATIONS})
+        if rewrites:
+            return "full", f"later snapshots are not appends: {', '.join(rewrites)}", []
+        return "incremental", f"{len(later)} appended snapshots", [snapshot_id for snapshot_id, _ in later]
+
+    def _added_files(self, prefix: str, snapshot_ids: list[int]) -> list[str]:
+        """Return the live data files added by the given snapshots.
+
+        The ``snapshot_id`` of a manifest entry is the snapshot that added the file, also
+        after manifests have been rewritten.
+        """
+        columns, batches = self.client.open_result(
+            f'SELECT DISTINCT data_file.file_path FROM {prefix}$entries" '
+            f"WHERE status <> 2 AND data_file.content = 0 AND snapshot_id IN ({', '.join('?' for _ in snapshot_ids)})",
+            params=snapshot_ids,
+        )
+        return sorted(path for rows in batches for (path,) in rows)
+
+    def _write(self, export_path: str, query: str, params: list, append: bool, distinct: bool) -> int:
+        """Run the query and write its rows to the export, appending to the previous rows.
+
+        The export is replaced atomically, so a failed read leaves the previous export intact.
+
+        Returns:
+            int: Number of rows added to the export.
+        """
+        columns, batches = self.client.open_result(query, params=params)
+        encoder = RowEncoder(columns)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(export_path), suffix=".tmp")
+        added = 0
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(encoder.names)
+                seen = set()
+                if append:
+                    with open(export_path, newline="", encoding="utf-8") as previous:
+                        reader = csv.reader(previous)
+                        header = next(reader, None)
+                        if header != encoder.names:
+                            name = os.path.basename(export_path)
+                            msg = f"Columns of {name} ({header}) do not match the query ({encoder.names})"
+                            raise TrinoError(msg)
+                        for row in reader:
+                            if distinct:
+                                seen.add(tuple(row))
+                            writer.writerow(row)
+                for rows in batches:
+                    values = [[delimited_value(value) for value in row] for row in encoder.convert(rows)]
+                    if distinct:
+                        # Compare the new rows as they read back from the export, like the previous rows.
+                        new = []
+                        for row, key in zip(values, self._read_back(values), strict=True):
+                            if key not in seen:
+                                seen.add(key)
+                                new.append(row)
+                        values = new
+                    writer.writerows(values)
+                    added += len(values)
+            os.replace(tmp_path, export_path)
+        except BaseException:
+            batches.close()
+            os.remove(tmp_path)
+            raise
+        return added
+
+    @staticmethod
+    def _read_back(rows: list[list]) -> list[tuple[str, ...]]:
+        """Return the rows as :func:`csv.reader` reads them back from the export."""
+        buffer = io.StringIO(newline="")
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        return [tuple(row) for row in csv.reader(buffer)]
@@ -0,0 +1,373 @@
+"""Scheduled maintenance of Iceberg tables.
+
+This module scans the Iceberg tables of the configured catalogs, ranks them by their
+small-file count and snapshot backlog, and runs ``optimize`` and ``expire_snapshots`` on
+the worst ones. Actions run on a bounded worker pool, so at most
+``maintenance_concurrency`` tables are maintained at the same time, and a table is not
+maintained again before its cooldown has passed. Cooldowns and the ranking of the last
+scan are kept in a state file so that they hold across processes; the MCP server only
+serves that saved ranking, without scanning the tables itself.
+
+Run ``python maintenance.py`` to maintain the tables periodically, or
+``python maintenance.py --once --dry-run`` to print the current ranking.
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import trino
+
+from config import TrinoConfig, load_config
+from query_stats import tag_queries
+from trino_client import TrinoClient
+
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)\s*$")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def duration_seconds(value: str) -> float:
+    """Convert a Trino duration such as ``7d`` or ``12h`` to seconds.
+
+    Raises:
+        ValueError: If the value is not a duration.
+    """
+    match = DURATION_PATTERN.match(value)
+    if not match:
+        msg = f"Invalid duration: {value}"
+        raise ValueError(msg)
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+@dataclass
+class TableHealth:
+    """Maintenance state of one Iceberg table, as read from its metadata tables."""
+
+    catalog: str
+    schema: str
+    table: str
+    data_files: int
+    small_files: int
+    snapshots: int
+    expired_snapshots: int
+    score: float = 0.0
+    actions: list[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"{self.catalog}.{self.schema}.{self.table}"
+
+    def describe(self, status: str) -> dict:
+        """Return the health as a JSON-serializable dict with a status."""
+        return {"name": self.name, **asdict(self), "status": status}
+
+
+class MaintenanceScheduler:
+    """Ranks Iceberg tables by maintenance need and maintains the worst ones.
+
+    Attributes:
+        client (TrinoClient): Client used for the scans and the maintenance statements.
+        config (TrinoConfig): Thresholds, concurrency and cooldown settings.
+        history (deque[dict]): Outcomes of the most recent maintenance runs per table.
+    """
+
+    def __init__(self, client: TrinoClient, config: TrinoConfig):
+        """Initialize the scheduler.
+
+        Args:
+            client (TrinoClient): Client used for the scans and the maintenance statements.
+            config (TrinoConfig): Thresholds, concurrency and cooldown settings.
+        """
+        self.client = client
+        self.config = config
+        self.history: deque[dict] = deque(maxlen=100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, config.maintenance_concurrency), thread_name_prefix="iceberg-maintenance"
+        )
+        self._lock = threading.Lock()
+        self._running: dict[str, list[str]] = {}
+        self._stop = threading.Event()
+
+    def scan(self) -> list[TableHealth]:
+        """Read the health of every Iceberg table in the configured catalogs.
+
+        Tables are read concurrently with at most ``maintenance_scan_workers`` queries in
+        flight. Tables whose metadata tables cannot be read, such as non-Iceberg tables,
+        are skipped.
+
+        Returns:
+            list[TableHealth]: Tables needing maintenance, most urgent first.
+        """
+        with tag_queries(tool="maintenance_scan"):
+            tables = [table for catalog in self.config.maintenance_catalogs for table in self._list_tables(catalog)]
+            workers = max(1, min(self.config.maintenance_scan_workers, self.config.pool_size, len(tables)))
+            # Each worker call runs in a copy of this context, so the scan queries keep their tags.
+            contexts = [contextvars.copy_context() for _ in tables]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                healths = executor.map(lambda context, table: context.run(self._table_health, *table), contexts, tables)
+                healths = [health for health in healths if health]
+        candidates = [health for health in healths if self._rank(health)]
+        return sorted(candidates, key=lambda health: health.score, reverse=True)
+
+    def _list_tables(self, catalog: str) -> list[tuple[str, str, str]]:
+        """List the base tables of a catalog."""
+        query = (
+            f"SELECT table_schema, table_name FROM {catalog}.information_schema.tables "
+            "WHERE table_type = 'BASE TABLE' AND table_schema <> 'information_schema'"
+        )
+        try:
+            return [(catalog, schema, table) for schema, table in self._rows(query)]
+        except trino.exceptions.TrinoQueryError as e:
+            logger.warning("Unable to list tables of catalog %s: %s", catalog, e)
+            return []
+
+    def _table_health(self, catalog: str, schema: str, table: str) -> TableHealth | None:
+        """Count the small data files and expirable snapshots of a table in one query."""
+        prefix = f'"{catalog}"."{schema}"."{table}'
+        retention = duration_seconds(self.config.maintenance_snapshot_retention)
+        cutoff = f"current_timestamp - INTERVAL '{int(retention)}' SECOND"
+        query = (
+            "SELECT f.data_files, f.small_files, s.snapshots, s.expired_snapshots FROM "
+            "(SELECT count(*) AS data_files, "
+            f"count_if(file_size_in_bytes < {self.config.maintenance_small_file_bytes}) AS small_files "
+            f'FROM {prefix}$files" WHERE content = 0) f CROSS JOIN '
+            "(SELECT count(*) AS snapshots, "
+            # The current snapshot is never expired, even if it is older than the retention.
+            f"count_if(committed_at < {cutoff}) - IF(max(committed_at) < {cutoff}, 1, 0) AS expired_snapshots "
+            f'FROM {prefix}$snapshots") s'
+        )
+        try:
+            rows = self._rows(query)
+        except trino.exceptions.TrinoQueryError:
+            return None
+        if not rows:
+            return None
+        data_files, small_files, snapshots, expired_snapshots = rows[0]
+        return TableHealth(catalog, schema, table, data_files, small_files, snapshots, max(expired_snapshots or 0, 0))
+
+    def _rank(self, health: TableHealth) -> bool:
+        """Score a table and pick its actions; return whether it needs maintenance."""
+        health.score = (
+            health.small_files / max(1, self.config.maintenance_min_small_files)
+            + health.expired_snapshots / max(1, self.config.maintenance_min_expired_snapshots)
+        )
+        health.actions = []
+        if health.small_files >= self.config.maintenance_min_small_files:
+            health.actions.append("optimize")
+        if health.expired_snapshots >= self.config.maintenance_min_expired_snapshots:
+            health.actions.append("expire_snapshots")
+        return bool(health.actions)
+
+    def _rows(self, query: str) -> list[tuple]:
+        columns, batches = self.client.open_result(query)
+        return [tuple(row) for rows in batches for row in rows]
+
+    def run_once(self, limit: int | None = None, dry_run: bool = False, wait: bool = True) -> list[dict]:
+        """Scan the tables and maintain the most urgent ones that are not cooling down.
+
+        Args:
+            limit: Maximum number of tables to maintain; defaults to all candidates.
+            dry_run: Only return the plan, without running anything.
+            wait: Wait for the submitted tables to finish before returning.
+
+        Returns:
+            list[dict]: The planned tables with their health, actions and, unless this is a
+            dry run, their status (``submitted``, ``done`` or ``failed``).
+        """
+        candidates = self.scan()
+        self._save_ranking(candidates)
+        plan = self._select(candidates, limit, reserve=not dry_run)
+        if dry_run:
+            return [health.describe("planned") for health in plan]
+        if plan:
+            now = time.time()
+            self._save_cooldowns({health.name: now for health in plan})
+        futures: list[Future] = [self._executor.submit(self._maintain, health) for health in plan]
+        if not wait:
+            return [health.describe("submitted") for health in plan]
+        return [future.result() for future in futures]
+
+    def last_plan(self, limit: int | None = None) -> dict:
+        """Return the plan of a dry run from the ranking of the last scan, without scanning.
+
+        Scanning reads the ``$files`` and ``$snapshots`` tables of every table of the
+        maintenance catalogs, so only the scheduler daemon scans; each of its runs saves
+        the ranking in the state file. Cooldowns are applied as of now.
+
+        Args:
+            limit: Maximum number of tables to list; defaults to all candidates.
+
+        Returns:
+            dict: ``scanned_at``, the time of the last scan or None if no scan was saved
+            yet, and the planned ``tables`` as returned by a dry run of :meth:`run_once`.
+        """
+        ranking = self._load_state().get("ranking")
+        if ranking is None:
+            return {"scanned_at": None, "tables": []}
+        candidates = [TableHealth(**table) for table in ranking["tables"]]
+        plan = self._select(candidates, limit, reserve=False)
+        return {"scanned_at": ranking["scanned_at"], "tables": [health.describe("planned") for health in plan]}
+
+    def _select(self, candidates: list[TableHealth], limit: int | None, reserve: bool) -> list[TableHealth]:
+        """Pick the most urgent candidates that are neither being maintained nor cooling down.
+
+        Args:
+            candidates: Tables needing maintenance, most urgent first.
+            limit: Maximum number of tables to pick; defaults to all.
+            reserve: Mark the picked tables as running, so concurrent runs skip them.
+        """
+        cooldowns = self._load_cooldowns()
+        now = time.time()
+        plan = []
+        with self._lock:
+            for health in candidates:
+                if limit is not None and len(plan) >= limit:
+                    break
+                cooling_down = now - cooldowns.get(health.name, 0) < self.config.maintenance_cooldown
+                if health.name in self._running or cooling_down:
+                    continue
+                plan.append(health)
+                if reserve:
+                    self._running[health.name] = health.actions
+        return plan
+
+    def _maintain(self, health: TableHealth) -> dict:
+        """Run the actions of one table, compaction before expiry."""
+        started = time.monotonic()
+        outcome = {**health.describe("done"), "error": None}
+        try:
+            with tag_queries(tool="maintenance", agent="maintenance"):
+                for action in health.actions:
+                    if action == "optimize":
+                        self.client.optimize(
+                            catalog=health.catalog,
+                            schema=health.schema,
+                            table=health.table,
+                            file_size_threshold=f"{self.config.maintenance_small_file_bytes}B",
+                        )
+                    else:
+                        self.client.expire_snapshots(
+                            catalog=health.catalog,
+                            schema=health.schema,
+                            table=health.table,
+                            retention_threshold=self.config.maintenance_snapshot_retention,
+                        )
+        except Exception as e:  # noqa: BLE001 - recorded in the history, other tables continue
+            logger.exception("Maintenance of %s failed", health.name)
+            outcome.update(status="failed", error=str(e))
+        finally:
+            with self._lock:
+                self._running.pop(health.name, None)
+        outcome["seconds"] = round(time.monotonic() - started, 3)
+        outcome["finished_at"] = time.time()
+        self.history.append(outcome)
+        return outcome
+
+    def status(self) -> dict:
+        """Return the running tables, the cooldowns and the recent outcomes."""
+        cooldowns = self._load_cooldowns()
+        now = time.time()
+        with self._lock:
+            running = dict(self._running)
+        return {
+            "running": running,
+            "cooling_down": {
+                name: round(self.config.maintenance_cooldown - (now - last), 1)
+                for name, last in cooldowns.items()
+                if now - last < self.config.maintenance_cooldown
+            },
+            "history": list(self.history)[::-1],
+        }
+
+    def run_forever(self, interval: float) -> None:
+        """Run :meth:`run_once` every ``interval`` seconds until :meth:`stop` is called."""
+        while not self._stop.is_set():
+            try:
+                for outcome in self.run_once():
+                    logger.info("Maintenance of %s %s: %s", outcome["name"], outcome["status"], outcome["actions"])
+            except Exception:  # noqa: BLE001 - keep the schedule running
+                logger.exception("Maintenance run failed")
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        """Stop :meth:`run_forever` and the worker pool once running actions have finished."""
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    def _load_state(self) -> dict:
+        """Read the state file: the ``cooldowns`` and the ``ranking`` of the last scan."""
+        try:
+            with open(self.config.maintenance_state_file, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # State files written before the ranking was saved map table names to cooldowns only.
+        if all(isinstance(value, (int, float)) for value in state.values()):
+            return {"cooldowns": state}
+        return state
+
+    def _load_cooldowns(self) -> dict[str, float]:
+        """Read the last maintenance time of each table from the state file."""
+        return self._load_state().get("cooldowns", {})
+
+    def _save_cooldowns(self, started: dict[str, float]) -> None:
+        """Record maintenance start times in the state file, dropping expired cooldowns."""
+        with self._lock:
+            state = self._load_state()
+            now = time.time()
+            cooldowns = {
+                name: last
+                for name, last in state.get("cooldowns", {}).items()
+                if now - last < self.config.maintenance_cooldown
+            }
+            cooldowns.update(started)
+            self._write_state({**state, "cooldowns": cooldowns})
+
+    def _save_ranking(self, candidates: list[TableHealth]) -> None:
+        """Record the ranking of a scan in the state file."""
+        with self._lock:
+            ranking = {"scanned_at": time.time(), "tables": [asdict(health) for health in candidates]}
+            self._write_state({**self._load_state(), "ranking": ranking})
+
+    def _write_state(self, state: dict) -> None:
+        """Replace the state file atomically, so readers in other processes never see a partial file."""
+        directory = os.path.dirname(os.path.abspath(self.config.maintenance_state_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.config.maintenance_state_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the Iceberg tables of the configured catalogs.")
+    parser.add_argument("--once", action="store_true", help="run a single scan instead of looping")
+    parser.add_argument("--dry-run", action="store_true", help="print the ranking without maintaining tables")
+    parser.add_argument("--limit", type=int, default=None, help="maximum number of tables per run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    config = load_config()
+    scheduler = MaintenanceScheduler(TrinoClient(config), config)
+    if args.once or args.dry_run:
+        print(json.dumps(scheduler.run_once(limit=args.limit, dry_run=args.dry_run), indent=2))
+        scheduler.stop()
+        return
+    try:
+        scheduler.run_forever(config.maintenance_interval)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
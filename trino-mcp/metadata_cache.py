@@ -0,0 +1,107 @@
+"""In-memory cache for Trino catalog, schema and table metadata.
+
+This module provides a thread-safe LRU cache with per-entry TTL used by the Trino client
+to answer repeated SHOW/DESCRIBE lookups from memory instead of the coordinator.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class MetadataCache:
+    """A thread-safe LRU cache with per-entry expiry.
+
+    Keys are tuples of the form ``(kind, catalog, schema, table, *extra)``. Listing entries
+    leave the parts below their level as ``None``; for example the tables of
+    ``hive.default`` are cached under ``("tables", "hive", "default", None)``. This lets
+    :meth:`invalidate` drop an object together with every listing that contains it.
+
+    Attributes:
+        max_entries (int): Maximum number of entries kept before the least recently used is evicted.
+        ttl (float): Seconds an entry stays valid after it was loaded.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in the cache.
+            ttl (float): Seconds an entry stays valid after it was loaded.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for a key, loading and storing it on a miss.
+
+        Args:
+            key (tuple): Cache key, ``(kind, catalog, schema, table, *extra)``.
+            loader (Callable[[], Any]): Function computing the value when it is not cached.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def invalidate(self, catalog: str | None = None, schema: str | None = None, table: str | None = None) -> int:
+        """Drop cached entries for an object and every listing that contains it.
+
+        Calling without arguments clears the whole cache.
+
+        Args:
+            catalog (str | None): Catalog of the changed object.
+            schema (str | None): Schema of the changed object.
+            table (str | None): Name of the changed table or view.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        target = (catalog, schema, table)
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if all(wanted is None or part is None or part == wanted for part, wanted in zip(key[1:4], target))
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters.
+
+        Returns:
+            dict: Counters together with the current number of entries and the hit ratio.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,142 @@
+"""Runtime statistics of executed Trino queries.
+
+This module keeps the statistics the coordinator reports for each query (elapsed and CPU
+time, processed rows and bytes, peak memory) in an in-process ring buffer, and summarizes
+them per tool and per calling agent.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Attribution of the queries started in the current context, e.g. {"tool": ..., "agent": ...}.
+query_tags: ContextVar[dict[str, str]] = ContextVar("query_tags", default={})
+
+# Coordinator stats copied into each record, keyed by the name used in the record.
+STAT_FIELDS = {
+    "elapsed_ms": "elapsedTimeMillis",
+    "queued_ms": "queuedTimeMillis",
+    "cpu_ms": "cpuTimeMillis",
+    "wall_ms": "wallTimeMillis",
+    "processed_rows": "processedRows",
+    "processed_bytes": "processedBytes",
+    "physical_input_bytes": "physicalInputBytes",
+    "peak_memory_bytes": "peakMemoryBytes",
+    "spilled_bytes": "spilledBytes",
+}
+
+# Record fields summarized with percentiles.
+SUMMARY_FIELDS = ("elapsed_ms", "queued_ms", "cpu_ms", "processed_bytes", "peak_memory_bytes")
+
+
+@contextmanager
+def tag_queries(**tags: str) -> Iterator[None]:
+    """Attribute the queries started inside the block to the given tags.
+
+    Tags already set by an enclosing block are kept unless overridden.
+    """
+    token = query_tags.set({**query_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        query_tags.reset(token)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class QueryStatsRecorder:
+    """A thread-safe ring buffer of per-query runtime statistics.
+
+    Attributes:
+        capacity (int): Number of most recent queries kept.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """Initialize an empty recorder.
+
+        Args:
+            capacity (int): Number of most recent queries kept.
+        """
+        self.capacity = capacity
+        self._records: deque[dict] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def record(self, stats: dict | None, tags: dict[str, str] | None = None) -> None:
+        """Store the coordinator stats of a finished query.
+
+        Args:
+            stats (dict | None): ``trino.dbapi.Cursor.stats`` of the query; ignored if empty.
+            tags (dict[str, str] | None): Attribution such as tool and agent; defaults to the
+                tags of the current context.
+        """
+        if not stats or not stats.get("queryId"):
+            return
+        record = {
+            "query_id": stats["queryId"],
+            "state": stats.get("state"),
+            "finished_at": time.time(),
+            **(tags if tags is not None else query_tags.get()),
+        }
+        record.update({name: stats.get(key, 0) or 0 for name, key in STAT_FIELDS.items()})
+        with self._lock:
+            self._records.append(record)
+            self._total += 1
+
+    def recent(self, limit: int = 20) -> list[dict]:
+        """Return the most recent records, newest first."""
+        with self._lock:
+            records = list(self._records)
+        return records[::-1][:limit]
+
+    def summary(self) -> dict:
+        """Summarize the buffered queries overall, per tool and per agent.
+
+        Returns:
+            dict: For each group the query count, failed count, totals of CPU time and
+            processed bytes, and p50/p90/p99/max of the fields in ``SUMMARY_FIELDS``.
+        """
+        with self._lock:
+            records = list(self._records)
+            total = self._total
+        return {
+            "recorded_total": total,
+            "buffered": len(records),
+            "overall": self._summarize(records),
+            "by_tool": self._group(records, "tool"),
+            "by_agent": self._group(records, "agent"),
+        }
+
+    def _group(self, records: list[dict], tag: str) -> dict:
+        groups: dict[str, list[dict]] = {}
+        for record in records:
+            groups.setdefault(record.get(tag) or "unknown", []).append(record)
+        return {name: self._summarize(group) for name, group in sorted(groups.items())}
+
+    @staticmethod
+    def _summarize(records: list[dict]) -> dict:
+        summary = {
+            "queries": len(records),
+            "failed": sum(1 for record in records if record["state"] == "FAILED"),
+            "cpu_ms_total": sum(record["cpu_ms"] for record in records),
+            "processed_bytes_total": sum(record["processed_bytes"] for record in records),
+        }
+        for field in SUMMARY_FIELDS:
+            values = sorted(record[field] for record in records)
+            summary[field] = {
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": values[-1] if values else 0,
+            }
+        return summary
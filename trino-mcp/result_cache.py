@@ -0,0 +1,145 @@
+"""On-disk cache for query results.
+
+This module stores encoded query results as files in a local directory, bounded by total
+size with least-recently-used eviction. Entries are grouped by query: storing a new
+version of a query's result (for example after one of its tables got a new snapshot)
+removes the older versions.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """A size-bounded, thread-safe LRU store of query results on local disk.
+
+    Each entry lives in ``<directory>/<group>-<version>.json``. The recency order is kept
+    in memory and rebuilt from file modification times when the cache is opened, so a
+    restarted server keeps its warm entries.
+
+    Attributes:
+        directory (str): Directory holding the cached result files.
+        max_bytes (int): Maximum total size of the cached files.
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(self, directory: str, max_bytes: int):
+        """Open the cache, indexing any entries already present in the directory.
+
+        Args:
+            directory (str): Directory holding the cached result files; created if missing.
+            max_bytes (int): Maximum total size of the cached files.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Index existing entries, least recently used first."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[: -len(self.SUFFIX)], stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def get(self, group: str, version: str) -> str | None:
+        """Return a cached result, or None if it is not cached.
+
+        Args:
+            group (str): Identifier of the query.
+            version (str): Identifier of the table state the result was computed on.
+
+        Returns:
+            str | None: The cached result.
+        """
+        name = f"{group}-{version}"
+        with self._lock:
+            if name not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self._hits += 1
+        try:
+            with open(self._path(name), encoding="utf-8") as f:
+                value = f.read()
+            os.utime(self._path(name))
+        except OSError:
+            self._discard(name)
+            return None
+        return value
+
+    def put(self, group: str, version: str, value: str) -> None:
+        """Store a result, replacing older versions of the same query.
+
+        Results larger than the whole cache are not stored.
+
+        Args:
+            group (str): Identifier of the query.
+            version (str): Identifier of the table state the result was computed on.
+            value (str): The encoded result.
+        """
+        data = value.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        name = f"{group}-{version}"
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(name))
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(f"{group}-") and key != name]
+            for key in stale:
+                self._total_bytes -= self._entries.pop(key)
+            self._total_bytes += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            while self._total_bytes > self.max_bytes:
+                key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self._evictions += 1
+                stale.append(key)
+        for key in stale:
+            self._remove_file(key)
+
+    def _discard(self, name: str) -> None:
+        """Remove an entry from the index and from disk."""
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+        self._remove_file(name)
+
+    def _remove_file(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters.
+
+        Returns:
+            dict: Counters together with the current number of entries and their total size.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
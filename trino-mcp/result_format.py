@@ -0,0 +1,396 @@
+"""Encodings of tabular tool results.
+
+The default ``json`` encoding repeats every column name on every row, which roughly
+doubles the size of wide results such as Iceberg ``$files`` or ``$entries``. This module
+adds compact encodings that carry the column names once, and column projection so that
+clients only receive the fields they ask for.
+
+Values are made JSON-native by :class:`RowEncoder`, which picks one converter per column
+from its Trino type when a result is opened, instead of letting the encoder fall back to
+``default=str`` value by value. The converted rows are serialized with orjson when it is
+installed, and with the standard library otherwise; both produce compact JSON.
+"""
+
+import base64
+import csv
+import io
+import json
+import re
+from collections.abc import Callable, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is used instead
+    orjson = None
+
+# Supported values of the ``output_format`` argument of the tabular tools.
+OUTPUT_FORMATS = ("json", "columns", "csv", "tsv", "arrow")
+
+# Trino types whose Python values (Decimal, date, time, datetime, timedelta, UUID, ip
+# addresses, bytes) are not JSON-native and are encoded with ``str``.
+STRING_ENCODED_TYPES = frozenset(
+    {"decimal", "date", "time", "timestamp", "interval", "uuid", "ipaddress", "varbinary"}
+)
+
+# A quoted or plain field name followed by the field type in a ``row(...)`` type signature,
+# and the anonymous field types that contain spaces themselves.
+ROW_FIELD_PATTERN = re.compile(r'^(?:"(?:[^"]|"")*"|[A-Za-z_][\w$]*)\s+(.+)$', re.DOTALL)
+MULTI_WORD_TYPE_PATTERN = re.compile(r"^(?:(?:timestamp|time)\s+with\s|interval\s+(?:day|year)\s)", re.IGNORECASE)
+
+
+class OutputFormatError(ValueError):
+    """Error raised for an unsupported output format or an unknown projected column."""
+
+
+Converter = Callable[[object], object]
+
+
+def _type_arguments(type_name: str) -> list[str]:
+    """Split the top-level arguments of a parametric type such as ``map(integer, row(a bigint))``."""
+    inner = type_name[type_name.index("(") + 1 : type_name.rindex(")")]
+    arguments = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(inner):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            arguments.append(inner[start:i].strip())
+            start = i + 1
+    arguments.append(inner[start:].strip())
+    return arguments
+
+
+def _row_field_type(field: str) -> str:
+    """Return the type of a ``row`` field, which may or may not be preceded by a name."""
+    match = ROW_FIELD_PATTERN.match(field)
+    if match is None or MULTI_WORD_TYPE_PATTERN.match(field):
+        return field
+    return match.group(1)
+
+
+def value_converter(type_name: str) -> Converter | None:
+    """Return a function making non-null values of a Trino type JSON-native.
+
+    Args:
+        type_name: Trino type signature as reported in ``cursor.description``, e.g.
+            ``timestamp(3) with time zone`` or ``map(integer, varchar)``.
+
+    Returns:
+        Converter | None: The converter, or None if values of the type are already
+        JSON-native. Values of types not handled here are left to ``default=str``.
+    """
+    type_name = type_name.strip()
+    base = type_name.split("(", 1)[0].split(" ", 1)[0].lower()
+    if base in STRING_ENCODED_TYPES:
+        return str
+    if base == "array":
+        element = value_converter(_type_arguments(type_name)[0])
+        if element is None:
+            return None
+        return lambda values: [None if value is None else element(value) for value in values]
+    if base == "map":
+        key_type, value_type = _type_arguments(type_name)
+        key = value_converter(key_type)
+        value = value_converter(value_type)
+        if key is None and value is None:
+            return None
+        key = key or _identity
+        value = value or _identity
+        return lambda entries: {key(k): None if v is None else value(v) for k, v in entries.items()}
+    if base == "row":
+        # Rows arrive as tuple subclasses, which orjson does not serialize, so they are always converted.
+        fields = [value_converter(_row_field_type(field)) for field in _type_arguments(type_name)]
+        if not any(fields):
+            return list
+        fields = [field or _identity for field in fields]
+        return lambda row: [None if value is None else field(value) for field, value in zip(fields, row, strict=True)]
+    return None
+
+
+def _identity(value: object) -> object:
+    return value
+
+
+def dumps(value: object) -> str:
+    """Serialize a value as compact JSON, encoding values of other types with ``str``."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+class RowEncoder:
+    """Encodes the rows of one result as JSON.
+
+    The converters are chosen once from the column types, and only columns whose values
+    are not JSON-native are touched per row.
+
+    Attributes:
+        names (list[str]): Names of the result columns.
+    """
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        """Pick the converters of a result.
+
+        Args:
+            columns: ``(name, type)`` pairs of the result columns.
+        """
+        self.names = [name for name, _ in columns]
+        self._converters = [
+            (index, converter)
+            for index, (_, type_name) in enumerate(columns)
+            if (converter := value_converter(type_name)) is not None
+        ]
+
+    def convert(self, rows: list) -> list:
+        """Return the rows with JSON-native values."""
+        if not self._converters:
+            return rows
+        converted = []
+        for row in rows:
+            row = list(row)
+            for index, converter in self._converters:
+                value = row[index]
+                if value is not None:
+                    row[index] = converter(value)
+            converted.append(row)
+        return converted
+
+    def records(self, rows: list) -> list[dict]:
+        """Return the rows as objects keyed by column name."""
+        names = self.names
+        return [dict(zip(names, row, strict=True)) for row in self.convert(rows)]
+
+    def json_array_items(self, rows: list) -> str:
+        """Encode rows as the comma-separated items of a JSON array of objects, in one call."""
+        return dumps(self.records(rows))[1:-1]
+
+    def json_lines(self, rows: list) -> Iterator[str]:
+        """Yield each row as a JSON object keyed by column name."""
+        for record in self.records(rows):
+            yield dumps(record)
+
+
+def _pyarrow():
+    """Import pyarrow, which only the Arrow encodings need."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        msg = "The arrow output format requires the pyarrow package"
+        raise OutputFormatError(msg) from e
+    return pa
+
+
+def arrow_type(type_name: str) -> tuple[object, Converter | None, bool]:
+    """Return how values of a Trino type are stored in an Arrow column.
+
+    Scalars, and arrays of them, get the matching Arrow type. Maps and rows are stored as
+    JSON strings, and other types, such as ``uuid`` or ``interval``, as their string form.
+
+    Args:
+        type_name: Trino type signature as reported in ``cursor.description``.
+
+    Returns:
+        tuple: The Arrow type, a function converting non-null values to it or None if the
+        values are stored as they are, and whether the column holds JSON strings.
+    """
+    pa = _pyarrow()
+    type_name = type_name.strip()
+    base = type_name.split("(", 1)[0].split(" ", 1)[0].lower()
+    simple = {
+        "boolean": pa.bool_(),
+        "tinyint": pa.int8(),
+        "smallint": pa.int16(),
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "real": pa.float32(),
+        "double": pa.float64(),
+        "varchar": pa.string(),
+        "char": pa.string(),
+        "json": pa.string(),
+        "varbinary": pa.binary(),
+        "date": pa.date32(),
+    }
+    if base in simple:
+        return simple[base], None, False
+    if base == "decimal":
+        precision, scale = (int(argument) for argument in _type_arguments(type_name))
+        return pa.decimal128(precision, scale), None, False
+    if base == "timestamp":
+        return pa.timestamp("us", tz="UTC" if "with time zone" in type_name.lower() else None), None, False
+    if base == "time" and "with time zone" not in type_name.lower():
+        return pa.time64("us"), None, False
+    if base == "array":
+        element, element_converter, element_json = arrow_type(_type_arguments(type_name)[0])
+        if element_converter is None and not element_json:
+            return pa.list_(element), None, False
+    if base in ("array", "map", "row"):
+        converter = value_converter(type_name)
+        return pa.string(), (lambda value: dumps(converter(value) if converter else value)), True
+    return pa.string(), str, False
+
+
+class ArrowEncoder:
+    """Converts the rows of one result to Arrow record batches with a fixed schema.
+
+    The Trino type of every column and the columns stored as JSON strings are kept in the
+    schema metadata, so the rows can be restored with :meth:`rows`.
+
+    Attributes:
+        schema (pyarrow.Schema): Schema of the batches.
+    """
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        """Pick the Arrow type of each column of a result.
+
+        Args:
+            columns: ``(name, type)`` pairs of the result columns.
+        """
+        pa = _pyarrow()
+        fields = [arrow_type(type_name) for _, type_name in columns]
+        self._converters = [converter for _, converter, _ in fields]
+        self.schema = pa.schema(
+            [pa.field(name, arrow, nullable=True) for (name, _), (arrow, _, _) in zip(columns, fields, strict=True)],
+            metadata={
+                "trino_types": json.dumps([type_name for _, type_name in columns]),
+                "json_columns": json.dumps([index for index, (_, _, is_json) in enumerate(fields) if is_json]),
+            },
+        )
+
+    def batch(self, rows: list):
+        """Convert rows to a record batch."""
+        pa = _pyarrow()
+        arrays = []
+        for index, converter in enumerate(self._converters):
+            values = [row[index] for row in rows]
+            if converter is not None:
+                values = [None if value is None else converter(value) for value in values]
+            arrays.append(pa.array(values, type=self.schema.field(index).type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    @staticmethod
+    def columns(schema) -> list[tuple[str, str]]:
+        """Return the ``(name, type)`` pairs of the result a schema was built for."""
+        types = json.loads(schema.metadata[b"trino_types"])
+        return list(zip(schema.names, types, strict=True))
+
+    @staticmethod
+    def rows(table) -> list[list]:
+        """Restore the rows of a table or batch, decoding the columns stored as JSON strings."""
+        json_columns = set(json.loads(table.schema.metadata[b"json_columns"]))
+        columns = []
+        for index, column in enumerate(table.columns):
+            values = column.to_pylist()
+            if index in json_columns:
+                values = [None if value is None else json.loads(value) for value in values]
+            columns.append(values)
+        return [list(row) for row in zip(*columns, strict=True)]
+
+
+def check_output_format(output_format: str) -> None:
+    """Raise :class:`OutputFormatError` if ``output_format`` is not supported."""
+    if output_format not in OUTPUT_FORMATS:
+        msg = f"Unsupported output format: {output_format}. Supported formats: {', '.join(OUTPUT_FORMATS)}"
+        raise OutputFormatError(msg)
+
+
+def project(
+    columns: list[tuple[str, str]], batches: Iterable[list], names: list[str] | None
+) -> tuple[list[tuple[str, str]], Iterator[list]]:
+    """Restrict a result to the given columns, in the given order.
+
+    Args:
+        columns: ``(name, type)`` pairs of the result columns.
+        batches: Lists of rows.
+        names: Column names to keep; None or empty keeps all columns.
+
+    Returns:
+        tuple: The projected ``(name, type)`` pairs and an iterator over the projected batches.
+
+    Raises:
+        OutputFormatError: If a requested column is not part of the result.
+    """
+    if not names:
+        return columns, iter(batches)
+    available = [name for name, _ in columns]
+    missing = [name for name in names if name not in available]
+    if missing:
+        msg = f"Unknown columns: {', '.join(missing)}. Available columns: {', '.join(available)}"
+        raise OutputFormatError(msg)
+    indices = [available.index(name) for name in names]
+    return [columns[i] for i in indices], ([[row[i] for i in indices] for row in rows] for rows in batches)
+
+
+def encode_result(
+    columns: list[tuple[str, str]],
+    batches: Iterable[list],
+    output_format: str = "json",
+    names: list[str] | None = None,
+) -> str:
+    """Encode a result set.
+
+    Args:
+        columns: ``(name, type)`` pairs of the result columns.
+        batches: Lists of rows, consumed once.
+        output_format: One of :data:`OUTPUT_FORMATS`:
+
+            - ``json``: a list of objects keyed by column name.
+            - ``columns``: ``{"columns": [...], "types": [...], "data": [[...], ...]}`` with the
+              values stored column by column.
+            - ``csv`` / ``tsv``: a header line followed by one line per row; nested values are
+              written as JSON.
+            - ``arrow``: an Arrow IPC stream, base64 encoded.
+        names: Column names to keep; None keeps all columns.
+
+    Returns:
+        str: The encoded result.
+
+    Raises:
+        OutputFormatError: If the format is not supported or a requested column is unknown.
+    """
+    check_output_format(output_format)
+    columns, batches = project(columns, batches, names)
+    column_names = [name for name, _ in columns]
+    if output_format == "arrow":
+        # Arrow has native decimal, temporal and list types, so it gets the raw values.
+        return _encode_arrow(columns, batches)
+    encoder = RowEncoder(columns)
+    if output_format == "json":
+        return "[" + ",".join(encoder.json_array_items(rows) for rows in batches if rows) + "]"
+    rows = [row for batch in batches for row in encoder.convert(batch)]
+    if output_format == "columns":
+        data = [list(values) for values in zip(*rows, strict=True)] if rows else [[] for _ in columns]
+        return dumps({"columns": column_names, "types": [type_ for _, type_ in columns], "data": data})
+    return _encode_delimited(column_names, rows, "," if output_format == "csv" else "\t")
+
+
+def _encode_delimited(names: list[str], rows: list, delimiter: str) -> str:
+    """Encode rows as CSV or TSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(names)
+    writer.writerows([delimited_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def delimited_value(value: object) -> object:
+    """Write NULL as an empty field and nested values (arrays, maps, rows) as JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, tuple)):
+        return dumps(value)
+    return value
+
+
+def _encode_arrow(columns: list[tuple[str, str]], batches: Iterable[list]) -> str:
+    """Encode rows as a base64 Arrow IPC stream, typed as described by :func:`arrow_type`."""
+    pa = _pyarrow()
+    encoder = ArrowEncoder(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, encoder.schema) as writer:
+        for rows in batches:
+            if rows:
+                writer.write_batch(encoder.batch(rows))
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
@@ -0,0 +1,217 @@
+"""Server-side paginated query results.
+
+This module spools the result of a query to a local file in the background and hands
+out a handle through which clients page through it, so large results never travel in
+a single tool response. Handles expire after an idle TTL.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+from result_format import RowEncoder
+from trino_client import QueryCancelScope, TrinoClient, TrinoError, current_cancel_scope
+
+
+class ResultHandleError(TrinoError):
+    """Error raised for unknown or expired result handles."""
+
+    def __init__(self, handle: str):
+        super().__init__(f"Unknown or expired result handle: {handle}")
+
+
+class SpooledResult:
+    """The state of one spooled query result.
+
+    Rows are appended to ``path`` as newline-separated JSON objects; ``page_offsets`` holds
+    the byte offset at which each page starts.
+    """
+
+    def __init__(self, handle: str, query: str, path: str, page_size: int, params: list | None = None):
+        self.handle = handle
+        self.query = query
+        self.params = params
+        self.path = path
+        self.page_size = page_size
+        self.columns: list[tuple[str, str]] | None = None
+        self.page_offsets: list[int] = []
+        self.row_count = 0
+        self.bytes_written = 0
+        self.complete = False
+        self.error: str | None = None
+        self.scope = QueryCancelScope()
+        self.last_access = time.monotonic()
+        self.changed = threading.Condition()
+
+    def page_ready(self, page: int) -> bool:
+        """Whether a page is fully written, or the spool has stopped."""
+        return self.complete or len(self.page_offsets) > page + 1
+
+    def describe(self) -> dict:
+        """Return the metadata sent with every page."""
+        return {
+            "handle": self.handle,
+            "columns": [{"name": name, "type": type_} for name, type_ in self.columns or []],
+            "row_count": self.row_count,
+            "page_size": self.page_size,
+            "complete": self.complete,
+            "error": self.error,
+        }
+
+
+class ResultHandleStore:
+    """Spools query results to disk and serves them page by page.
+
+    Attributes:
+        client (TrinoClient): Client used to run the queries.
+        directory (str): Directory holding the spooled result files.
+        ttl (float): Idle seconds after which a handle and its file are removed.
+        page_size (int): Default number of rows per page.
+    """
+
+    def __init__(self, client: TrinoClient, directory: str, ttl: float, page_size: int):
+        """Initialize the store.
+
+        Args:
+            client (TrinoClient): Client used to run the queries.
+            directory (str): Directory holding the spooled result files; created if missing.
+            ttl (float): Idle seconds after which a handle and its file are removed.
+            page_size (int): Default number of rows per page.
+        """
+        self.client = client
+        self.directory = directory
+        self.ttl = ttl
+        self.page_size = page_size
+        self._results: dict[str, SpooledResult] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def open(self, query: str, page_size: int | None = None, wait: float = 30.0, params: list | None = None) -> str:
+        """Start spooling a query and return its first page.
+
+        Args:
+            query: The SQL query to execute.
+            page_size: Rows per page; defaults to the store setting.
+            wait: Seconds to wait for the first page before returning what is available.
+            params: Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            str: JSON object with the handle, column schema, rows spooled so far, whether the
+            spool is complete, and the rows of page 0.
+        """
+        self._expire()
+        handle = uuid.uuid4().hex
+        path = os.path.join(self.directory, f"{handle}.ndjson")
+        result = SpooledResult(handle, query, path, page_size or self.page_size, params)
+        with self._lock:
+            self._results[handle] = result
+        context = contextvars.copy_context()
+        threading.Thread(
+            target=context.run, args=(self._spool, result), name=f"spool-{handle[:8]}", daemon=True
+        ).start()
+        return self._page(result, 0, wait)
+
+    def fetch_page(self, handle: str, page: int, wait: float = 30.0) -> str:
+        """Return one page of a spooled result.
+
+        Args:
+            handle: Handle returned by :meth:`open`.
+            page: Zero-based page number.
+            wait: Seconds to wait for the page to be spooled.
+
+        Returns:
+            str: JSON object with the result metadata and the rows of the page.
+
+        Raises:
+            ResultHandleError: If the handle is unknown or has expired.
+        """
+        self._expire()
+        with self._lock:
+            result = self._results.get(handle)
+        if result is None:
+            raise ResultHandleError(handle)
+        return self._page(result, page, wait)
+
+    def close(self, handle: str) -> bool:
+        """Cancel a spool if it is still running and delete its file.
+
+        Returns:
+            bool: Whether the handle existed.
+        """
+        with self._lock:
+            result = self._results.pop(handle, None)
+        if result is None:
+            return False
+        result.scope.cancel()
+        try:
+            os.remove(result.path)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _expire(self) -> None:
+        """Close handles that have been idle for longer than the TTL."""
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [handle for handle, result in self._results.items() if result.last_access < deadline]
+        for handle in expired:
+            self.close(handle)
+
+    def _spool(self, result: SpooledResult) -> None:
+        """Run the query and append its rows to the spool file, publishing progress per batch."""
+        token = current_cancel_scope.set(result.scope)
+        try:
+            columns, batches = self.client.open_result(result.query, params=result.params)
+            with result.changed:
+                result.columns = columns
+                result.changed.notify_all()
+            if columns is None:
+                return
+            encoder = RowEncoder(columns)
+            with open(result.path, "wb") as f:
+                for rows in batches:
+                    offsets = []
+                    lines = []
+                    offset = result.bytes_written
+                    for index, record in enumerate(encoder.json_lines(rows), result.row_count):
+                        if index % result.page_size == 0:
+                            offsets.append(offset)
+                        line = f"{record}\n".encode("utf-8")
+                        lines.append(line)
+                        offset += len(line)
+                    f.write(b"".join(lines))
+                    f.flush()
+                    with result.changed:
+                        result.page_offsets.extend(offsets)
+                        result.row_count += len(rows)
+                        result.bytes_written = offset
+                        result.changed.notify_all()
+        except Exception as e:  # noqa: BLE001 - reported to the client through the handle
+            result.error = str(e)
+        finally:
+            current_cancel_scope.reset(token)
+            with result.changed:
+                result.complete = True
+                result.changed.notify_all()
+
+    def _page(self, result: SpooledResult, page: int, wait: float) -> str:
+        """Wait for a page to be spooled and return it with the result metadata."""
+        result.last_access = time.monotonic()
+        with result.changed:
+            result.changed.wait_for(lambda: result.page_ready(page), timeout=wait)
+            offsets = list(result.page_offsets)
+            end_of_data = result.bytes_written
+            response = result.describe()
+        rows = []
+        if page < len(offsets):
+            end = offsets[page + 1] if page + 1 < len(offsets) else end_of_data
+            with open(result.path, "rb") as f:
+                f.seek(offsets[page])
+                rows = [json.loads(line) for line in f.read(end - offsets[page]).splitlines()]
+        response["page"] = page
+        response["has_more"] = not response["complete"] or page + 1 < len(offsets)
+        response["rows"] = rows
+        return json.dumps(response, default=str)
@@ -0,0 +1,214 @@
+"""Pre-execution scan cost estimation.
+
+This module estimates how many partitions, files and bytes a query will read before it
+runs. The constraints the planner derives for each input table (``EXPLAIN (TYPE IO)``)
+are applied to the table's ``$partitions`` metadata, which gives the files and bytes of
+every partition the query cannot prune. Queries estimated above a configured budget are
+rejected, so a runaway date range does not flood the cluster.
+"""
+
+import json
+import math
+
+import trino
+
+from config import TrinoConfig
+from query_stats import tag_queries
+from trino_client import CACHEABLE_QUERY_PATTERN, SQL_COMMENT_PATTERN, TrinoClient, TrinoError
+
+# Column types whose constraint values are compared as numbers rather than as strings.
+NUMERIC_TYPES = ("tinyint", "smallint", "integer", "bigint", "real", "double", "decimal")
+
+
+class ScanBudgetExceededError(TrinoError):
+    """Error raised when a query is estimated to read more than the scan budget."""
+
+    def __init__(self, estimated_bytes: int, budget_bytes: int):
+        super().__init__(
+            f"Query would scan about {format_bytes(estimated_bytes)}, more than the budget of "
+            f"{format_bytes(budget_bytes)}. Narrow the partition filter (e.g. the date range) and retry."
+        )
+        self.estimated_bytes = estimated_bytes
+        self.budget_bytes = budget_bytes
+
+
+def format_bytes(value: float) -> str:
+    """Format a byte count with a binary unit, e.g. ``1.5 TiB``."""
+    if abs(value) < 1024:
+        return f"{int(value)} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        value /= 1024
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} TiB"
+
+
+class ScanEstimator:
+    """Estimates the partitions, files and bytes a query reads, and enforces a budget.
+
+    Attributes:
+        client (TrinoClient): Client used to plan queries and read ``$partitions``.
+        budget_bytes (int): Maximum estimated bytes a query may scan; 0 disables the check.
+    """
+
+    def __init__(self, client: TrinoClient, config: TrinoConfig):
+        """Initialize the estimator.
+
+        Args:
+            client (TrinoClient): Client used to plan queries and read ``$partitions``.
+            config (TrinoConfig): Supplies the scan budget.
+        """
+        self.client = client
+        self.budget_bytes = config.scan_budget_bytes
+
+    def estimate(self, query: str, params: list | None = None) -> dict:
+        """Estimate the data a query will read, without running it.
+
+        For Iceberg tables the estimate is the size of the partitions whose values satisfy
+        the planner's constraints on partition columns. Constraints on other columns, or on
+        columns only partitioned through a transform, do not prune, so the estimate is an
+        upper bound. For other tables the planner's own estimate is used when the table has
+        statistics.
+
+        Args:
+            query: The SQL query to estimate.
+            params: Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            dict: Per input table the partitions scanned out of the total, files, rows and
+            bytes, plus the total estimated bytes and whether they fit the budget.
+        """
+        with tag_queries(tool="estimate_query_cost"):
+            plan = self.client.explain_io(query, params)
+            tables = [self._estimate_table(info) for info in plan.get("inputTableColumnInfos", [])]
+        known = [table["bytes"] for table in tables if table["bytes"] is not None]
+        estimated = sum(known) if len(known) == len(tables) else None
+        return {
+            "tables": tables,
+            "estimated_bytes": estimated,
+            "estimated": format_bytes(estimated) if estimated is not None else "unknown",
+            "budget_bytes": self.budget_bytes or None,
+            "within_budget": None if estimated is None or not self.budget_bytes else estimated <= self.budget_bytes,
+        }
+
+    def check(self, query: str, params: list | None = None) -> None:
+        """Reject a read query estimated to scan more than the budget.
+
+        Statements other than queries, and queries whose size cannot be estimated, pass.
+
+        Raises:
+            ScanBudgetExceededError: If the estimate exceeds the budget.
+        """
+        if not self.budget_bytes or not CACHEABLE_QUERY_PATTERN.match(SQL_COMMENT_PATTERN.sub(" ", query)):
+            return
+        estimated = self.estimate(query, params)["estimated_bytes"]
+        if estimated is not None and estimated > self.budget_bytes:
+            raise ScanBudgetExceededError(estimated, self.budget_bytes)
+
+    def _estimate_table(self, info: dict) -> dict:
+        """Estimate the scan of one input table of an IO plan."""
+        table = info["table"]
+        catalog, schema, name = table["catalog"], table["schemaTable"]["schema"], table["schemaTable"]["table"]
+        constraints = {
+            constraint["columnName"]: constraint
+            for constraint in (info.get("constraint") or {}).get("columnConstraints", [])
+        }
+        planner_bytes = (info.get("estimate") or {}).get("outputSizeInBytes")
+        if not isinstance(planner_bytes, (int, float)) or math.isnan(planner_bytes):
+            planner_bytes = None
+        result = {
+            "table": f"{catalog}.{schema}.{name}",
+            "constrained_columns": sorted(constraints),
+            "planner_estimate_bytes": planner_bytes,
+            "source": "planner",
+            "partitions": None,
+            "partitions_scanned": None,
+            "files": None,
+            "rows": None,
+            "bytes": planner_bytes,
+        }
+        if (info.get("constraint") or {}).get("none"):
+            # The predicate can never be true, nothing is read.
+            return {**result, "partitions_scanned": 0, "files": 0, "rows": 0, "bytes": 0}
+        partitions = self._partitions(catalog, schema, name)
+        if partitions is None:
+            return result
+        scanned = [partition for partition in partitions if self._partition_matches(partition[0], constraints)]
+        return {
+            **result,
+            "source": "$partitions",
+            "partitions": len(partitions),
+            "partitions_scanned": len(scanned),
+            "files": sum(partition[2] for partition in scanned),
+            "rows": sum(partition[1] for partition in scanned),
+            "bytes": sum(partition[3] for partition in scanned),
+        }
+
+    def _partitions(self, catalog: str, schema: str, table: str) -> list[tuple[dict, int, int, int]] | None:
+        """Return the partition values, record count, file count and size of each partition.
+
+        Results are kept in the metadata cache. Returns None for tables without a
+        ``$partitions`` metadata table.
+        """
+        return self.client.metadata_cache.get_or_load(
+            ("partitions", catalog, schema, table), lambda: self._load_partitions(catalog, schema, table)
+        )
+
+    def _load_partitions(self, catalog: str, schema: str, table: str) -> list[tuple[dict, int, int, int]] | None:
+        partitions_table = f'"{catalog}"."{schema}"."{table}$partitions"'
+        try:
+            _, batches = self.client.open_result(
+                "SELECT json_format(CAST(partition AS JSON)), record_count, file_count, total_size "
+                f"FROM {partitions_table}"
+            )
+        except trino.exceptions.TrinoQueryError:
+            try:
+                # Unpartitioned Iceberg tables have a single row without a partition column.
+                _, batches = self.client.open_result(
+                    f"SELECT '{{}}', record_count, file_count, total_size FROM {partitions_table}"
+                )
+            except trino.exceptions.TrinoQueryError:
+                return None
+        return [
+            (json.loads(values or "{}"), records or 0, files or 0, size or 0)
+            for rows in batches
+            for values, records, files, size in rows
+        ]
+
+    @classmethod
+    def _partition_matches(cls, values: dict, constraints: dict[str, dict]) -> bool:
+        """Whether a partition satisfies the constraints on its partition columns."""
+        return all(
+            cls._in_domain(values[column], constraint)
+            for column, constraint in constraints.items()
+            if column in values
+        )
+
+    @staticmethod
+    def _in_domain(value: object, constraint: dict) -> bool:
+        """Whether a partition value satisfies a column constraint of the IO plan."""
+        domain = constraint.get("domain") or {}
+        if value is None:
+            return bool(domain.get("nullsAllowed", True))
+        ranges = domain.get("ranges")
+        if not ranges:
+            # Only NULL is allowed.
+            return False
+        numeric = constraint.get("type", "").split("(", 1)[0] in NUMERIC_TYPES
+
+        def key(raw: object) -> object:
+            return float(raw) if numeric else str(raw)
+
+        value = key(value)
+        for range_ in ranges:
+            low, high = range_.get("low") or {}, range_.get("high") or {}
+            if low.get("value") is not None:
+                bound = key(low["value"])
+                if value < bound or (value == bound and low.get("bound") == "ABOVE"):
+                    continue
+            if high.get("value") is not None:
+                bound = key(high["value"])
+                if value > bound or (value == bound and high.get("bound") == "BELOW"):
+                    continue
+            return True
+        return False
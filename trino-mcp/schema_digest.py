@@ -0,0 +1,243 @@
+"""Cached compact digest of the tables of one schema.
+
+Agents read the structure of the same few tables before writing every query, which costs
+a ``describe_table`` or ``show_create_table`` call and an LLM turn each. This module
+summarizes the tables of a schema once: columns and types, partition keys, the row count
+from the table statistics, and the most frequent values of selected columns such as
+``pkg_name`` and ``event_name``, read from a ``TABLESAMPLE SYSTEM`` sample.
+
+The digest is kept in a file, so that it is shared by the short-lived MCP server
+processes and survives them. Once older than the TTL it is still served, and rebuilt in
+a background thread; only a process that finds no digest at all builds it before
+answering.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import TrinoConfig
+from query_stats import tag_queries
+from trino_client import TrinoClient
+
+logger = logging.getLogger(__name__)
+
+# Partition columns in SHOW CREATE TABLE: partitioned_by for Hive, partitioning for Iceberg.
+PARTITIONING_PATTERN = re.compile(r"\b(?:partitioned_by|partitioning)\s*=\s*ARRAY\[([^\]]*)\]", re.IGNORECASE)
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a catalog, schema, table or column name for use in SQL."""
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+class SchemaDigest:
+    """Builds, caches and refreshes the digest of the configured schema.
+
+    Attributes:
+        client (TrinoClient): Client used to read the metadata and the value samples.
+        config (TrinoConfig): Supplies the schema, tables, sampled columns and TTL.
+    """
+
+    def __init__(self, client: TrinoClient, config: TrinoConfig):
+        """Initialize the digest cache. Nothing is read before the first :meth:`get`.
+
+        Args:
+            client (TrinoClient): Client used to read the metadata and the value samples.
+            config (TrinoConfig): Supplies the schema, tables, sampled columns and TTL.
+        """
+        self.client = client
+        self.config = config
+        self._digest: dict | None = None
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def get(self) -> dict:
+        """Return the digest, building it if there is none and refreshing it in the background if stale.
+
+        Returns:
+            dict: The catalog, schema, build time, per-table summaries and the rendered ``text``.
+        """
+        with self._lock:
+            if self._digest is None:
+                self._digest = self._load()
+            digest = self._digest
+        if digest is None:
+            return self.refresh()
+        if time.time() - digest["built_at"] >= self.config.schema_digest_ttl:
+            self.refresh_in_background()
+        return digest
+
+    def refresh(self, force: bool = False) -> dict:
+        """Build the digest now, store it in the digest file and return it.
+
+        Concurrent calls wait for the build in progress rather than starting another one, and
+        a fresh digest written by another process is used instead of building a new one.
+
+        Args:
+            force: Build a new digest even if the digest file is still fresh.
+        """
+        with self._refreshing:
+            current = None if force else self._load()
+            if current is not None and time.time() - current["built_at"] < self.config.schema_digest_ttl:
+                with self._lock:
+                    self._digest = current
+                return current
+            digest = self._build()
+            self._save(digest)
+            with self._lock:
+                self._digest = digest
+            return digest
+
+    def refresh_in_background(self) -> None:
+        """Rebuild the digest in a daemon thread unless a rebuild is already running."""
+        if self._refreshing.locked():
+            return
+
+        def run() -> None:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refresh of the schema digest failed")
+
+        threading.Thread(target=run, name="schema-digest-refresh", daemon=True).start()
+
+    def _build(self) -> dict:
+        """Read the metadata and value samples of every table and render the digest."""
+        catalog, schema = self.config.schema_digest_catalog, self.config.schema_digest_schema
+        with tag_queries(tool="schema_digest"):
+            columns = self._columns(catalog, schema)
+            tables = []
+            for table, table_columns in columns.items():
+                names = [name for name, _ in table_columns]
+                tables.append(
+                    {
+                        "table": table,
+                        "columns": [{"name": name, "type": type_} for name, type_ in table_columns],
+                        "partition_keys": self._partition_keys(catalog, schema, table),
+                        "row_count": self._row_count(catalog, schema, table),
+                        "domains": {
+                            column: self._domain(catalog, schema, table, column)
+                            for column in self.config.schema_digest_domain_columns
+                            if column in names
+                        },
+                    }
+                )
+        digest = {"catalog": catalog, "schema": schema, "built_at": time.time(), "tables": tables}
+        digest["text"] = self.render(digest)
+        return digest
+
+    def _columns(self, catalog: str, schema: str) -> dict[str, list[tuple[str, str]]]:
+        """Return the columns and types of each digested table with one ``information_schema`` query."""
+        query = (
+            f"SELECT table_name, column_name, data_type FROM {quote_identifier(catalog)}.information_schema.columns "
+            "WHERE table_schema = ?"
+        )
+        params: list = [schema]
+        if self.config.schema_digest_tables:
+            query += f" AND table_name IN ({', '.join('?' for _ in self.config.schema_digest_tables)})"
+            params.extend(self.config.schema_digest_tables)
+        query += " ORDER BY table_name, ordinal_position"
+        _, batches = self.client.open_result(query, params=params)
+        columns: dict[str, list[tuple[str, str]]] = {}
+        for rows in batches:
+            for table, column, type_ in rows:
+                columns.setdefault(table, []).append((column, type_))
+        return columns
+
+    def _partition_keys(self, catalog: str, schema: str, table: str) -> list[str]:
+        """Return the partition columns declared in the table's CREATE TABLE statement."""
+        try:
+            statement = self.client.show_create_table(catalog, schema, table)
+        except Exception as e:  # noqa: BLE001 - views and unsupported tables have no partitioning
+            logger.warning("Unable to read the partitioning of %s.%s.%s: %s", catalog, schema, table, e)
+            return []
+        match = PARTITIONING_PATTERN.search(statement)
+        if not match:
+            return []
+        return [key.strip().strip("'") for key in match.group(1).split(",") if key.strip()]
+
+    def _row_count(self, catalog: str, schema: str, table: str) -> int | None:
+        """Return the row count from the table statistics, or None if the table has none."""
+        name = ".".join(quote_identifier(part) for part in (catalog, schema, table))
+        try:
+            columns, batches = self.client.open_result(f"SHOW STATS FOR {name}")
+            rows = [row for batch in batches for row in batch]
+        except Exception as e:  # noqa: BLE001 - statistics are optional
+            logger.warning("Unable to read the statistics of %s: %s", name, e)
+            return None
+        names = [column for column, _ in columns or []]
+        if "column_name" not in names or "row_count" not in names:
+            return None
+        # The summary row of SHOW STATS has no column name and holds the table's row count.
+        for row in rows:
+            if row[names.index("column_name")] is None and row[names.index("row_count")] is not None:
+                return int(row[names.index("row_count")])
+        return None
+
+    def _domain(self, catalog: str, schema: str, table: str, column: str) -> list[str]:
+        """Return the most frequent values of a column in a sample of the table's splits."""
+        name = ".".join(quote_identifier(part) for part in (catalog, schema, table))
+        column = quote_identifier(column)
+        query = (
+            f"SELECT CAST({column} AS varchar) FROM {name} "
+            f"TABLESAMPLE SYSTEM ({float(self.config.schema_digest_sample_percent)}) "
+            f"WHERE {column} IS NOT NULL GROUP BY 1 ORDER BY count(*) DESC "
+            f"LIMIT {int(self.config.schema_digest_domain_limit)}"
+        )
+        try:
+            _, batches = self.client.open_result(query)
+            return [value for batch in batches for (value,) in batch]
+        except Exception as e:  # noqa: BLE001 - a missing sample does not fail the digest
+            logger.warning("Unable to sample %s of %s: %s", column, name, e)
+            return []
+
+    @staticmethod
+    def render(digest: dict) -> str:
+        """Render a digest as compact text for an LLM context."""
+        built = datetime.fromtimestamp(digest["built_at"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        lines = [f"# {digest['catalog']}.{digest['schema']} (as of {built})"]
+        if not digest["tables"]:
+            lines.append("No tables found")
+        for table in digest["tables"]:
+            details = []
+            if table["row_count"] is not None:
+                details.append(f"~{table['row_count']:,} rows")
+            if table["partition_keys"]:
+                details.append(f"partitioned by {', '.join(table['partition_keys'])}")
+            lines.append(f"## {table['table']}" + (f" ({'; '.join(details)})" if details else ""))
+            lines.append("columns: " + ", ".join(f"{column['name']} {column['type']}" for column in table["columns"]))
+            for column, values in table["domains"].items():
+                if values:
+                    lines.append(f"{column} values (most frequent in a sample): {', '.join(values)}")
+        return "\n".join(lines)
+
+    def _load(self) -> dict | None:
+        """Read the digest file if it describes the configured schema and tables."""
+        try:
+            with open(self.config.schema_digest_file, encoding="utf-8") as f:
+                digest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if (digest.get("catalog"), digest.get("schema"), digest.get("tables_filter")) != (
+            self.config.schema_digest_catalog,
+            self.config.schema_digest_schema,
+            self.config.schema_digest_tables,
+        ):
+            return None
+        return digest
+
+    def _save(self, digest: dict) -> None:
+        """Write the digest file atomically, so that readers never see a partial digest."""
+        digest["tables_filter"] = self.config.schema_digest_tables
+        directory = os.path.dirname(os.path.abspath(self.config.schema_digest_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(digest, f)
+        os.replace(tmp_path, self.config.schema_digest_file)
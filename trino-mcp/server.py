@@ -1,43 +1,181 @@
-"""Model Context Protocol server for Trino using stdio transport.
+"""Model Context Protocol server for Trino.
 
 This module provides a Model Context Protocol (MCP) server that exposes Trino
 functionality through resources and tools, with special support for Iceberg tables.
-It uses stdio for communication instead of SSE.
+By default it talks stdio to a single client that spawned it. With
+``TRINO_MCP_TRANSPORT=streamable-http`` (or ``sse``) it runs as one long-lived service
+shared by every agent, so that its metadata caches and connection pools outlive a request.
 """
 
-import asyncio
-import sys
-from mcp.server import Server
+import json
+import threading
+from collections.abc import Callable, Sequence
+from contextlib import ExitStack
+from typing import Any
+
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.prompts import base
-from mcp.server.stdio import stdio_server
+from mcp.server.lowlevel.server import request_ctx
 from pydantic import Field
 
 from config import load_config
-from trino_client import TrinoClient
+from coordinator_router import sticky_routing
+from query_stats import tag_queries
+
+
+class LazyService:
+    """Creates a service on first use and forwards attribute access to it.
+
+    The Trino client and the services built on it are created, and their modules imported,
+    on the first tool call rather than at startup, so the server answers the MCP handshake
+    and ``list_tools`` without loading the Trino client, NumPy or PyArrow.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Any:
+        """Return the service, creating it on the first call."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self(), name)
+
+
+def _create_client() -> Any:
+    from trino_client import TrinoClient
+
+    return TrinoClient(config)
+
+
+def _create_async_client() -> Any:
+    from async_trino_client import AsyncTrinoClient
+
+    return AsyncTrinoClient(client(), max_workers=config.pool_size, timeout=config.tool_timeout)
+
+
+def _create_result_handles() -> Any:
+    from result_handles import ResultHandleStore
+
+    return ResultHandleStore(client(), config.result_handle_dir, config.result_handle_ttl, config.result_page_size)
+
+
+def _create_columnar_spool() -> Any:
+    from columnar_spool import ColumnarSpool
+
+    return ColumnarSpool(config.spool_dir, config.spool_ttl, config.export_dir)
+
+
+def _create_maintenance() -> Any:
+    from maintenance import MaintenanceScheduler
+
+    return MaintenanceScheduler(client(), config)
+
+
+def _create_file_analyzer() -> Any:
+    from file_analyzer import FileLayoutAnalyzer
+
+    return FileLayoutAnalyzer(client(), config)
+
+
+def _create_incremental_reader() -> Any:
+    from incremental import IncrementalReader
+
+    return IncrementalReader(client(), config)
 
-# Initialize the MCP server and Trino client
+
+def _create_schema_digest() -> Any:
+    from schema_digest import SchemaDigest
+
+    return SchemaDigest(client(), config)
+
+
+def _create_scan_estimator() -> Any:
+    from scan_estimator import ScanEstimator
+
+    return ScanEstimator(client(), config)
+
+
+# Initialize the configuration now and the Trino client on first use. Tools await the async
+# client so that a slow query does not block other tool calls served by the same process.
 config = load_config()
-client = TrinoClient(config)
+client = LazyService(_create_client)
+async_client = LazyService(_create_async_client)
+result_handles = LazyService(_create_result_handles)
+columnar_spool = LazyService(_create_columnar_spool)
+maintenance = LazyService(_create_maintenance)
+file_analyzer = LazyService(_create_file_analyzer)
+incremental_reader = LazyService(_create_incremental_reader)
+scan_estimator = LazyService(_create_scan_estimator)
+schema_digest = LazyService(_create_schema_digest)
+
+
+# Arguments shared by the tools that return tabular results.
+OUTPUT_FORMAT_DESCRIPTION = (
+    "Result encoding: json (list of objects), columns (columnar JSON with names and types once), "
+    "csv, tsv, or arrow (base64 Arrow IPC stream)"
+)
+COLUMNS_DESCRIPTION = "Only return these columns, in this order; defaults to all columns"
+PARAMS_DESCRIPTION = (
+    "Values bound to the ? placeholders of the query, in order, e.g. [\"2024-06-01\", 42]. "
+    "Write CAST(? AS DATE) for date values, and contains(?, column) with a list value instead of a long IN list"
+)
+
+# Request headers through which the agents sharing an HTTP server identify their tool calls:
+# the agent name attributed in the query stats, the routing key of the agent's workflow,
+# and the coordinator ("host:port") the workflow is pinned to.
+AGENT_HEADER = "x-trino-mcp-agent"
+ROUTING_KEY_HEADER = "x-trino-routing-key"
+COORDINATOR_HEADER = "x-trino-coordinator"
+
+
+class SharedFastMCP(FastMCP):
+    """FastMCP server that applies the caller's attribution and routing to each tool call.
+
+    A stdio server serves one agent and is configured through its environment. An HTTP
+    server is shared, so each request says which agent it comes from and which workflow,
+    and the queries of the call are tagged and routed accordingly.
+    """
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Sequence[Any] | dict[str, Any]:
+        request_context = request_ctx.get(None)
+        headers = getattr(request_context and request_context.request, "headers", None) or {}
+        with ExitStack() as stack:
+            if headers.get(AGENT_HEADER):
+                stack.enter_context(tag_queries(agent=headers[AGENT_HEADER]))
+            key = headers.get(ROUTING_KEY_HEADER)
+            if key:
+                if headers.get(COORDINATOR_HEADER):
+                    client.router.pin(key, headers[COORDINATOR_HEADER])
+                stack.enter_context(sticky_routing(key))
+            return await super().call_tool(name, arguments)
 
 
 # Initialize the MCP server with context
-mcp = FastMCP(
+mcp = SharedFastMCP(
     name="Trino Explorer",
     instructions="This Model Context Protocol (MCP) server provides access to Trino Query Engine.",
     dependencies=["trino", "python-dotenv", "loguru"],
+    host=config.mcp_host,
+    port=config.mcp_port,
 )
 
 
 # Tools
 @mcp.tool(description="List all available catalogs")
-def show_catalogs() -> str:
+async def show_catalogs() -> str:
     """List all available catalogs."""
-    return client.list_catalogs()
+    return await async_client.list_catalogs()
 
 
 @mcp.tool(description="List all schemas in a catalog")
-def show_schemas(catalog: str = Field(description="The name of the catalog")) -> str:
+async def show_schemas(catalog: str = Field(description="The name of the catalog")) -> str:
     """List all schemas in a catalog.
 
     Args:
@@ -46,11 +184,11 @@ def show_schemas(catalog: str = Field(description="The name of the catalog")) ->
     Returns:
         str: List of schemas in the specified catalog
     """
-    return client.list_schemas(catalog)
+    return await async_client.list_schemas(catalog)
 
 
 @mcp.tool(description="List all tables in a schema")
-def show_tables(
+async def show_tables(
     catalog: str = Field(description="The name of the catalog"),
     schema_name: str = Field(description="The name of the schema"),
 ) -> str:
@@ -63,14 +201,16 @@ def show_tables(
     Returns:
         str: List of tables in the specified schema
     """
-    return client.list_tables(catalog, schema_name)
+    return await async_client.list_tables(catalog, schema_name)
 
 
 @mcp.tool(description="Describe a table")
-def describe_table(
+async def describe_table(
     catalog: str = Field(description="The catalog name"),
     schema_name: str = Field(description="The schema name"),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Describe a table.
 
@@ -78,15 +218,55 @@ def describe_table(
         catalog (str): The catalog name
         schema_name (str): The schema name
         table (str): The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: Table description in JSON format
     """
-    return client.describe_table(catalog, schema_name, table)
+    return await async_client.describe_table(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
+
+
+@mcp.tool(description="Describe the columns of several tables, or of every table in matching schemas, in one call")
+async def describe_tables(
+    catalog: str = Field(description="The catalog name"),
+    schema_name: str = Field(description="Schema of the table names that are not qualified", default=None),
+    tables: list[str] = Field(description="Table names, optionally qualified as schema.table", default=None),
+    schema_pattern: str = Field(description="SQL LIKE pattern for schema names", default=None),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
+) -> str:
+    """Describe several tables with a single information_schema query.
+
+    Args:
+        catalog (str): The catalog name
+        schema_name (str): Schema of the table names that are not qualified
+        tables (list[str]): Table names, optionally qualified as schema.table
+        schema_pattern (str): SQL LIKE pattern for schema names
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
+
+    Returns:
+        str: One row per table column with its schema, table, name, type and nullability
+    """
+    return await async_client.describe_tables(
+        catalog=catalog,
+        schema=schema_name,
+        tables=tables,
+        schema_pattern=schema_pattern,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show the CREATE TABLE statement for a specific table")
-def show_create_table(
+async def show_create_table(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
@@ -101,11 +281,11 @@ def show_create_table(
     Returns:
         str: The CREATE TABLE statement
     """
-    return client.show_create_table(catalog, schema_name, table)
+    return await async_client.show_create_table(catalog, schema_name, table)
 
 
 @mcp.tool(description="Show the CREATE VIEW statement for a specific view")
-def show_create_view(
+async def show_create_view(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     view: str = Field(description="The name of the view"),
@@ -120,24 +300,226 @@ def show_create_view(
     Returns:
         str: The CREATE VIEW statement
     """
-    return client.show_create_view(catalog, schema_name, view)
+    return await async_client.show_create_view(catalog, schema_name, view)
 
 
-@mcp.tool(description="Execute a SQL query and return results in a readable format")
-def execute_query(query: str = Field(description="The SQL query to execute")) -> str:
+@mcp.tool(
+    description="Execute a SQL query and return results in a readable format. "
+    "Pass literal values as params bound to ? placeholders rather than writing them into the SQL"
+)
+async def execute_query(
+    query: str = Field(description="The SQL query to execute"),
+    timeout: float = Field(description="Seconds before the query is cancelled", default=None),
+    page_size: int = Field(
+        description="If set, return a result handle with the schema and the first page of this many rows "
+        "instead of the full result; use fetch_page for further pages",
+        default=None,
+    ),
+    output_format: str = Field(
+        description=OUTPUT_FORMAT_DESCRIPTION + "; pages of a result handle are always json", default="json"
+    ),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
+    params: list = Field(description=PARAMS_DESCRIPTION, default=None),
+    spool: bool = Field(
+        description="Write the full result to a local columnar spool file instead of returning it, and return "
+        "its spool ID, schema and row count; use fetch_spooled_result and export_spooled_result to read it",
+        default=False,
+    ),
+) -> str:
     """Execute a SQL query and return formatted results.
 
     Args:
         query: The SQL query to execute
+        timeout: Seconds before the query is cancelled, defaults to the server setting
+        page_size: If set, spool the result on the server and return a handle with the
+            column schema, the rows spooled so far and the first page
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
+        params: Values bound to the ? placeholders of the query, in order
+        spool: Write the result to the columnar spool and return its description
+
+    Returns:
+        str: Query results in the requested encoding
+
+    Raises:
+        ScanBudgetExceededError: If a scan budget is configured and the query is estimated
+            to read more than it
+    """
+    await async_client.run(scan_estimator.check, query, params, timeout=timeout)
+    if spool:
+        return await async_client.run(spool_query, query, params, timeout=timeout)
+    if page_size:
+        return await async_client.run(
+            result_handles.open, query, page_size, timeout or config.tool_timeout, params
+        )
+    return await async_client.execute_query(
+        query, output_format=output_format, columns=columns, params=params, timeout=timeout
+    )
+
+
+@mcp.tool(
+    description="Execute several SQL statements concurrently and return every result in one response, "
+    "e.g. a set of validation queries, counts or describes that would otherwise need one call each"
+)
+async def execute_batch(
+    statements: list[str] = Field(description="The SQL statements to execute"),
+    params: list[list] = Field(
+        description="Values bound to the ? placeholders of each statement, by position in statements; "
+        "use [] for statements without placeholders",
+        default=None,
+    ),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    timeout: float = Field(description="Seconds before the whole batch is cancelled", default=None),
+) -> str:
+    """Execute statements concurrently with a bounded number of queries in flight.
+
+    Args:
+        statements: The SQL statements to execute
+        params: Values bound to the ? placeholders of each statement, by position
+        output_format: json, columns, csv, tsv or arrow, applied to every statement
+        timeout: Seconds before the whole batch is cancelled, defaults to the server setting
+
+    Returns:
+        str: JSON array with per statement its index, status, elapsed_ms and the result or
+        the error; a statement failing or exceeding the scan budget does not stop the others
+    """
+    return await async_client.execute_batch(
+        statements, params, output_format=output_format, check=scan_estimator.check, timeout=timeout
+    )
+
+
+def spool_query(query: str, params: list | None) -> str:
+    """Stream a query result into the columnar spool, one fetched batch at a time."""
+    columns, batches = client.open_result(query, params=params)
+    if columns is None:
+        return "Query executed successfully (no results to spool)"
+    info = columnar_spool.write(columns, batches)
+    return json.dumps(info.describe())
+
+
+@mcp.tool(
+    description="Validate a SQL query without running it: returns syntax and semantic errors with their position, "
+    "or the planner's estimated rows and cost and the distribution of each join. Reads no data"
+)
+async def validate_query(
+    query: str = Field(description="The SQL query to validate"),
+    params: list = Field(description=PARAMS_DESCRIPTION, default=None),
+) -> str:
+    """Validate a query with EXPLAIN (TYPE VALIDATE) and summarize EXPLAIN (TYPE DISTRIBUTED).
+
+    Args:
+        query: The SQL query to validate
+        params: Values bound to the ? placeholders of the query, in order
+
+    Returns:
+        str: JSON object with valid and the error, or the estimate, scans, joins and fragments
+        of the distributed plan
+    """
+    return json.dumps(await async_client.validate_query(query, params))
+
+
+@mcp.tool(description="Estimate the partitions, files and bytes a query would scan, without running it")
+async def estimate_query_cost(
+    query: str = Field(description="The SQL query to estimate"),
+    params: list = Field(description=PARAMS_DESCRIPTION, default=None),
+) -> str:
+    """Estimate the scan of a query from its IO plan and the $partitions metadata of its tables.
+
+    Args:
+        query: The SQL query to estimate
+        params: Values bound to the ? placeholders of the query, in order
+
+    Returns:
+        str: JSON object with per table the partitions scanned out of the total, files, rows
+        and bytes, the total estimated bytes and whether they fit the configured scan budget
+    """
+    estimate = await async_client.run(scan_estimator.estimate, query, params)
+    return json.dumps(estimate)
+
+
+@mcp.tool(description="Fetch a page of a result returned by execute_query with page_size")
+async def fetch_page(
+    handle: str = Field(description="The result handle returned by execute_query"),
+    page: int = Field(description="Zero-based page number"),
+) -> str:
+    """Fetch a page of a spooled query result.
+
+    Args:
+        handle: The result handle returned by execute_query
+        page: Zero-based page number
+
+    Returns:
+        str: JSON object with the result metadata, has_more and the rows of the page
+    """
+    return await async_client.run(result_handles.fetch_page, handle, page, config.tool_timeout)
+
+
+@mcp.tool(description="Release a result handle and its spooled data")
+def close_result(handle: str = Field(description="The result handle returned by execute_query")) -> str:
+    """Release a result handle, cancelling its query if it is still running.
+
+    Args:
+        handle: The result handle returned by execute_query
+
+    Returns:
+        str: Confirmation message
+    """
+    if result_handles.close(handle):
+        return f"Result handle {handle} closed"
+    return f"Unknown or expired result handle: {handle}"
+
+
+@mcp.tool(description="Read rows of a result spooled by execute_query with spool, without querying Trino again")
+async def fetch_spooled_result(
+    spool_id: str = Field(description="The spool ID returned by execute_query"),
+    offset: int = Field(description="Index of the first row", default=0),
+    limit: int = Field(description="Maximum number of rows", default=100),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
+) -> str:
+    """Read a slice of a spooled result from its memory-mapped spool file.
+
+    Args:
+        spool_id: The spool ID returned by execute_query
+        offset: Index of the first row
+        limit: Maximum number of rows
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
+
+    Returns:
+        str: The rows in the requested encoding
+    """
+    return await async_client.run(columnar_spool.fetch, spool_id, offset, limit, output_format, columns)
+
+
+@mcp.tool(
+    description="Convert a result spooled by execute_query with spool to a file in the server's export directory, "
+    "without querying Trino again"
+)
+async def export_spooled_result(
+    spool_id: str = Field(description="The spool ID returned by execute_query"),
+    export_format: str = Field(description="File format: csv, tsv, parquet, arrow, ndjson or json"),
+    file_name: str = Field(description="Name of the file to write in the export directory, without a directory"),
+) -> str:
+    """Write a spooled result to a CSV, TSV, Parquet, Arrow, NDJSON or JSON file.
+
+    Files are only written inside the export directory (``TRINO_EXPORT_DIR``); names with a
+    directory part or resolving outside it are rejected.
+
+    Args:
+        spool_id: The spool ID returned by execute_query
+        export_format: csv, tsv, parquet, arrow, ndjson or json
+        file_name: Name of the file to write in the export directory
 
     Returns:
-        str: Query results formatted as a JSON string
+        str: Absolute path of the written file
     """
-    return client.execute_query(query)
+    path = await async_client.run(columnar_spool.export, spool_id, export_format, file_name)
+    return f"Spooled result {spool_id} exported to {path}"
 
 
 @mcp.tool(description="Optimize an Iceberg table's data files")
-def optimize(
+async def optimize(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table to optimize"),
@@ -152,11 +534,11 @@ def optimize(
     Returns:
         str: Confirmation message
     """
-    return client.optimize(catalog, schema_name, table)
+    return await async_client.optimize(catalog=catalog, schema=schema_name, table=table)
 
 
 @mcp.tool(description="Optimize manifest files for an Iceberg table")
-def optimize_manifests(
+async def optimize_manifests(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
@@ -171,11 +553,11 @@ def optimize_manifests(
     Returns:
         str: Confirmation message
     """
-    return client.optimize_manifests(catalog, schema_name, table)
+    return await async_client.optimize_manifests(catalog=catalog, schema=schema_name, table=table)
 
 
 @mcp.tool(description="Remove old snapshots from an Iceberg table")
-def expire_snapshots(
+async def expire_snapshots(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     retention_threshold: str = Field(
@@ -194,14 +576,52 @@ def expire_snapshots(
     Returns:
         str: Confirmation message
     """
-    return client.expire_snapshots(catalog, schema_name, table, retention_threshold)
+    return await async_client.expire_snapshots(
+        catalog=catalog, schema=schema_name, table=table, retention_threshold=retention_threshold
+    )
+
+
+@mcp.tool(
+    description="Show which Iceberg tables need maintenance, ranked by small files and snapshot backlog, "
+    "from the last scan of the maintenance scheduler"
+)
+def plan_maintenance(
+    limit: int = Field(description="maximum number of tables to list", default=20),
+) -> str:
+    """Show the Iceberg tables of the maintenance catalogs that would be maintained next.
+
+    The ranking is the one the scheduler daemon (``python maintenance.py``) saved after its
+    last scan; this server neither scans the tables' metadata nor runs maintenance, as its
+    tools are available to the LLM agents.
+
+    Args:
+        limit: maximum number of tables to list
+
+    Returns:
+        str: JSON object with the time of the last scan (null if the scheduler has not
+        scanned yet) and the tables, most urgent first, with their small file and
+        expirable snapshot counts and the actions that would run
+    """
+    return json.dumps(maintenance.last_plan(limit=limit))
+
+
+@mcp.tool(description="Show running Iceberg maintenance, table cooldowns and recent outcomes")
+def show_maintenance_status() -> str:
+    """Show running Iceberg maintenance, table cooldowns and recent outcomes.
+
+    Returns:
+        str: JSON-formatted maintenance status
+    """
+    return json.dumps(maintenance.status())
 
 
 @mcp.tool(description="Show statistics for a table")
-def show_stats(
+async def show_stats(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show statistics for a table.
 
@@ -209,44 +629,98 @@ def show_stats(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: Table statistics in JSON format
     """
-    return client.show_stats(catalog, schema_name, table)
-
-
-@mcp.tool(name="show_query_history", description="Get the history of executed queries")
-def show_query_history(
+    return await async_client.show_stats(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
+
+
+@mcp.tool(
+    name="show_query_history",
+    description="Get the history of executed queries, optionally filtered; with tail, only queries created since "
+    "the watermark of the previous call",
+)
+async def show_query_history(
     limit: int = Field(description="maximum number of history entries to return", default=None),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
+    user: str = Field(description="Only queries of this user", default=None),
+    source: str = Field(description="Only queries from this client source", default=None),
+    state: str = Field(description="Only queries in this state, e.g. RUNNING, FINISHED or FAILED", default=None),
+    since: str = Field(description="Only queries created at or after this ISO 8601 timestamp", default=None),
+    until: str = Field(description="Only queries created before this ISO 8601 timestamp", default=None),
+    watermark: str = Field(description="Watermark returned by the previous call; implies tail", default=None),
+    tail: bool = Field(description="Return the queries with a watermark to pass to the next call", default=False),
 ) -> str:
     """Get the history of executed queries.
 
     Args:
         limit: maximum number of history entries to return.
             If None, returns all entries.
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
+        user: Only queries of this user
+        source: Only queries from this client source
+        state: Only queries in this state
+        since: Only queries created at or after this ISO 8601 timestamp
+        until: Only queries created before this ISO 8601 timestamp
+        watermark: Watermark returned by the previous call
+        tail: Return the queries with a watermark to pass to the next call
 
     Returns:
-        str: JSON-formatted string containing query history.
+        str: JSON-formatted string containing query history, wrapped with the next watermark when tailing.
     """
-    return client.get_query_history(limit)
+    return await async_client.get_query_history(
+        limit=limit,
+        output_format=output_format,
+        columns=columns,
+        user=user,
+        source=source,
+        state=state,
+        since=since,
+        until=until,
+        watermark=watermark,
+        tail=tail,
+    )
 
 
 @mcp.tool(description="Show a hierarchical tree view of catalogs, schemas, and tables")
-def show_catalog_tree() -> str:
+async def show_catalog_tree(
+    depth: int = Field(description="1 for catalogs only, 2 to add schemas, 3 to add tables", default=3),
+    catalog_pattern: str = Field(description="SQL LIKE pattern for catalog names", default=None),
+    schema_pattern: str = Field(description="SQL LIKE pattern for schema names", default=None),
+    table_pattern: str = Field(description="SQL LIKE pattern for table names", default=None),
+) -> str:
     """Get a hierarchical tree view showing the full structure of catalogs, schemas, and tables.
 
+    Args:
+        depth: 1 for catalogs only, 2 to add schemas, 3 to add tables
+        catalog_pattern: SQL LIKE pattern for catalog names
+        schema_pattern: SQL LIKE pattern for schema names
+        table_pattern: SQL LIKE pattern for table names
+
     Returns:
         str: A formatted string showing the catalog > schema > table hierarchy with visual indicators
     """
-    return client.show_catalog_tree()
+    return await async_client.show_catalog_tree(depth, catalog_pattern, schema_pattern, table_pattern)
 
 
 @mcp.tool(description="Show Iceberg table properties")
-def show_table_properties(
+async def show_table_properties(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table properties.
 
@@ -254,18 +728,28 @@ def show_table_properties(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table properties
     """
-    return client.show_table_properties(catalog, schema_name, table)
+    return await async_client.show_table_properties(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table history/changelog")
-def show_table_history(
+async def show_table_history(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table history/changelog.
 
@@ -279,18 +763,28 @@ def show_table_history(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table history
     """
-    return client.show_table_history(catalog, schema_name, table)
+    return await async_client.show_table_history(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show metadata for the table")
-def show_metadata_log_entries(
+async def show_metadata_log_entries(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table metadata log entries.
 
@@ -305,18 +799,28 @@ def show_metadata_log_entries(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted metadata log entries
     """
-    return client.show_metadata_log_entries(catalog, schema_name, table)
+    return await async_client.show_metadata_log_entries(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table snapshots")
-def show_snapshots(
+async def show_snapshots(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table snapshots.
 
@@ -332,19 +836,29 @@ def show_snapshots(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table snapshots
     """
-    return client.show_snapshots(catalog, schema_name, table)
+    return await async_client.show_snapshots(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table manifests")
-def show_manifests(
+async def show_manifests(
     catalog: str = Field(description="catalog name"),
     schema_name: str = Field(description="schema name"),
     table: str = Field(description="The name of the table"),
     all_snapshots: bool = False,
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table manifests for current or all snapshots.
 
@@ -366,18 +880,29 @@ def show_manifests(
         schema_name: schema name
         table: The name of the table
         all_snapshots: If True, show manifests from all snapshots
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table manifests
     """
-    return client.show_manifests(catalog, schema_name, table, all_snapshots)
+    return await async_client.show_manifests(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        all_snapshots=all_snapshots,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table partitions")
-def show_partitions(
+async def show_partitions(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table partitions.
 
@@ -392,18 +917,28 @@ def show_partitions(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table partitions
     """
-    return client.show_partitions(catalog, schema_name, table)
+    return await async_client.show_partitions(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table data files")
-def show_files(
+async def show_files(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table data files in current snapshot.
 
@@ -427,19 +962,124 @@ def show_files(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table files info
     """
-    return client.show_files(catalog, schema_name, table)
+    return await async_client.show_files(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
+
+
+@mcp.tool(description="Summarize an Iceberg table's data files: size histogram, partition skew, deletes, advice")
+async def analyze_files(
+    catalog: str = Field(description="catalog name "),
+    schema_name: str = Field(description="schema name "),
+    table: str = Field(description="The name of the table"),
+    top: int = Field(description="number of partitions to report, most in need of compaction first", default=20),
+) -> str:
+    """Analyze the file layout of an Iceberg table instead of listing its files.
+
+    The summary contains:
+    - file_size_histogram: Number of data files per size bucket
+    - small_files: Data files below the small-file threshold
+    - top_partitions: Per partition the file counts and sizes, skew against the median
+      partition, delete file ratio and a compaction recommendation
+
+    Args:
+        catalog: catalog name
+        schema_name: schema name
+        table: The name of the table
+        top: number of partitions to report
+
+    Returns:
+        str: JSON-formatted file layout summary
+    """
+    summary = await async_client.run(file_analyzer.analyze, catalog=catalog, schema=schema_name, table=table, top=top)
+    return json.dumps(summary)
+
+
+@mcp.tool(
+    description="Bring a CSV export of an Iceberg table up to date by reading only the data appended since a snapshot"
+)
+async def read_incremental(
+    catalog: str = Field(description="catalog name "),
+    schema_name: str = Field(description="schema name "),
+    table: str = Field(description="The name of the table"),
+    file_name: str = Field(
+        description="Name of the CSV file in the export directory holding the previous export, without a directory; "
+        "created if missing"
+    ),
+    since_snapshot_id: int = Field(
+        description="snapshot_id returned by the previous call; omit to rebuild the export", default=None
+    ),
+    columns: list[str] = Field(description="Columns to export, in this order; defaults to all", default=None),
+    where: str = Field(
+        description="Optional filter condition, inserted into the query as raw SQL, e.g. \"day >= CAST(? AS DATE)\"; "
+        "pass values through params and the ? placeholders instead of writing them into the filter",
+        default=None,
+    ),
+    params: list = Field(description=PARAMS_DESCRIPTION, default=None),
+    distinct: bool = Field(description="Export distinct rows, also across runs", default=False),
+    timeout: float = Field(description="Seconds before the query is cancelled", default=None),
+) -> str:
+    """Append the rows added since a snapshot to a CSV export.
+
+    Only appended snapshots are read incrementally; otherwise the export is rebuilt from
+    the current snapshot. Exports are only written inside the export directory
+    (``TRINO_EXPORT_DIR``); names with a directory part or resolving outside it are rejected.
+
+    Args:
+        catalog: catalog name
+        schema_name: schema name
+        table: The name of the table
+        file_name: Name of the CSV file in the export directory holding the previous export
+        since_snapshot_id: snapshot_id returned by the previous call
+        columns: Columns to export, in this order
+        where: Optional filter condition, inserted as raw SQL
+        params: Values bound to the ? placeholders of the filter, in order
+        distinct: Export distinct rows
+        timeout: Seconds before the query is cancelled, defaults to the server setting
+
+    Returns:
+        str: JSON object with the mode (incremental, full or unchanged), the snapshot_id to
+        pass to the next call, the rows added and the export file name
+
+    Raises:
+        ScanBudgetExceededError: If a scan budget is configured and the read is estimated
+            to scan more than it
+    """
+    result = await async_client.run(
+        incremental_reader.read_since,
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        file_name=file_name,
+        since_snapshot_id=since_snapshot_id,
+        columns=columns,
+        where=where,
+        params=params,
+        distinct=distinct,
+        check=scan_estimator.check,
+        timeout=timeout,
+    )
+    return json.dumps(result)
 
 
 @mcp.tool(description="Show Iceberg table manifest entries")
-def show_entries(
+async def show_entries(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
     all_snapshots: bool = False,
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table manifest entries for current or all snapshots.
 
@@ -456,18 +1096,29 @@ def show_entries(
         schema_name: schema name
         table: The name of the table
         all_snapshots: If True, show entries from all snapshots
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted manifest entries
     """
-    return client.show_entries(catalog, schema_name, table, all_snapshots)
+    return await async_client.show_entries(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        all_snapshots=all_snapshots,
+        output_format=output_format,
+        columns=columns,
+    )
 
 
 @mcp.tool(description="Show Iceberg table references (branches and tags)")
-def show_refs(
+async def show_refs(
     catalog: str = Field(description="catalog name "),
     schema_name: str = Field(description="schema name "),
     table: str = Field(description="The name of the table"),
+    output_format: str = Field(description=OUTPUT_FORMAT_DESCRIPTION, default="json"),
+    columns: list[str] = Field(description=COLUMNS_DESCRIPTION, default=None),
 ) -> str:
     """Show Iceberg table references (branches and tags).
 
@@ -483,11 +1134,123 @@ def show_refs(
         catalog: catalog name
         schema_name: schema name
         table: The name of the table
+        output_format: json, columns, csv, tsv or arrow
+        columns: Only return these columns, in this order
 
     Returns:
         str: JSON-formatted table references
     """
-    return client.show_refs(catalog, schema_name, table)
+    return await async_client.show_refs(
+        catalog=catalog,
+        schema=schema_name,
+        table=table,
+        output_format=output_format,
+        columns=columns,
+    )
+
+
+@mcp.tool(description="Show hit/miss counters of the metadata cache")
+def show_metadata_cache_stats() -> str:
+    """Show hit/miss counters of the catalog, schema and table metadata cache.
+
+    Returns:
+        str: JSON-formatted cache counters
+    """
+    return client.metadata_cache_stats()
+
+
+@mcp.tool(description="Show runtime statistics of recent queries per tool and per agent")
+def show_query_stats(
+    limit: int = Field(description="number of most recent queries to list", default=20),
+) -> str:
+    """Show runtime statistics of the queries run by this server.
+
+    Summaries include p50/p90/p99/max of elapsed, queued and CPU time, processed bytes and
+    peak memory, overall, per tool and per calling agent.
+
+    Args:
+        limit: number of most recent queries to list
+
+    Returns:
+        str: JSON-formatted statistics
+    """
+    return client.get_query_stats(limit)
+
+
+@mcp.tool(description="Show hit/miss counters of the query result cache")
+def show_result_cache_stats() -> str:
+    """Show hit/miss counters of the snapshot-keyed query result cache.
+
+    Returns:
+        str: JSON-formatted cache counters
+    """
+    return client.result_cache_stats()
+
+
+@mcp.tool(description="Show the health, queued and running queries, and pool usage of each Trino coordinator")
+def show_coordinators() -> str:
+    """Show the coordinators queries are routed to.
+
+    Returns:
+        str: JSON-formatted list with per coordinator its health, load as of the last probe,
+        number of sticky routing keys and connection pool occupancy
+    """
+    return client.coordinator_status()
+
+
+@mcp.tool(description="Invalidate cached metadata after changes made outside this server")
+def invalidate_metadata_cache(
+    catalog: str = Field(description="catalog name, omit to clear the whole cache", default=None),
+    schema_name: str = Field(description="schema name", default=None),
+    table: str = Field(description="The name of the table", default=None),
+) -> str:
+    """Invalidate cached metadata for an object and the listings that contain it.
+
+    Args:
+        catalog: catalog name, omit to clear the whole cache
+        schema_name: schema name
+        table: The name of the table
+
+    Returns:
+        str: Confirmation message
+    """
+    removed = client.invalidate_metadata(catalog, schema_name, table)
+    return f"Invalidated {removed} cached metadata entries"
+
+
+@mcp.tool(
+    description="Show a compact digest of the work-order schema: columns and types, partition keys, row counts "
+    "and frequent values of key columns of every table. Read it once instead of describing tables one by one"
+)
+async def show_schema_digest(
+    refresh: bool = Field(description="Rebuild the digest now instead of using the cached one", default=False),
+) -> str:
+    """Return the cached schema digest, refreshed in the background once stale.
+
+    Args:
+        refresh: Rebuild the digest before returning it
+
+    Returns:
+        str: The digest as compact text
+    """
+    if refresh:
+        digest = await async_client.run(schema_digest.refresh, force=True, timeout=config.tool_timeout)
+    else:
+        digest = await async_client.run(schema_digest.get, timeout=config.tool_timeout)
+    return digest["text"]
+
+
+# Resources
+@mcp.resource(
+    "trino://schema-digest",
+    name="schema_digest",
+    description="Compact digest of the work-order schema: columns, partition keys, row counts and frequent values",
+    mime_type="text/plain",
+)
+async def schema_digest_resource() -> str:
+    """Return the cached schema digest, refreshed in the background once stale."""
+    digest = await async_client.run(schema_digest.get, timeout=config.tool_timeout)
+    return digest["text"]
 
 
 # Prompts
@@ -538,4 +1301,7 @@ def maintain_iceberg(table: str, catalog: str, schema_name: str) -> list[base.Me
     ]
 
 if __name__ == "__main__":
-    mcp.run()
+    if config.mcp_transport != "stdio":
+        # A shared server prepares the digest before the first agent asks for it.
+        schema_digest.refresh_in_background()
+    mcp.run(config.mcp_transport)
@@ -0,0 +1,119 @@
+"""Shared setup of the trino-mcp unit tests.
+
+trino-mcp is a directory of scripts rather than a package, so its modules are imported
+from the directory itself, ahead of the repository's own ``config`` package.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from config import TrinoConfig  # noqa: E402
+from trino_client import TrinoClient  # noqa: E402
+
+
+class FakeCursor:
+    """DB API cursor answering from the canned results of a :class:`FakeTrino`."""
+
+    def __init__(self, server: "FakeTrino"):
+        self.server = server
+        self.description = None
+        self.stats: dict = {}
+        self._rows: list = []
+
+    def execute(self, query: str, params: list | None = None) -> "FakeCursor":
+        self.server.queries.append((query, params))
+        self.stats = {"queryId": f"q{len(self.server.queries)}", "state": "FINISHED", "elapsedTimeMillis": 5}
+        for pattern, result in self.server.results.items():
+            if pattern in query:
+                if isinstance(result, Exception):
+                    raise result
+                columns, rows = result
+                self.description = [(name, type_) for name, type_ in columns] if columns else None
+                self._rows = list(rows)
+                return self
+        self.description, self._rows = None, []
+        return self
+
+    def fetchmany(self, size: int = 1) -> list:
+        self.server.fetches.append(size)
+        time.sleep(self.server.fetch_delay)
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self) -> list:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def cancel(self) -> None:
+        self.server.cancelled += 1
+
+
+class FakeConnection:
+    def __init__(self, server: "FakeTrino"):
+        self.server = server
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.server)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeTrino:
+    """In-process stand-in of a coordinator.
+
+    Attributes:
+        results (dict): ``(columns, rows)`` or an exception to raise, by a substring of the
+            query; queries matching none have no result set.
+        queries (list): ``(query, params)`` of every executed query.
+        fetches (list): Size of every ``fetchmany`` call.
+        fetch_delay (float): Seconds every ``fetchmany`` call takes.
+        cancelled (int): Number of cancelled cursors.
+        connections (int): Number of connections opened.
+    """
+
+    def __init__(self):
+        self.results: dict = {}
+        self.queries: list = []
+        self.fetches: list = []
+        self.fetch_delay = 0.0
+        self.cancelled = 0
+        self.connections = 0
+
+    def connect(self, **kwargs) -> FakeConnection:
+        self.connections += 1
+        return FakeConnection(self)
+
+
+@pytest.fixture
+def fake_trino(monkeypatch) -> FakeTrino:
+    """Route every ``trino.dbapi.connect`` of the test to a :class:`FakeTrino`."""
+    import trino
+
+    server = FakeTrino()
+    monkeypatch.setattr(trino.dbapi, "connect", server.connect)
+    return server
+
+
+@pytest.fixture
+def client(fake_trino, tmp_path) -> TrinoClient:
+    """A client whose connections are served by ``fake_trino``, without a result cache."""
+    return TrinoClient(
+        TrinoConfig(
+            host="localhost",
+            port=8080,
+            user="test",
+            catalog="hive",
+            schema="default",
+            result_cache_dir=str(tmp_path / "results"),
+            result_cache_max_bytes=0,
+        )
+    )
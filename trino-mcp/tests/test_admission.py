@@ -0,0 +1,140 @@
+"""Tests of the AIMD admission controller."""
+
+import threading
+import time
+
+import pytest
+import trino
+
+from admission import AdmissionController, AdmissionTimeoutError
+from trino_client import QueryCancelledError
+
+
+def test_slots_are_capped_at_the_limit():
+    controller = AdmissionController(2, timeout=0.05)
+    with controller.slot(), controller.slot():
+        assert controller.status()["in_flight"] == 2
+        with pytest.raises(AdmissionTimeoutError):
+            with controller.slot():
+                pass
+    status = controller.status()
+    assert status["in_flight"] == 0
+    assert status["timeouts"] == 1
+    assert status["waiting"] == 0
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    controller = AdmissionController(1)
+    admitted = []
+
+    def wait(name):
+        with controller.slot():
+            admitted.append(name)
+
+    with controller.slot():
+        threads = []
+        for name in ("first", "second", "third"):
+            thread = threading.Thread(target=wait, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while controller.status()["waiting"] < len(threads):
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+    assert admitted == ["first", "second", "third"]
+
+
+def test_slow_query_halves_the_limit_down_to_the_minimum():
+    controller = AdmissionController(8, min_limit=3, target_queue_ms=1000)
+    for expected in (4, 3, 3):
+        controller.record(time.monotonic(), queued_ms=5000, elapsed_ms=6000)
+        assert controller.limit == expected
+
+
+def test_queries_admitted_before_a_decrease_do_not_decrease_again():
+    controller = AdmissionController(8, target_queue_ms=1000)
+    admitted_before = time.monotonic()
+    controller.record(admitted_before, queued_ms=5000, elapsed_ms=6000)
+    controller.record(admitted_before, queued_ms=5000, elapsed_ms=6000)
+    assert controller.limit == 4
+    assert controller.status()["decreases"] == 1
+
+
+def test_fast_queries_increase_the_limit_by_about_one_per_limit_queries():
+    controller = AdmissionController(8, target_queue_ms=1000)
+    controller.record(time.monotonic(), queued_ms=5000, elapsed_ms=6000)
+    for _ in range(4):
+        controller.record(time.monotonic(), queued_ms=10, elapsed_ms=100)
+    assert controller.limit == 4
+    controller.record(time.monotonic(), queued_ms=10, elapsed_ms=100)
+    assert controller.limit == 5
+    for _ in range(20):
+        controller.record(time.monotonic(), queued_ms=10, elapsed_ms=100)
+    assert controller.limit == 8
+
+
+def test_latency_target_and_overload_errors_decrease_the_limit():
+    controller = AdmissionController(8, target_latency_ms=1000)
+    controller.record(time.monotonic(), queued_ms=0, elapsed_ms=2000)
+    assert controller.limit == 4
+    with controller.slot() as ticket:
+        ticket.record({"queuedTimeMillis": 0, "elapsedTimeMillis": 10}, "QUERY_QUEUE_FULL")
+        ticket.record({"queuedTimeMillis": 0, "elapsedTimeMillis": 10}, "QUERY_QUEUE_FULL")
+    assert controller.limit == 2
+
+
+def test_increase_admits_waiting_callers():
+    controller = AdmissionController(2, target_queue_ms=1000)
+    controller.record(time.monotonic(), queued_ms=5000, elapsed_ms=0)
+    admitted = threading.Event()
+
+    def wait():
+        with controller.slot():
+            admitted.set()
+
+    with controller.slot():
+        thread = threading.Thread(target=wait)
+        thread.start()
+        while controller.status()["waiting"] == 0:
+            time.sleep(0.001)
+        controller.record(time.monotonic(), queued_ms=0, elapsed_ms=0)
+        assert admitted.wait(5)
+    thread.join(5)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(1, timeout=5)
+    cancelled = threading.Event()
+
+    def check():
+        if cancelled.is_set():
+            raise QueryCancelledError
+
+    with controller.slot():
+        cancelled.set()
+        with pytest.raises(QueryCancelledError):
+            with controller.slot(check):
+                pass
+        assert controller.status()["waiting"] == 0
+    with controller.slot():
+        assert controller.status()["in_flight"] == 1
+
+
+def test_stream_holds_its_slot_until_closed(client, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(i,) for i in range(4)])
+    stream = client.stream_query("SELECT * FROM t", batch_size=1)
+    next(stream)
+    assert client.admission.status()["in_flight"] == 1
+    stream.close()
+    assert client.admission.status()["in_flight"] == 0
+
+
+def test_coordinator_queue_full_errors_decrease_the_client_limit(client, fake_trino):
+    fake_trino.results["FROM t"] = trino.exceptions.TrinoQueryError(
+        {"errorName": "QUERY_QUEUE_FULL", "message": "Too many queued queries"}
+    )
+    limit = client.admission.limit
+    with pytest.raises(trino.exceptions.TrinoQueryError):
+        client.execute_query("SELECT * FROM t", use_cache=False)
+    assert client.admission.limit == limit // 2
+    assert client.admission.status()["in_flight"] == 0
@@ -0,0 +1,107 @@
+"""Tests of the asyncio interface: worker pool calls, timeouts and query cancellation."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from async_trino_client import AsyncTrinoClient, QueryTimeoutError
+from query_stats import query_tags, tag_queries
+from trino_client import QueryCancelledError, QueryCancelScope, current_cancel_scope
+
+COLUMNS = [("id", "bigint")]
+
+
+@pytest.fixture
+def async_client(client):
+    async_client = AsyncTrinoClient(client, max_workers=2, timeout=5)
+    yield async_client
+    async_client.shutdown()
+
+
+def test_client_methods_are_coroutines(async_client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(1,)])
+    assert json.loads(asyncio.run(async_client.execute_query("SELECT id FROM t"))) == [{"id": 1}]
+    with pytest.raises(AttributeError):
+        async_client._fetch_rows  # noqa: B018
+
+
+def test_blocking_calls_do_not_block_the_event_loop(async_client):
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(async_client.run(time.sleep, 0.1), ticker())
+
+    asyncio.run(main())
+    assert len(ticks) == 5
+
+
+def test_timeout_cancels_the_running_query_on_the_coordinator(async_client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(1,)])
+    fake_trino.fetch_delay = 0.3
+
+    with pytest.raises(QueryTimeoutError, match="timed out after 0.1 seconds"):
+        asyncio.run(async_client.execute_query("SELECT id FROM t", timeout=0.1))
+    assert fake_trino.cancelled >= 1
+    assert async_client.client.router.pools["localhost:8080"].stats()["in_use"] == 0
+
+
+def test_queries_under_a_cancelled_scope_fail_before_they_start(client, fake_trino):
+    scope = QueryCancelScope()
+    scope.cancel()
+    token = current_cancel_scope.set(scope)
+    try:
+        with pytest.raises(QueryCancelledError):
+            client.execute_query("SELECT 1")
+    finally:
+        current_cancel_scope.reset(token)
+    assert fake_trino.queries == []
+
+
+def test_closing_a_stream_early_cancels_the_query(client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(i,) for i in range(5)])
+    stream = client.stream_query("SELECT * FROM t", batch_size=2)
+    next(stream)
+    stream.close()
+    assert fake_trino.cancelled == 1
+
+
+def test_stream_yields_each_batch_and_finishes_without_cancelling(async_client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(i,) for i in range(5)])
+
+    async def collect():
+        return [chunk async for chunk in async_client.stream_query("SELECT id FROM t", batch_size=2)]
+
+    chunks = asyncio.run(collect())
+    assert [json.loads(line)["id"] for chunk in chunks for line in chunk.splitlines()] == [0, 1, 2, 3, 4]
+    assert fake_trino.cancelled == 0
+
+
+def test_stream_timeout_cancels_the_query(async_client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(i,) for i in range(100)])
+    fake_trino.fetch_delay = 0.02
+
+    async def collect():
+        return [chunk async for chunk in async_client.stream_query("SELECT id FROM t", batch_size=1, timeout=0.1)]
+
+    with pytest.raises(QueryTimeoutError):
+        asyncio.run(collect())
+    assert fake_trino.cancelled >= 1
+    assert len(fake_trino.fetches) < 100
+
+
+def test_calls_see_the_caller_tags_and_their_tool_name(async_client):
+    def tags():
+        return dict(query_tags.get())
+
+    async def call():
+        with tag_queries(agent="sql_agent"):
+            return await async_client.run(tags)
+
+    assert asyncio.run(call()) == {"agent": "sql_agent", "tool": "tags"}
@@ -0,0 +1,103 @@
+"""Tests of the catalog tree built from one information_schema query per catalog."""
+
+import threading
+import time
+
+import trino
+
+
+def answer_metadata(client, branches: dict):
+    """Answer the catalog list and each catalog's schema and table query; return the queries run."""
+    queries = []
+
+    def fetch_rows(query, params=None):
+        queries.append((query, params))
+        if "system.metadata.catalogs" in query:
+            return [(catalog,) for catalog in branches]
+        catalog = query.split(" FROM ", 1)[1].split(".", 1)[0]
+        if isinstance(branches[catalog], Exception):
+            raise branches[catalog]
+        return branches[catalog]
+
+    client._fetch_rows = fetch_rows
+    return queries
+
+
+def test_one_query_per_catalog(client):
+    queries = answer_metadata(
+        client,
+        {
+            "iceberg": [("db", "events"), ("db", "clicks"), ("empty", None)],
+            "hive": [("default", "t_event")],
+        },
+    )
+    tree = client.show_catalog_tree()
+    assert tree.splitlines() == ["hive", "default", " t_event", "iceberg", "db", " clicks", " events", "empty"]
+    assert len(queries) == 3
+
+
+def test_patterns_are_bound_and_depth_limits_the_tree(client):
+    queries = answer_metadata(client, {"hive": [("default", None)]})
+    assert client.show_catalog_tree(depth=2, catalog_pattern="h%", schema_pattern="it's%") == "hive\ndefault"
+    assert queries[0] == ("SELECT catalog_name FROM system.metadata.catalogs WHERE catalog_name LIKE ?", ["h%"])
+    assert "information_schema.tables" not in queries[1][0]
+    assert queries[1][0].endswith("WHERE s.schema_name LIKE ?")
+    assert queries[1][1] == ["it's%"]
+
+
+def test_table_pattern_is_bound_after_the_schema_pattern(client):
+    queries = answer_metadata(client, {"hive": [("default", "t_event")]})
+    client.show_catalog_tree(schema_pattern="d%", table_pattern="t\\_%")
+    assert queries[1][0].endswith("WHERE s.schema_name LIKE ? AND t.table_name LIKE ?")
+    assert queries[1][1] == ["d%", "t\\_%"]
+
+
+def test_depth_one_lists_catalogs_only(client):
+    queries = answer_metadata(client, {"hive": [], "iceberg": []})
+    assert client.show_catalog_tree(depth=1) == "hive\niceberg"
+    assert len(queries) == 1
+
+
+def test_catalogs_are_read_concurrently_within_the_worker_limit(client):
+    client.config.catalog_tree_workers = 2
+    lock = threading.Lock()
+    running, peak = 0, 0
+    branches = {f"c{i}": [("s", "t")] for i in range(6)}
+    queries = answer_metadata(client, branches)
+    fetch_rows = client._fetch_rows
+
+    def counting_fetch_rows(query, params=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        try:
+            return fetch_rows(query, params)
+        finally:
+            with lock:
+                running -= 1
+
+    client._fetch_rows = counting_fetch_rows
+    tree = client.show_catalog_tree()
+    assert tree.splitlines()[:3] == ["c0", "s", " t"]
+    assert len(queries) == 7
+    assert peak == 2
+
+
+def test_catalog_that_cannot_be_read_is_reported(client):
+    answer_metadata(
+        client,
+        {"broken": trino.exceptions.TrinoQueryError({"message": "Access denied"}), "hive": [("default", "t")]},
+    )
+    assert client.show_catalog_tree().splitlines() == ["broken", "Unable to list schemas", "hive", "default", " t"]
+
+
+def test_tree_is_cached_until_invalidated(client):
+    queries = answer_metadata(client, {"hive": [("default", "t")]})
+    client.show_catalog_tree()
+    client.show_catalog_tree()
+    assert len(queries) == 2
+    client.invalidate_metadata("hive", "default", "t")
+    client.show_catalog_tree()
+    assert len(queries) == 4
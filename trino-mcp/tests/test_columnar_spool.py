@@ -0,0 +1,140 @@
+"""Tests of the columnar spool: writing, reading back, exporting and cleanup."""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from columnar_spool import ColumnarSpool, SpoolError
+
+COLUMNS = [("id", "bigint"), ("name", "varchar")]
+
+
+@pytest.fixture
+def spool(tmp_path) -> ColumnarSpool:
+    return ColumnarSpool(str(tmp_path / "spool"), ttl=3600, export_dir=str(tmp_path / "exports"))
+
+
+def test_written_result_is_read_back_in_slices(spool):
+    info = spool.write(COLUMNS, iter([[(1, "a"), (2, "b")], [], [(3, None)]]))
+    assert info.rows == 3
+    assert info.columns == [{"name": "id", "type": "bigint"}, {"name": "name", "type": "varchar"}]
+    rows = json.loads(spool.fetch(info.spool_id, offset=1, limit=5))
+    assert rows == [{"id": 2, "name": "b"}, {"id": 3, "name": None}]
+
+
+def test_nested_and_typed_values_survive_the_spool(spool):
+    columns = [
+        ("amount", "decimal(10,2)"),
+        ("created", "timestamp(3) with time zone"),
+        ("counts", "map(varchar, integer)"),
+        ("source", "row(pkg_name varchar, version integer)"),
+    ]
+    row = (Decimal("1.50"), datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), {"install": 3}, ("app", 2))
+    info = spool.write(columns, iter([[row]]))
+    assert json.loads(spool.fetch(info.spool_id)) == [
+        {
+            "amount": "1.50",
+            "created": "2024-05-01 12:30:00+00:00",
+            "counts": {"install": 3},
+            "source": ["app", 2],
+        }
+    ]
+
+
+def test_failed_write_leaves_no_file_and_closes_the_batches(spool):
+    closed = []
+
+    def batches():
+        try:
+            yield [(1, "a")]
+            yield [("not a number", "b")]
+        finally:
+            closed.append(True)
+
+    with pytest.raises(pa.ArrowInvalid):
+        spool.write(COLUMNS, batches())
+    assert closed == [True]
+    assert os.listdir(spool.directory) == []
+
+
+@pytest.mark.parametrize(
+    ("export_format", "expected"),
+    [
+        ("csv", 'id,name\n1,"a,b"\n2,\n'),
+        ("tsv", "id\tname\n1\ta,b\n2\t\n"),
+        ("ndjson", '{"id":1,"name":"a,b"}\n{"id":2,"name":null}\n'),
+        ("json", '[{"id":1,"name":"a,b"},{"id":2,"name":null}]'),
+    ],
+)
+def test_text_exports(spool, export_format, expected):
+    info = spool.write(COLUMNS, iter([[(1, "a,b"), (2, None)]]))
+    path = spool.export(info.spool_id, export_format, f"result.{export_format}")
+    assert path == os.path.join(os.path.realpath(spool.export_dir), f"result.{export_format}")
+    with open(path, encoding="utf-8", newline="") as f:
+        assert f.read() == expected
+
+
+def test_empty_result_exports_a_header_or_an_empty_list(spool):
+    info = spool.write(COLUMNS, iter([]))
+    assert info.rows == 0
+    with open(spool.export(info.spool_id, "csv", "r.csv"), encoding="utf-8") as f:
+        assert f.read() == "id,name\n"
+    with open(spool.export(info.spool_id, "json", "r.json"), encoding="utf-8") as f:
+        assert f.read() == "[]"
+
+
+def test_parquet_export_keeps_the_column_types(spool):
+    info = spool.write([("amount", "decimal(10,2)")], iter([[(Decimal("1.50"),)]]))
+    path = spool.export(info.spool_id, "parquet", "result.parquet")
+    table = pq.read_table(path)
+    assert table.schema.field("amount").type == pa.decimal128(10, 2)
+    assert table.column("amount").to_pylist() == [Decimal("1.50")]
+
+
+@pytest.mark.parametrize("file_name", ["", ".", "..", "../result.csv", "/tmp/result.csv", "sub/result.csv", "a\\b.csv"])
+def test_export_rejects_paths(spool, file_name):
+    info = spool.write(COLUMNS, iter([[(1, "a")]]))
+    with pytest.raises(SpoolError, match="Invalid export file name"):
+        spool.export(info.spool_id, "csv", file_name)
+
+
+def test_export_rejects_links_out_of_the_export_directory(spool, tmp_path):
+    info = spool.write(COLUMNS, iter([[(1, "a")]]))
+    os.makedirs(spool.export_dir)
+    os.symlink(tmp_path / "outside.csv", os.path.join(spool.export_dir, "link.csv"))
+    with pytest.raises(SpoolError, match="outside the export directory"):
+        spool.export(info.spool_id, "csv", "link.csv")
+    assert not (tmp_path / "outside.csv").exists()
+
+
+def test_unknown_format_and_ids_are_rejected(spool):
+    info = spool.write(COLUMNS, iter([[(1, "a")]]))
+    with pytest.raises(SpoolError, match="Unsupported export format"):
+        spool.export(info.spool_id, "xlsx", "result.xlsx")
+    with pytest.raises(SpoolError, match="Invalid spool ID"):
+        spool.read("../" + info.spool_id)
+    with pytest.raises(SpoolError, match="Unknown or expired spool ID"):
+        spool.read("0" * 32)
+
+def test_deleted_spool_is_gone_and_deleting_again_is_harmless(spool):
+    info = spool.write(COLUMNS, iter([[(1, "a")]]))
+    spool.delete(info.spool_id)
+    spool.delete(info.spool_id)
+    assert os.listdir(spool.directory) == []
+    with pytest.raises(SpoolError, match="Unknown or expired spool ID"):
+        spool.read(info.spool_id)
+
+
+def test_idle_spool_files_expire(spool):
+    old = spool.write(COLUMNS, iter([[(1, "a")]]))
+    stale = time.time() - 7200
+    os.utime(old.path, (stale, stale))
+    spool.write(COLUMNS, iter([[(2, "b")]]))
+    with pytest.raises(SpoolError, match="Unknown or expired spool ID"):
+        spool.read(old.spool_id)
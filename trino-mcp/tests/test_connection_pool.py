@@ -0,0 +1,140 @@
+"""Tests of the bounded Trino connection pool."""
+
+import threading
+import time
+
+import pytest
+import trino
+
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+CONNECT_KWARGS = {"host": "localhost", "port": 8080, "user": "test"}
+
+
+def test_connections_are_reused(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert fake_trino.connections == 1
+    assert pool.stats() == {"max_size": 2, "in_use": 0, "idle": 1}
+
+
+def test_concurrent_callers_never_exceed_the_pool_size(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS, max_size=3)
+    lock = threading.Lock()
+    peak = 0
+
+    def work():
+        nonlocal peak
+        with pool.connection():
+            with lock:
+                peak = max(peak, pool.stats()["in_use"])
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 3
+    assert fake_trino.connections <= 3
+    assert pool.stats() == {"max_size": 3, "in_use": 0, "idle": fake_trino.connections}
+
+
+def test_checkout_waits_for_a_free_connection_and_times_out(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS, max_size=1, checkout_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError, match="after 0.05 seconds"):
+            with pool.connection():
+                pass
+    with pool.connection():
+        pass
+
+
+def test_failed_connect_releases_the_slot(monkeypatch):
+    pool = ConnectionPool(CONNECT_KWARGS, max_size=1, checkout_timeout=0.05)
+
+    def refuse(**kwargs):
+        raise trino.exceptions.OperationalError("connection refused")
+
+    monkeypatch.setattr(trino.dbapi, "connect", refuse)
+    for _ in range(2):
+        with pytest.raises(trino.exceptions.OperationalError):
+            with pool.connection():
+                pass
+    assert pool.stats()["in_use"] == 0
+
+
+def test_connection_is_dropped_after_a_transport_error(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS)
+    with pytest.raises(trino.exceptions.HttpError):
+        with pool.connection():
+            raise trino.exceptions.HttpError("502 Bad Gateway")
+    assert pool.stats()["idle"] == 0
+    with pool.connection():
+        pass
+    assert fake_trino.connections == 2
+
+
+def test_query_errors_keep_the_connection(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS)
+    with pytest.raises(trino.exceptions.TrinoUserError):
+        with pool.connection():
+            raise trino.exceptions.TrinoUserError({"message": "Table not found"})
+    assert pool.stats()["idle"] == 1
+
+
+def test_recently_used_connection_is_not_health_checked(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS, health_check_interval=60)
+    for _ in range(2):
+        with pool.connection():
+            pass
+    assert fake_trino.queries == []
+
+
+def test_stale_idle_connection_is_replaced_when_unhealthy(fake_trino):
+    pool = ConnectionPool(CONNECT_KWARGS, health_check_interval=0)
+    with pool.connection():
+        pass
+    fake_trino.results["SELECT 1"] = ConnectionError("connection reset")
+    with pool.connection():
+        pass
+    assert [query for query, _ in fake_trino.queries] == ["SELECT 1"]
+    assert fake_trino.connections == 2
+
+
+def test_stream_holds_its_connection_until_closed(client, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(i,) for i in range(4)])
+    stream = client.stream_query("SELECT * FROM t", batch_size=1)
+    next(stream)
+    assert client.router.pools["localhost:8080"].stats()["in_use"] == 1
+    stream.close()
+    assert client.router.pools["localhost:8080"].stats() == {"max_size": 8, "in_use": 0, "idle": 1}
+
+
+def test_concurrent_connections_do_not_share_request_headers():
+    # Real client connections: trino stores per-connection headers on the HTTP session of the connection.
+    pool = ConnectionPool(CONNECT_KWARGS, max_size=2)
+    checked_out = threading.Barrier(2, timeout=5)
+    sent = {}
+
+    def prepare(name):
+        with pool.connection() as conn:
+            checked_out.wait()
+            conn._client_session.prepared_statements = {name: f"SELECT '{name}'"}
+            request = conn._create_request()
+            checked_out.wait()
+            sent[name] = (request._http_session, request._http_session.headers["X-Trino-Prepared-Statement"])
+
+    threads = [threading.Thread(target=prepare, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    (session_a, header_a), (session_b, header_b) = sent["a"], sent["b"]
+    assert header_a.startswith("a=") and header_b.startswith("b=")
+    assert session_a is not session_b
+    assert session_a.get_adapter("http://localhost:8080") is session_b.get_adapter("http://localhost:8080")
+    pool.close()
@@ -0,0 +1,154 @@
+"""Tests of coordinator parsing and of load-based, sticky routing."""
+
+import pytest
+import requests
+import trino
+
+from coordinator_router import LOAD_QUERY, CoordinatorRouter, parse_coordinators, sticky_routing
+
+
+class FakeConnection:
+    """Connection of a coordinator with no queued and one running query; trino-a drops queries."""
+
+    def __init__(self, host):
+        self.host = host
+        self.stats = {}
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        if self.host == "trino-a" and query != LOAD_QUERY:
+            raise requests.exceptions.ConnectionError("connection reset")
+        self.description = None
+
+    def fetchone(self):
+        return (0, 1)
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, []),
+        ("", []),
+        (" , ", []),
+        ("trino-a", [("trino-a", 8080)]),
+        ("trino-a:8889, trino-b", [("trino-a", 8889), ("trino-b", 8080)]),
+        ("10.0.0.1:9000,", [("10.0.0.1", 9000)]),
+    ],
+)
+def test_parse_coordinators(value, expected):
+    assert parse_coordinators(value, 8080) == expected
+
+
+def make_router(loads: dict[str, tuple[bool, int, int]], **kwargs) -> tuple[CoordinatorRouter, list[str]]:
+    """A router whose probes report ``(healthy, queued, running)`` from ``loads``; also return the probed addresses."""
+    router = CoordinatorRouter(parse_coordinators(",".join(loads), 8080), {}, **kwargs)
+    probed = []
+
+    def probe(address):
+        probed.append(address)
+        state = router._states[address]
+        state.healthy, state.queued, state.running = loads[address]
+        state.checked_at = float("inf")
+
+    router._probe = probe
+    return router, probed
+
+
+def test_single_coordinator_is_never_probed():
+    router, probed = make_router({"trino-a:8080": (True, 0, 0)})
+    assert router.route("workflow-1") == "trino-a:8080"
+    assert probed == []
+
+
+def test_least_loaded_healthy_coordinator_is_chosen():
+    router, probed = make_router(
+        {"trino-a:8080": (False, 0, 0), "trino-b:8080": (True, 5, 1), "trino-c:8080": (True, 1, 3)}
+    )
+    assert router.route() == "trino-c:8080"
+    assert sorted(probed) == ["trino-a:8080", "trino-b:8080", "trino-c:8080"]
+
+
+def test_routing_key_sticks_to_its_coordinator_while_healthy():
+    loads = {"trino-a:8080": (True, 0, 0), "trino-b:8080": (True, 3, 0)}
+    router, _ = make_router(loads)
+    assert router.route("workflow-1") == "trino-a:8080"
+
+    router._states["trino-a:8080"].queued = 10
+    assert router.route("workflow-1") == "trino-a:8080"
+    assert router.route("workflow-2") == "trino-b:8080"
+
+    router.mark_unhealthy("trino-a:8080", ConnectionError("refused"))
+    assert router.route("workflow-1") == "trino-b:8080"
+
+
+def test_pin_overrides_the_choice_of_coordinator():
+    router, _ = make_router({"trino-a:8080": (True, 0, 0), "trino-b:8080": (True, 3, 0)})
+    assert router.pin("workflow-1", "trino-b:8080")
+    assert router.route("workflow-1") == "trino-b:8080"
+    assert not router.pin("workflow-1", "trino-z:8080")
+    assert router.route("workflow-1") == "trino-b:8080"
+
+
+def test_pin_stores_nothing_with_a_single_coordinator():
+    router, _ = make_router({"trino-a:8080": (True, 0, 0)})
+    for i in range(100):
+        assert router.pin(f"workflow-{i}", "trino-a:8080")
+    assert router._sticky == {}
+
+
+def test_pin_drops_expired_routing_keys():
+    router, _ = make_router({"trino-a:8080": (True, 0, 0), "trino-b:8080": (True, 0, 0)}, sticky_ttl=60)
+    for i in range(100):
+        router.pin(f"workflow-{i}", "trino-a:8080")
+    router._sticky = {key: (address, used - 120) for key, (address, used) in router._sticky.items()}
+    router.pin("workflow-new", "trino-b:8080")
+    assert list(router._sticky) == ["workflow-new"]
+
+
+def test_pinned_key_moves_when_its_coordinator_fails():
+    router, _ = make_router({"trino-a:8080": (True, 0, 0), "trino-b:8080": (True, 3, 0)})
+    router.pin("workflow-1", "trino-b:8080")
+    router.mark_unhealthy("trino-b:8080", ConnectionError("refused"))
+    assert router.route("workflow-1") == "trino-a:8080"
+
+
+def test_failed_probe_marks_the_coordinator_unhealthy(monkeypatch):
+    router = CoordinatorRouter(parse_coordinators("trino-a,trino-b", 8080), {"user": "test"})
+
+    def connect(**kwargs):
+        if kwargs["host"] == "trino-a":
+            raise ConnectionError("refused")
+        return FakeConnection(kwargs["host"])
+
+    monkeypatch.setattr(trino.dbapi, "connect", connect)
+    assert router.route() == "trino-b:8080"
+    assert [(state["address"], state["healthy"], state["error"]) for state in router.status()] == [
+        ("trino-a:8080", False, "refused"),
+        ("trino-b:8080", True, None),
+    ]
+
+
+def test_client_routes_away_from_a_coordinator_it_cannot_reach(client, monkeypatch):
+    router, _ = make_router({"trino-a:8080": (True, 0, 0), "trino-b:8080": (True, 1, 0)})
+    client.router = router
+    hosts = []
+
+    def connect(**kwargs):
+        hosts.append(kwargs["host"])
+        return FakeConnection(kwargs["host"])
+
+    monkeypatch.setattr(trino.dbapi, "connect", connect)
+    with sticky_routing("workflow-1"):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.execute_query("SELECT 1", use_cache=False)
+        client.execute_query("SELECT 1", use_cache=False)
+    assert hosts == ["trino-a", "trino-b"]
+    assert router.route("workflow-1") == "trino-b:8080"
@@ -0,0 +1,88 @@
+"""Tests of the batched ``information_schema.columns`` description of tables."""
+
+import pytest
+
+from result_cache import ResultCache
+from trino_client import CatalogSchemaError, TrinoError
+
+
+@pytest.fixture
+def executed(client, monkeypatch):
+    """``(query, params)`` of every query the client runs; each returns its call number."""
+    calls = []
+
+    def execute_query(query, use_cache=True, output_format="json", columns=None, params=None):
+        calls.append((query, params))
+        return str(len(calls))
+
+    monkeypatch.setattr(client, "execute_query", execute_query)
+    return calls
+
+
+def test_tables_are_grouped_by_schema(client, executed):
+    client.describe_tables("hive", tables=["events", "sales.orders", '"sales"."items"'])
+
+    ((query, params),) = executed
+    assert 'FROM "hive".information_schema.columns' in query
+    assert (
+        "WHERE ((table_schema = ? AND table_name IN (?)) OR (table_schema = ? AND table_name IN (?, ?)))" in query
+    )
+    assert query.endswith("ORDER BY table_schema, table_name, ordinal_position")
+    assert params == ["default", "events", "sales", "orders", "items"]
+
+
+def test_schema_pattern(client, executed):
+    client.describe_tables("hive", schema_pattern="ads_%")
+    client.describe_tables("hive", tables=["events"], schema_pattern="ads_%")
+
+    (only_pattern, _), (both, params) = executed
+    assert "WHERE table_schema LIKE ?" in only_pattern
+    assert "WHERE ((table_schema = ? AND table_name IN (?))) AND table_schema LIKE ?" in both
+    assert params == ["default", "events", "ads_%"]
+
+
+def test_descriptions_are_cached(client, executed):
+    first = client.describe_tables("hive", tables=["events"])
+    second = client.describe_tables("hive", tables=["events"])
+    csv = client.describe_tables("hive", tables=["events"], output_format="csv")
+
+    assert first == second == "1"
+    assert csv == "2"
+    client.metadata_cache.invalidate("hive", "default", "events")
+    assert client.describe_tables("hive", tables=["events"]) == "3"
+
+
+def test_tables_or_pattern_required(client, executed):
+    with pytest.raises(TrinoError, match="Either tables or a schema pattern"):
+        client.describe_tables("hive")
+
+
+def test_unqualified_table_needs_a_schema(client, executed):
+    client.config.schema = None
+
+    with pytest.raises(CatalogSchemaError):
+        client.describe_tables("hive", tables=["events"])
+    assert executed == []
+
+
+def test_qualified_and_unqualified_names_of_one_schema_share_a_group(client, executed):
+    client.describe_tables('my"catalog', schema="sales", tables=["orders", "sales.items"])
+
+    ((query, params),) = executed
+    assert 'FROM "my""catalog".information_schema.columns' in query
+    assert "WHERE ((table_schema = ? AND table_name IN (?, ?)))" in query
+    assert params == ["sales", "orders", "items"]
+
+
+def test_one_query_describes_every_table(client, fake_trino):
+    client.result_cache = ResultCache(client.config.result_cache_dir, max_bytes=1024 * 1024)
+    fake_trino.results["information_schema.columns"] = (
+        [("table_schema", "varchar"), ("table_name", "varchar"), ("column_name", "varchar")],
+        [("db", "a", "id"), ("db", "b", "id"), ("db", "b", "name")],
+    )
+
+    result = client.describe_tables("hive", tables=["db.a", "db.b"], output_format="csv", columns=["table_name"])
+
+    assert result == "table_name\na\nb\nb\n"
+    # No EXPLAIN for the result cache, only the description itself.
+    assert len(fake_trino.queries) == 1
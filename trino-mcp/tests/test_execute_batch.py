@@ -0,0 +1,123 @@
+"""Tests of concurrent batch execution of statements."""
+
+import json
+import threading
+import time
+
+import pytest
+import trino
+
+from query_stats import query_tags, tag_queries
+from result_format import OutputFormatError
+from trino_client import NO_RESULTS_MESSAGE, QueryCancelScope, TrinoError, current_cancel_scope
+
+
+def test_results_are_reported_in_order(client, monkeypatch):
+    def execute_query(query, output_format="json", params=None):
+        if query == "DROP TABLE t":
+            return NO_RESULTS_MESSAGE
+        if query == "SELECT 2":
+            time.sleep(0.05)
+        return json.dumps([{"value": query, "params": params}])
+
+    monkeypatch.setattr(client, "execute_query", execute_query)
+
+    entries = json.loads(client.execute_batch(["SELECT 2", "SELECT ?", "DROP TABLE t"], params=[None, [1]]))
+
+    assert [entry["index"] for entry in entries] == [0, 1, 2]
+    assert entries[0]["result"] == [{"value": "SELECT 2", "params": None}]
+    assert entries[1]["result"] == [{"value": "SELECT ?", "params": [1]}]
+    assert entries[2]["result"] == NO_RESULTS_MESSAGE
+    assert all(entry["status"] == "ok" for entry in entries)
+
+
+def test_failures_do_not_stop_the_batch(client, monkeypatch):
+    def execute_query(query, output_format="json", params=None):
+        if "missing" in query:
+            raise TrinoError("Table missing does not exist")
+        return "id\n1\n"
+
+    def check(query, params):
+        if "huge" in query:
+            raise TrinoError("over budget")
+
+    monkeypatch.setattr(client, "execute_query", execute_query)
+
+    statements = ["SELECT * FROM missing", "SELECT * FROM huge", "SELECT 1"]
+    entries = json.loads(client.execute_batch(statements, output_format="csv", check=check))
+
+    assert [entry["status"] for entry in entries] == ["error", "error", "ok"]
+    assert entries[0]["error"] == "Table missing does not exist"
+    assert entries[1]["error"] == "over budget"
+    assert entries[2]["result"] == "id\n1\n"
+
+
+def test_concurrency_is_bounded(client, monkeypatch):
+    client.config.batch_workers = 2
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def execute_query(query, output_format="json", params=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return "[]"
+
+    monkeypatch.setattr(client, "execute_query", execute_query)
+
+    client.execute_batch([f"SELECT {i}" for i in range(6)])
+
+    assert peak == 2
+
+
+def test_statements_keep_the_query_tags(client, monkeypatch):
+    seen = []
+
+    def execute_query(query, output_format="json", params=None):
+        seen.append(query_tags.get())
+        return "[]"
+
+    monkeypatch.setattr(client, "execute_query", execute_query)
+
+    with tag_queries(tool="execute_batch"):
+        client.execute_batch(["SELECT 1", "SELECT 2"])
+
+    assert [tags.get("tool") for tags in seen] == ["execute_batch", "execute_batch"]
+
+
+def test_empty_batch_and_unknown_format(client):
+    assert client.execute_batch([]) == "[]"
+    with pytest.raises(OutputFormatError):
+        client.execute_batch(["SELECT 1"], output_format="xml")
+
+
+def test_trino_errors_are_reported_with_their_name(client, fake_trino):
+    fake_trino.results["FROM missing"] = trino.exceptions.TrinoUserError(
+        {"message": "Table 'hive.default.missing' does not exist", "errorName": "TABLE_NOT_FOUND"}
+    )
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+
+    entries = json.loads(client.execute_batch(["SELECT * FROM missing", "SELECT * FROM t"], output_format="columns"))
+
+    assert (entries[0]["error"], entries[0]["error_name"]) == (
+        "Table 'hive.default.missing' does not exist",
+        "TABLE_NOT_FOUND",
+    )
+    assert entries[1]["result"] == {"columns": ["id"], "types": ["bigint"], "data": [[1]]}
+
+
+def test_a_cancelled_scope_applies_to_every_statement(client, fake_trino):
+    scope = QueryCancelScope()
+    scope.cancel()
+    token = current_cancel_scope.set(scope)
+    try:
+        entries = json.loads(client.execute_batch(["SELECT 1", "SELECT 2"]))
+    finally:
+        current_cancel_scope.reset(token)
+
+    assert [entry["status"] for entry in entries] == ["error", "error"]
+    assert fake_trino.queries == []
@@ -0,0 +1,111 @@
+"""Tests of the NumPy file layout analysis of Iceberg tables."""
+
+import pytest
+import trino
+
+from config import TrinoConfig
+from file_analyzer import MB, FileLayoutAnalyzer
+
+
+class FakeClient:
+    """Serves ``$files`` rows in batches; optionally fails the partitioned query."""
+
+    def __init__(self, batches, partitioned=True):
+        self.batches = batches
+        self.partitioned = partitioned
+        self.queries = []
+
+    def open_result(self, query, batch_size=None, params=None):
+        self.queries.append(query)
+        if not self.partitioned and "partition" in query:
+            raise trino.exceptions.TrinoUserError({"message": "Column 'partition' cannot be resolved"})
+        return None, iter(self.batches)
+
+
+@pytest.fixture
+def config():
+    return TrinoConfig(
+        host="localhost", port=8080, user="test", maintenance_small_file_bytes=8 * MB, maintenance_min_small_files=3
+    )
+
+
+def data_file(partition, size_mb, records=100):
+    return (0, partition, int(size_mb * MB), records)
+
+
+def delete_file(partition, records=10):
+    return (1, partition, 1024, records)
+
+
+def test_partitions_are_ranked_and_recommended(config):
+    small = [data_file('{"day":"2024-05-01"}', 1) for _ in range(5)]
+    large = [data_file('{"day":"2024-05-02"}', 400), delete_file('{"day":"2024-05-02"}')]
+    analyzer = FileLayoutAnalyzer(FakeClient([small[:3], small[3:] + large]), config)
+    result = analyzer.analyze("iceberg", "db", "events", target_file_bytes=4 * MB)
+
+    assert result["partitions"] == 2
+    assert result["data_files"] == 6
+    assert result["delete_files"] == 1
+    assert result["small_files"] == 5
+    assert result["file_size_histogram"]["1-8MB"] == 5
+    assert result["file_size_histogram"]["256-512MB"] == 1
+
+    first, second = result["top_partitions"]
+    assert first["partition"] == '{"day":"2024-05-01"}'
+    assert first["small_files"] == 5
+    assert first["recommendation"] == "compact 5 small files into about 2"
+    assert second["delete_file_ratio"] == 1.0
+    assert second["deleted_records"] == 10
+    assert second["recommendation"] == "rewrite to apply 1 delete files"
+
+
+def test_unpartitioned_table_falls_back_to_one_partition(config):
+    client = FakeClient([[data_file("", 100), data_file("", 200)]], partitioned=False)
+    result = FileLayoutAnalyzer(client, config).analyze("iceberg", "db", "events")
+    assert len(client.queries) == 2
+    assert result["partitions"] == 1
+    assert result["top_partitions"][0]["partition"] is None
+    assert result["top_partitions"][0]["avg_file_mb"] == 150.0
+    assert result["top_partitions"][0]["recommendation"] == "no action needed"
+
+
+def test_empty_table(config):
+    result = FileLayoutAnalyzer(FakeClient([]), config).analyze("iceberg", "db", "events")
+    assert result["partitions"] == 0
+    assert result["data_files"] == 0
+    assert result["top_partitions"] == []
+
+
+def test_histogram_buckets_include_their_lower_bound(config):
+    files = [data_file("", size) for size in (0.5, 1, 8, 511.9, 512, 2048)]
+    histogram = FileLayoutAnalyzer(FakeClient([files]), config).analyze("iceberg", "db", "t")["file_size_histogram"]
+    assert histogram == {
+        "<1MB": 1,
+        "1-8MB": 1,
+        "8-32MB": 1,
+        "32-64MB": 0,
+        "64-128MB": 0,
+        "128-256MB": 0,
+        "256-512MB": 1,
+        ">=512MB": 2,
+    }
+
+
+def test_skewed_and_delete_only_partitions(config):
+    files = [data_file(f'{{"p":{i}}}', 100) for i in range(4)]
+    files += [data_file('{"p":0}', 400), delete_file('{"p":9}')]
+    result = FileLayoutAnalyzer(FakeClient([files]), config).analyze("iceberg", "db", "t", top=2)
+    first, second = result["top_partitions"]
+    # A partition holding only delete files has nothing to divide its ratio by.
+    assert first["partition"] == '{"p":9}'
+    assert (first["data_files"], first["avg_file_mb"], first["delete_file_ratio"]) == (0, 0.0, 0.0)
+    assert second["partition"] == '{"p":0}'
+    assert second["skew"] == 5.0
+    assert second["recommendation"] == "5.0x the median partition size, consider finer partitioning"
+
+
+def test_too_few_small_files_are_not_worth_compacting(config):
+    files = [data_file("", 1), data_file("", 1)]
+    partition = FileLayoutAnalyzer(FakeClient([files]), config).analyze("iceberg", "db", "t")["top_partitions"][0]
+    assert partition["small_files"] == 2
+    assert partition["recommendation"] == "no action needed"
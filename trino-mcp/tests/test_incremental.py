@@ -0,0 +1,200 @@
+"""Tests of incremental CSV exports of Iceberg tables."""
+
+import csv
+
+import pytest
+
+from columnar_spool import SpoolError
+from config import TrinoConfig
+from incremental import IncrementalReader
+from scan_estimator import ScanBudgetExceededError
+from trino_client import TrinoError
+
+COLUMNS = [("id", "bigint"), ("name", "varchar")]
+
+
+class FakeClient:
+    """Answers the metadata and data queries of a reader from fixed results."""
+
+    def __init__(self, ancestry, files=(), rows=()):
+        self.ancestry = ancestry
+        self.files = files
+        self.rows = rows
+        self.queries = []
+
+    def open_result(self, query, batch_size=None, params=None):
+        self.queries.append((query, params))
+        if "$history" in query:
+            return None, iter([self.ancestry])
+        if "$entries" in query:
+            return None, iter([[(path,) for path in self.files]])
+        return COLUMNS, (batch for batch in [list(self.rows)])
+
+
+def make_reader(tmp_path, ancestry, files=(), rows=()):
+    config = TrinoConfig(host="localhost", port=8080, user="test", export_dir=str(tmp_path))
+    return IncrementalReader(FakeClient(ancestry, files, rows), config)
+
+
+def read_export(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def write_export(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([["id", "name"], *rows])
+
+
+@pytest.mark.parametrize(
+    "ancestry, since, exists, expected",
+    [
+        ([(1, "append")], None, True, ("full", [])),
+        ([(1, "append")], 1, False, ("full", [])),
+        ([(1, "append"), (2, "append")], 9, True, ("full", [])),
+        ([(1, "append"), (2, "append")], 2, True, ("unchanged", [])),
+        ([(1, "append"), (2, "overwrite"), (3, "append")], 1, True, ("full", [])),
+        ([(1, "append"), (2, "append"), (3, "append")], 1, True, ("incremental", [2, 3])),
+    ],
+)
+def test_plan(tmp_path, ancestry, since, exists, expected):
+    path = tmp_path / "export.csv"
+    if exists:
+        path.touch()
+    mode, _, added = IncrementalReader._plan(ancestry, since, str(path))
+    assert (mode, added) == expected
+
+
+def test_appends_only_the_added_files(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [["1", "a"]])
+    ancestry = [(1, "append"), (2, "append")]
+    reader = make_reader(tmp_path, ancestry, files=["s3://f2.parquet"], rows=[(2, "b"), (3, None)])
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1, where="id > ?", params=[0])
+
+    assert result["mode"] == "incremental"
+    assert result["file_name"] == "export.csv" and "path" not in result
+    assert (result["snapshot_id"], result["data_files_read"], result["rows_added"]) == (2, 1, 2)
+    assert read_export(path) == [["id", "name"], ["1", "a"], ["2", "b"], ["3", ""]]
+    entries_query, entries_params = reader.client.queries[1]
+    assert "snapshot_id IN (?)" in entries_query and entries_params == [2]
+    query, params = reader.client.queries[-1]
+    assert 'FOR VERSION AS OF 2 WHERE (id > ?) AND "$path" IN (?)' in query
+    assert params == [0, "s3://f2.parquet"]
+
+
+def test_full_rebuild_replaces_the_export(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [["1", "a"]])
+    reader = make_reader(tmp_path, [(1, "append"), (2, "delete")], rows=[(5, "e")])
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1, columns=["id", "name"])
+
+    assert result["mode"] == "full"
+    assert read_export(path) == [["id", "name"], ["5", "e"]]
+    query, _ = reader.client.queries[-1]
+    assert query == 'SELECT "id", "name" FROM "iceberg"."db"."events" FOR VERSION AS OF 2'
+
+
+def test_distinct_skips_rows_already_exported(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [["1", "a"]])
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append")], files=["f"], rows=[(1, "a"), (2, "b"), (2, "b")])
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1, distinct=True)
+
+    assert result["rows_added"] == 1
+    assert read_export(path) == [["id", "name"], ["1", "a"], ["2", "b"]]
+
+
+def test_appends_without_data_files_leave_the_export_unchanged(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [["1", "a"]])
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append")], files=[])
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1)
+
+    assert result["mode"] == "unchanged"
+    assert len(reader.client.queries) == 2
+
+
+def test_header_mismatch_keeps_the_previous_export(tmp_path):
+    path = tmp_path / "export.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,other\n1,a\n")
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append")], files=["f"], rows=[(2, "b")])
+
+    with pytest.raises(TrinoError, match="do not match"):
+        reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1)
+    assert path.read_text(encoding="utf-8") == "id,other\n1,a\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["export.csv"]
+
+
+def test_table_without_snapshot(tmp_path):
+    with pytest.raises(TrinoError, match="has no snapshot"):
+        make_reader(tmp_path, []).read_since("iceberg", "db", "events", "export.csv")
+
+
+def test_files_of_every_added_snapshot_are_read_in_one_query(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [])
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append"), (3, "append")], files=["f2", "f3"], rows=[(2, "b")])
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1)
+
+    assert (result["snapshot_id"], result["data_files_read"]) == (3, 2)
+    _, entries_params = reader.client.queries[1]
+    assert entries_params == [2, 3]
+    query, params = reader.client.queries[-1]
+    assert 'FOR VERSION AS OF 3 WHERE "$path" IN (?, ?)' in query
+    assert params == ["f2", "f3"]
+
+
+@pytest.mark.parametrize("file_name", ["", "..", "../export.csv", "/etc/cron.d/export", "sub/export.csv"])
+def test_export_outside_the_export_directory_is_rejected(tmp_path, file_name):
+    reader = make_reader(tmp_path / "exports", [(1, "append")], rows=[(1, "a")])
+    with pytest.raises(SpoolError, match="Invalid export file name"):
+        reader.read_since("iceberg", "db", "events", file_name)
+    assert reader.client.queries == []
+    assert [p.name for p in tmp_path.iterdir()] == []
+
+
+def test_export_through_a_link_out_of_the_export_directory_is_rejected(tmp_path):
+    (tmp_path / "exports").mkdir()
+    (tmp_path / "exports" / "export.csv").symlink_to(tmp_path / "outside.csv")
+    reader = make_reader(tmp_path / "exports", [(1, "append")], rows=[(1, "a")])
+    with pytest.raises(SpoolError, match="outside the export directory"):
+        reader.read_since("iceberg", "db", "events", "export.csv")
+    assert not (tmp_path / "outside.csv").exists()
+
+
+def test_check_sees_the_data_query_before_it_runs(tmp_path):
+    write_export(tmp_path / "export.csv", [["1", "a"]])
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append")], files=["f2"], rows=[(2, "b")])
+    checked = []
+
+    def reject(query, params):
+        checked.append((query, params))
+        raise ScanBudgetExceededError(2000, 1000)
+
+    with pytest.raises(ScanBudgetExceededError):
+        reader.read_since(
+            "iceberg", "db", "events", "export.csv", since_snapshot_id=1, where="id > ?", params=[0], check=reject
+        )
+    [(query, params)] = checked
+    assert 'FOR VERSION AS OF 2 WHERE (id > ?) AND "$path" IN (?)' in query and params == [0, "f2"]
+    assert len(reader.client.queries) == 2
+    assert read_export(tmp_path / "export.csv") == [["id", "name"], ["1", "a"]]
+
+
+def test_distinct_compares_new_rows_as_they_read_back_from_the_export(tmp_path):
+    path = tmp_path / "export.csv"
+    write_export(path, [["1", ""], ["2", 'say "hi"\r\nbye'], ["3", "[1,null]"]])
+    rows = [(1, None), (2, 'say "hi"\r\nbye'), (3, [1, None]), (4, None), (4, None)]
+    reader = make_reader(tmp_path, [(1, "append"), (2, "append")], files=["f"], rows=rows)
+
+    result = reader.read_since("iceberg", "db", "events", "export.csv", since_snapshot_id=1, distinct=True)
+
+    assert result["rows_added"] == 1
+    assert read_export(path)[1:] == [["1", ""], ["2", 'say "hi"\r\nbye'], ["3", "[1,null]"], ["4", ""]]
@@ -0,0 +1,166 @@
+"""Tests of the Iceberg maintenance ranking, cooldowns and runs."""
+
+import json
+import time
+
+import pytest
+import trino
+
+from config import TrinoConfig
+from maintenance import MaintenanceScheduler, duration_seconds
+
+# data_files, small_files, snapshots, expired_snapshots of each table.
+HEALTH = {
+    "many_small_files": (100, 60, 5, 0),
+    "old_snapshots": (10, 0, 50, 40),
+    "both": (100, 25, 30, 15),
+    "healthy": (10, 2, 3, 1),
+}
+
+
+class FakeClient:
+    """Answers the scan queries from ``HEALTH`` and records the maintenance statements."""
+
+    def __init__(self, failing: set[str] = frozenset()):
+        self.statements = []
+        self.failing = failing
+
+    def open_result(self, query, batch_size=None, params=None):
+        if "information_schema.tables" in query:
+            rows = [("db", table) for table in HEALTH]
+        else:
+            rows = [HEALTH[query.split('"')[5].removesuffix("$files")]]
+        return None, iter([rows])
+
+    def optimize(self, catalog, schema, table, file_size_threshold=None):
+        if table in self.failing:
+            raise RuntimeError("optimize failed")
+        self.statements.append(("optimize", table, file_size_threshold))
+
+    def expire_snapshots(self, catalog, schema, table, retention_threshold="7d"):
+        self.statements.append(("expire_snapshots", table, retention_threshold))
+
+
+@pytest.fixture
+def config(tmp_path):
+    return TrinoConfig(
+        host="localhost",
+        port=8080,
+        user="test",
+        maintenance_catalogs=["iceberg"],
+        maintenance_min_small_files=20,
+        maintenance_min_expired_snapshots=10,
+        maintenance_small_file_bytes=1024,
+        maintenance_state_file=str(tmp_path / "maintenance.json"),
+    )
+
+
+@pytest.mark.parametrize(("value", "seconds"), [("7d", 604800), ("12h", 43200), (" 1.5m ", 90), ("250ms", 0.25)])
+def test_duration_seconds(value, seconds):
+    assert duration_seconds(value) == seconds
+
+
+def test_invalid_duration_is_rejected():
+    with pytest.raises(ValueError, match="Invalid duration"):
+        duration_seconds("7 days")
+
+
+def test_tables_are_ranked_by_need(config):
+    scheduler = MaintenanceScheduler(FakeClient(), config)
+    plan = scheduler.run_once(dry_run=True)
+    scheduler.stop()
+    assert [(entry["table"], entry["actions"], entry["status"]) for entry in plan] == [
+        ("old_snapshots", ["expire_snapshots"], "planned"),
+        ("many_small_files", ["optimize"], "planned"),
+        ("both", ["optimize", "expire_snapshots"], "planned"),
+    ]
+
+
+def test_run_maintains_tables_then_cools_them_down(config):
+    client = FakeClient()
+    scheduler = MaintenanceScheduler(client, config)
+    outcomes = scheduler.run_once(limit=2)
+    assert [outcome["status"] for outcome in outcomes] == ["done", "done"]
+    assert sorted(client.statements) == [
+        ("expire_snapshots", "old_snapshots", "7d"),
+        ("optimize", "many_small_files", "1024B"),
+    ]
+
+    assert [outcome["table"] for outcome in scheduler.run_once()] == ["both"]
+    assert scheduler.run_once() == []
+    assert sorted(scheduler.status()["cooling_down"]) == [
+        "iceberg.db.both",
+        "iceberg.db.many_small_files",
+        "iceberg.db.old_snapshots",
+    ]
+    scheduler.stop()
+
+
+def test_failed_table_is_recorded_and_others_continue(config):
+    scheduler = MaintenanceScheduler(FakeClient(failing={"many_small_files"}), config)
+    outcomes = {outcome["table"]: outcome for outcome in scheduler.run_once()}
+    scheduler.stop()
+    assert outcomes["many_small_files"]["status"] == "failed"
+    assert outcomes["many_small_files"]["error"] == "optimize failed"
+    assert outcomes["old_snapshots"]["status"] == "done"
+    assert scheduler.status()["running"] == {}
+
+
+def test_cooldowns_hold_across_scheduler_instances(config):
+    first = MaintenanceScheduler(FakeClient(), config)
+    first.run_once(limit=1)
+    first.stop()
+    second = MaintenanceScheduler(FakeClient(), config)
+    planned = [entry["table"] for entry in second.run_once(dry_run=True)]
+    second.stop()
+    assert planned == ["many_small_files", "both"]
+
+
+def test_unreadable_tables_are_skipped_and_the_current_snapshot_is_not_counted(config, monkeypatch):
+    monkeypatch.setitem(HEALTH, "not_iceberg", trino.exceptions.TrinoUserError({"message": "Table not found"}))
+    monkeypatch.setitem(HEALTH, "only_current_snapshot", (1, 0, 1, -1))
+    client = FakeClient()
+    open_result = client.open_result
+
+    def open_or_raise(query, batch_size=None, params=None):
+        if "not_iceberg" in query:
+            raise HEALTH["not_iceberg"]
+        return open_result(query, batch_size, params)
+
+    client.open_result = open_or_raise
+    scheduler = MaintenanceScheduler(client, config)
+    healths = {health.table: health for health in scheduler.scan()}
+    assert scheduler._table_health("iceberg", "db", "not_iceberg") is None
+    assert scheduler._table_health("iceberg", "db", "only_current_snapshot").expired_snapshots == 0
+    scheduler.stop()
+    assert sorted(healths) == ["both", "many_small_files", "old_snapshots"]
+
+
+class NoQueries:
+    """A client that must not be used."""
+
+    def open_result(self, query, batch_size=None, params=None):
+        raise AssertionError(query)
+
+
+def test_last_plan_serves_the_saved_ranking_without_scanning(config):
+    assert MaintenanceScheduler(NoQueries(), config).last_plan() == {"scanned_at": None, "tables": []}
+    daemon = MaintenanceScheduler(FakeClient(), config)
+    planned = daemon.run_once(dry_run=True)
+    daemon.run_once(limit=1)
+    daemon.stop()
+
+    server = MaintenanceScheduler(NoQueries(), config)
+    plan = server.last_plan(limit=1)
+    server.stop()
+    assert plan["scanned_at"] is not None
+    assert plan["tables"] == planned[1:2]
+
+
+def test_cooldowns_of_an_older_state_file_are_kept(config):
+    with open(config.maintenance_state_file, "w", encoding="utf-8") as f:
+        json.dump({"iceberg.db.old_snapshots": time.time()}, f)
+    scheduler = MaintenanceScheduler(FakeClient(), config)
+    assert [entry["table"] for entry in scheduler.run_once(dry_run=True)] == ["many_small_files", "both"]
+    assert [entry["table"] for entry in scheduler.last_plan()["tables"]] == ["many_small_files", "both"]
+    scheduler.stop()
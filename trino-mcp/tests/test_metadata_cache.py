@@ -0,0 +1,118 @@
+"""Tests of the metadata cache: hits, expiry, LRU eviction and invalidation."""
+
+import time
+
+import pytest
+
+from metadata_cache import MetadataCache
+
+
+def test_get_or_load_loads_once():
+    cache = MetadataCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return ["hive", "iceberg"]
+
+    assert cache.get_or_load(("catalogs", None, None, None), load) == ["hive", "iceberg"]
+    assert cache.get_or_load(("catalogs", None, None, None), load) == ["hive", "iceberg"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_reloaded():
+    cache = MetadataCache(ttl=0.01)
+    values = iter([1, 2])
+    assert cache.get_or_load(("tables", "hive", "default", None), lambda: next(values)) == 1
+    time.sleep(0.02)
+    assert cache.get_or_load(("tables", "hive", "default", None), lambda: next(values)) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MetadataCache(max_entries=2)
+    cache.get_or_load(("a", None, None, None), lambda: "a")
+    cache.get_or_load(("b", None, None, None), lambda: "b")
+    cache.get_or_load(("a", None, None, None), lambda: "unused")
+    cache.get_or_load(("c", None, None, None), lambda: "c")
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_load(("a", None, None, None), lambda: "reloaded") == "a"
+    assert cache.get_or_load(("b", None, None, None), lambda: "reloaded") == "reloaded"
+
+
+def test_loader_errors_are_not_cached():
+    cache = MetadataCache()
+
+    def fail():
+        raise RuntimeError("coordinator unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(("schemas", "hive", None, None), fail)
+    assert cache.get_or_load(("schemas", "hive", None, None), lambda: ["default"]) == ["default"]
+
+
+def test_invalidate_drops_the_object_and_the_listings_containing_it():
+    cache = MetadataCache()
+    keys = [
+        ("catalogs", None, None, None),
+        ("schemas", "hive", None, None),
+        ("tables", "hive", "default", None),
+        ("describe", "hive", "default", "t_event"),
+        ("describe", "hive", "default", "t_conversion1"),
+        ("tables", "iceberg", "db", None),
+    ]
+    for key in keys:
+        cache.get_or_load(key, lambda: "cached")
+
+    assert cache.invalidate("hive", "default", "t_event") == 4
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_load(("describe", "hive", "default", "t_conversion1"), lambda: "reloaded") == "cached"
+    assert cache.get_or_load(("tables", "iceberg", "db", None), lambda: "reloaded") == "cached"
+
+
+def test_invalidate_without_arguments_clears_everything():
+    cache = MetadataCache()
+    cache.get_or_load(("tables", "hive", "default", None), lambda: [])
+    cache.get_or_load(("describe", "iceberg", "db", "t"), lambda: [])
+    assert cache.invalidate() == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_client_answers_repeated_lookups_from_the_cache(client, fake_trino):
+    fake_trino.results["DESCRIBE"] = ([("Column", "varchar"), ("Type", "varchar")], [("id", "bigint")])
+    first = client.describe_table("hive", "default", "events")
+    assert client.describe_table("hive", "default", "events") == first
+    assert len(fake_trino.queries) == 1
+
+
+@pytest.mark.parametrize(
+    "statement, dropped",
+    [
+        # Unqualified names resolve against the configured catalog and schema.
+        ("ALTER TABLE events ADD COLUMN c bigint", {"tables-hive", "describe-events"}),
+        ('DROP TABLE IF EXISTS "hive"."default"."other"', {"tables-hive"}),
+        ("INSERT INTO iceberg.db.events VALUES (1)", {"tables-iceberg", "describe-iceberg"}),
+        ("DROP SCHEMA hive.default", {"tables-hive", "describe-events"}),
+        # No target found, everything may have changed.
+        (
+            "COMMENT ON COLUMN events.id IS 'x'",
+            {"tables-hive", "describe-events", "tables-iceberg", "describe-iceberg"},
+        ),
+    ],
+)
+def test_statements_run_through_the_client_invalidate_their_target(client, fake_trino, statement, dropped):
+    entries = {
+        "tables-hive": ("tables", "hive", "default", None),
+        "describe-events": ("describe", "hive", "default", "events"),
+        "tables-iceberg": ("tables", "iceberg", "db", None),
+        "describe-iceberg": ("describe", "iceberg", "db", "events"),
+    }
+    for key in entries.values():
+        client.metadata_cache.get_or_load(key, lambda: "cached")
+
+    client.execute_query(statement)
+
+    reloaded = {name for name, key in entries.items() if client.metadata_cache.get_or_load(key, lambda: None) is None}
+    assert reloaded == dropped
@@ -0,0 +1,49 @@
+"""Tests of output formats and projection pushdown for the Iceberg metadata table tools."""
+
+import json
+
+import pytest
+
+from result_format import OutputFormatError
+
+
+def test_projection_is_pushed_into_the_select(client, fake_trino):
+    fake_trino.results["$files"] = ([("file_path", "varchar"), ("record_count", "bigint")], [("s3://a.parquet", 10)])
+    result = client.show_files(
+        "events", "iceberg", "db", output_format="columns", columns=["file_path", "record_count"]
+    )
+    [(query, _)] = fake_trino.queries
+    assert query == 'SELECT "file_path", "record_count" FROM "iceberg"."db"."events$files"'
+    assert json.loads(result) == {
+        "columns": ["file_path", "record_count"],
+        "types": ["varchar", "bigint"],
+        "data": [["s3://a.parquet"], [10]],
+    }
+
+
+def test_all_columns_without_projection(client, fake_trino):
+    client.show_snapshots("events", "iceberg", "db", output_format="csv")
+    [(query, _)] = fake_trino.queries
+    assert query == 'SELECT * FROM "iceberg"."db"."events$snapshots"'
+
+
+def test_identifiers_are_quoted(client, fake_trino):
+    client.show_files('odd"name', "iceberg", "db", columns=['weird"col'])
+    [(query, _)] = fake_trino.queries
+    assert query == 'SELECT "weird""col" FROM "iceberg"."db"."odd""name$files"'
+
+
+def test_unknown_output_format_is_rejected_before_querying(client, fake_trino):
+    with pytest.raises(OutputFormatError):
+        client.show_files("events", "iceberg", "db", output_format="xml")
+    assert fake_trino.queries == []
+
+
+def test_each_format_of_a_description_is_cached_separately(client, fake_trino):
+    fake_trino.results["DESCRIBE"] = ([("Column", "varchar"), ("Type", "varchar")], [("id", "bigint")])
+    as_json = client.describe_table("hive", "default", "events")
+    as_csv = client.describe_table("hive", "default", "events", output_format="csv")
+    assert client.describe_table("hive", "default", "events", output_format="csv") == as_csv
+    assert json.loads(as_json) == [{"Column": "id", "Type": "bigint"}]
+    assert as_csv == "Column,Type\nid,bigint\n"
+    assert len(fake_trino.queries) == 2
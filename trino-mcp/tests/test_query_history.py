@@ -0,0 +1,81 @@
+"""Tests of the query history filters and the tailing watermark."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from trino_client import TrinoError
+
+COLUMNS = [("query_id", "varchar"), ("state", "varchar"), ("created", "timestamp(3) with time zone")]
+
+
+def record_queries(client, rows):
+    """Answer every query with ``rows``; return the list of ``(query, params)`` run."""
+    calls = []
+
+    def open_result(query, batch_size=None, params=None):
+        calls.append((query, params))
+        return COLUMNS, iter([rows])
+
+    client.open_result = open_result
+    return calls
+
+
+def created(second):
+    return datetime(2024, 5, 1, 12, 0, second, tzinfo=timezone.utc)
+
+
+def test_filters_are_bound_parameters(client):
+    calls = record_queries(client, [])
+    client.get_query_history(10, user="hadoop", state="FAILED", since="2024-05-01T00:00:00Z")
+    query, params = calls[0]
+    assert '"user" = ?' in query
+    assert '"state" = ?' in query
+    assert "created >= from_iso8601_timestamp(?)" in query
+    assert params == ["hadoop", "FAILED", "2024-05-01T00:00:00Z"]
+
+
+def test_limit_without_watermark_returns_the_most_recent_queries_oldest_first(client):
+    calls = record_queries(client, [["q3", "FINISHED", created(3)], ["q2", "FINISHED", created(2)]])
+    result = client.get_query_history(2, output_format="columns", columns=["query_id"])
+    assert calls[0][0].endswith("ORDER BY created DESC, query_id DESC LIMIT 2")
+    assert '"data":[["q2","q3"]]' in result
+
+
+def test_tail_returns_a_watermark_of_the_last_query(client):
+    record_queries(client, [["q1", "FINISHED", created(1)], ["q2", "RUNNING", created(2)]])
+    result = client.get_query_history(None, columns=["state"], tail=True)
+    assert result.startswith('{"watermark":"2024-05-01T12:00:02+00:00|q2","count":2,')
+
+
+def test_watermark_selects_the_queries_after_the_last_one_seen(client):
+    calls = record_queries(client, [])
+    result = client.get_query_history(100, columns=["state"], watermark="2024-05-01T12:00:02+00:00|q2")
+    query, params = calls[0]
+    assert (
+        "(created > from_iso8601_timestamp(?) OR (created = from_iso8601_timestamp(?) AND query_id > ?))" in query
+    )
+    assert params == ["2024-05-01T12:00:02+00:00", "2024-05-01T12:00:02+00:00", "q2"]
+    assert query.startswith('SELECT "state", "created", "query_id" FROM system.runtime.queries')
+    assert query.endswith("ORDER BY created ASC, query_id ASC LIMIT 100")
+    assert result == '{"watermark":"2024-05-01T12:00:02+00:00|q2","count":0,"queries":[]}'
+
+
+def test_malformed_watermark_is_rejected(client):
+    record_queries(client, [])
+    with pytest.raises(TrinoError, match="Invalid query history watermark"):
+        client.get_query_history(10, watermark="no-separator")
+
+
+def test_tailed_csv_is_wrapped_as_a_json_string_without_the_watermark_columns(client):
+    record_queries(client, [["q1", "FAILED", created(1)]])
+    result = json.loads(client.get_query_history(None, output_format="csv", columns=["state"], tail=True))
+    assert result == {"watermark": "2024-05-01T12:00:01+00:00|q1", "count": 1, "queries": "state\nFAILED\n"}
+
+
+def test_empty_tail_without_a_watermark_has_none(client):
+    calls = record_queries(client, [])
+    result = json.loads(client.get_query_history(None, tail=True, until="2024-05-02T00:00:00Z"))
+    assert result == {"watermark": None, "count": 0, "queries": []}
+    assert calls[0][0].endswith("WHERE created < from_iso8601_timestamp(?) ORDER BY created ASC, query_id ASC")
@@ -0,0 +1,68 @@
+"""Tests of bound query parameters."""
+
+import json
+
+import pytest
+
+from result_handles import ResultHandleStore
+
+COLUMNS = [("id", "bigint"), ("name", "varchar")]
+
+
+def test_params_are_bound_not_spliced(client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(1, "a")])
+    query = "SELECT * FROM t WHERE name = ? AND id > ?"
+
+    result = client.execute_query(query, use_cache=False, params=["o'brien", 0])
+
+    assert json.loads(result) == [{"id": 1, "name": "a"}]
+    assert fake_trino.queries == [(query, ["o'brien", 0])]
+
+
+def test_stream_query_binds_params(client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, [(1, "a")])
+
+    list(client.stream_query("SELECT * FROM t WHERE id = ?", params=[1]))
+
+    assert fake_trino.queries == [("SELECT * FROM t WHERE id = ?", [1])]
+
+
+def test_spooled_results_bind_params(client, fake_trino, tmp_path):
+    fake_trino.results["FROM t"] = (COLUMNS, [(1, "a")])
+    store = ResultHandleStore(client, str(tmp_path / "handles"), ttl=60, page_size=10)
+
+    page = json.loads(store.open("SELECT * FROM t WHERE id = ?", params=[1]))
+
+    assert page["rows"] == [{"id": 1, "name": "a"}]
+    assert fake_trino.queries == [("SELECT * FROM t WHERE id = ?", [1])]
+
+
+def test_the_plan_of_a_templated_query_binds_the_same_params(client, fake_trino):
+    fake_trino.results["EXPLAIN"] = ([("Query Plan", "varchar")], [("{}",)])
+
+    client.explain_io("SELECT * FROM t WHERE id = ?", [1])
+
+    assert fake_trino.queries == [("EXPLAIN (TYPE IO, FORMAT JSON) SELECT * FROM t WHERE id = ?", [1])]
+
+
+def test_each_set_of_params_is_cached_separately(client, monkeypatch):
+    monkeypatch.setattr(client, "_cacheable_tables", lambda normalized, query, params=None: (("iceberg", "db", "t"),))
+    monkeypatch.setattr(client, "_current_snapshot_id", lambda catalog, schema, table: 42)
+    query = "SELECT * FROM t WHERE id = ?"
+
+    first = client._result_cache_key(query, params=[1])
+
+    assert client._result_cache_key(query, params=[1]) == first
+    assert client._result_cache_key(query, params=[2])[0] != first[0]
+    # A string and a number with the same text are different values.
+    assert client._result_cache_key(query, params=["1"])[0] != first[0]
+
+@pytest.mark.parametrize(
+    ("threshold", "literal"),
+    [("7d", "'7d'"), ("1d') , x => ('", "'1d'') , x => ('''")],
+)
+def test_expire_snapshots_quotes_the_threshold(client, monkeypatch, threshold, literal):
+    executed = []
+    monkeypatch.setattr(client, "execute_query", lambda query, **kwargs: executed.append(query))
+    client.expire_snapshots("iceberg", "events", "db", retention_threshold=threshold)
+    assert executed == [f"ALTER TABLE iceberg.db.events EXECUTE expire_snapshots(retention_threshold => {literal})"]
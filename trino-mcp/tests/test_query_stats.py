@@ -0,0 +1,95 @@
+"""Tests of the per-query runtime statistics."""
+
+import pytest
+
+from query_stats import QueryStatsRecorder, percentile, query_tags, tag_queries
+
+
+def stats(query_id, elapsed_ms=0, state="FINISHED", cpu_ms=0, processed_bytes=0):
+    return {
+        "queryId": query_id,
+        "state": state,
+        "elapsedTimeMillis": elapsed_ms,
+        "cpuTimeMillis": cpu_ms,
+        "processedBytes": processed_bytes,
+    }
+
+
+@pytest.mark.parametrize(("pct", "expected"), [(0, 1), (50, 5), (90, 9), (99, 10), (100, 10)])
+def test_nearest_rank_percentile(pct, expected):
+    assert percentile(list(range(1, 11)), pct) == expected
+
+
+def test_percentile_of_no_values():
+    assert percentile([], 50) == 0.0
+
+
+def test_tags_nest_and_are_restored():
+    with tag_queries(agent="sql_agent"):
+        with tag_queries(tool="execute_query"):
+            assert query_tags.get() == {"agent": "sql_agent", "tool": "execute_query"}
+        assert query_tags.get() == {"agent": "sql_agent"}
+    assert query_tags.get() == {}
+
+
+def test_records_carry_the_context_tags_and_skip_queries_without_id():
+    recorder = QueryStatsRecorder()
+    recorder.record({})
+    recorder.record({"state": "FAILED"})
+    with tag_queries(tool="describe_table", agent="gaid_agent"):
+        recorder.record(stats("q1", elapsed_ms=12))
+    [record] = recorder.recent()
+    assert record["query_id"] == "q1"
+    assert record["tool"] == "describe_table"
+    assert record["agent"] == "gaid_agent"
+    assert record["elapsed_ms"] == 12
+    assert record["spilled_bytes"] == 0
+
+
+def test_ring_buffer_keeps_the_most_recent_queries():
+    recorder = QueryStatsRecorder(capacity=2)
+    for query_id in ("q1", "q2", "q3"):
+        recorder.record(stats(query_id), {})
+    assert [record["query_id"] for record in recorder.recent()] == ["q3", "q2"]
+    assert recorder.summary()["recorded_total"] == 3
+    assert recorder.summary()["buffered"] == 2
+
+
+def test_summary_per_tool_and_agent():
+    recorder = QueryStatsRecorder()
+    recorder.record(
+        stats("q1", elapsed_ms=100, cpu_ms=10, processed_bytes=1000), {"tool": "execute_query", "agent": "a"}
+    )
+    recorder.record(stats("q2", elapsed_ms=300, state="FAILED", cpu_ms=30), {"tool": "execute_query", "agent": "b"})
+    recorder.record(stats("q3", elapsed_ms=200), {"agent": "a"})
+    summary = recorder.summary()
+
+    assert summary["overall"]["queries"] == 3
+    assert summary["overall"]["failed"] == 1
+    assert summary["overall"]["cpu_ms_total"] == 40
+    assert summary["overall"]["elapsed_ms"] == {"p50": 200, "p90": 300, "p99": 300, "max": 300}
+    assert sorted(summary["by_tool"]) == ["execute_query", "unknown"]
+    assert summary["by_tool"]["execute_query"]["queries"] == 2
+    assert summary["by_agent"]["a"]["processed_bytes_total"] == 1000
+
+
+def test_client_records_every_query_with_its_agent_and_tool(client, fake_trino):
+    client.config.agent_name = "sql_agent"
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+    with tag_queries(tool="execute_query"):
+        client.execute_query("SELECT id FROM t")
+    client.execute_query("SELECT id FROM t")
+
+    second, first = client.query_stats.recent()
+    assert (first["query_id"], first["agent"], first["tool"]) == ("q1", "sql_agent", "execute_query")
+    assert "tool" not in second
+    assert first["elapsed_ms"] == 5
+
+
+def test_abandoned_stream_is_recorded_once(client, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(i,) for i in range(4)])
+    stream = client.stream_query("SELECT id FROM t", batch_size=1)
+    next(stream)
+    assert client.query_stats.recent() == []
+    stream.close()
+    assert len(client.query_stats.recent()) == 1
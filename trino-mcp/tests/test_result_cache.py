@@ -0,0 +1,151 @@
+"""Tests of the on-disk result cache and of the choice of cacheable queries."""
+
+import json
+import os
+
+import pytest
+import trino
+
+from config import TrinoConfig
+from result_cache import ResultCache
+
+
+def test_get_returns_stored_value(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1024)
+    assert cache.get("q", "v1") is None
+    cache.put("q", "v1", '{"a": 1}')
+    assert cache.get("q", "v1") == '{"a": 1}'
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_new_version_replaces_older_versions(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1024)
+    cache.put("q", "v1", "old")
+    cache.put("q", "v2", "new")
+    assert cache.get("q", "v1") is None
+    assert cache.get("q", "v2") == "new"
+    assert sorted(os.listdir(tmp_path)) == ["q-v2.json"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10)
+    cache.put("a", "1", "aaaa")
+    cache.put("b", "1", "bbbb")
+    cache.get("a", "1")
+    cache.put("c", "1", "cccc")
+
+    assert cache.get("b", "1") is None
+    assert cache.get("a", "1") == "aaaa"
+    assert cache.get("c", "1") == "cccc"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+def test_results_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=4)
+    cache.put("a", "1", "too large")
+    assert cache.get("a", "1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_reopened_cache_keeps_its_entries(tmp_path):
+    ResultCache(str(tmp_path), max_bytes=1024).put("q", "v1", "value")
+    cache = ResultCache(str(tmp_path), max_bytes=1024)
+    assert cache.get("q", "v1") == "value"
+    assert cache.stats()["bytes"] == len("value")
+
+
+def test_result_file_removed_underneath_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1024)
+    cache.put("q", "v1", "value")
+    os.remove(tmp_path / "q-v1.json")
+    assert cache.get("q", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+COLUMNS = [("id", "bigint")]
+QUERY = "SELECT id FROM events"
+EVENTS_PLAN = {
+    "inputTableColumnInfos": [{"table": {"catalog": "iceberg", "schemaTable": {"schema": "db", "table": "events"}}}]
+}
+
+
+@pytest.fixture
+def client(client):
+    """The shared client with a result cache."""
+    client.result_cache = ResultCache(client.config.result_cache_dir, max_bytes=1024 * 1024)
+    return client
+
+
+def serve_events(fake_trino, snapshot=1, iceberg=True):
+    """Plan queries as reading iceberg.db.events, at the given snapshot, and answer them."""
+    fake_trino.results["EXPLAIN"] = ([("Query Plan", "varchar")], [(json.dumps(EVENTS_PLAN),)])
+    fake_trino.results["$history"] = (
+        ([("snapshot_id", "bigint")], [(snapshot,)])
+        if iceberg
+        else trino.exceptions.TrinoUserError({"message": "Table 'events$history' does not exist"})
+    )
+    fake_trino.results["FROM events"] = (COLUMNS, [(1,), (2,)])
+
+
+def runs(fake_trino, query=QUERY):
+    return sum(executed == query for executed, _ in fake_trino.queries)
+
+
+def test_query_is_served_from_the_cache_until_a_new_snapshot(client, fake_trino):
+    serve_events(fake_trino)
+    first = client.execute_query(QUERY)
+    assert client.execute_query(QUERY) == first
+    assert runs(fake_trino) == 1
+
+    serve_events(fake_trino, snapshot=2)
+    client.execute_query(QUERY)
+    assert runs(fake_trino) == 2
+
+
+def test_equivalent_spellings_share_an_entry_but_literals_do_not(client, fake_trino):
+    serve_events(fake_trino)
+    client.execute_query("SELECT id FROM events WHERE name = 'a  b'")
+    client.execute_query("SELECT  id\nFROM events -- comment\nWHERE name = 'a  b';")
+    client.execute_query("SELECT id FROM events WHERE name = 'a b'")
+    data_queries = [query for query, _ in fake_trino.queries if query.startswith(("SELECT id", "SELECT  id"))]
+    assert len(data_queries) == 2
+
+
+def test_non_iceberg_tables_are_not_cached(client, fake_trino):
+    serve_events(fake_trino, iceberg=False)
+    client.execute_query(QUERY)
+    client.execute_query(QUERY)
+    assert runs(fake_trino) == 2
+    assert client.result_cache.stats()["entries"] == 0
+
+
+def test_nondeterministic_and_metadata_queries_are_not_planned(client, fake_trino):
+    serve_events(fake_trino)
+    for query in ["SELECT now() FROM events", 'SELECT * FROM "events$snapshots"', "INSERT INTO events VALUES (1)"]:
+        client.execute_query(query)
+    assert not any(query.startswith("EXPLAIN") for query, _ in fake_trino.queries)
+
+
+def test_use_cache_false_always_runs_the_query(client, fake_trino):
+    serve_events(fake_trino)
+    client.execute_query(QUERY)
+    client.execute_query(QUERY, use_cache=False)
+    assert runs(fake_trino) == 2
+
+
+def test_uncacheable_query_is_planned_once_until_invalidated(client, fake_trino):
+    serve_events(fake_trino, iceberg=False)
+    for _ in range(3):
+        client.execute_query(QUERY)
+    assert sum(query.startswith("EXPLAIN") for query, _ in fake_trino.queries) == 1
+    assert runs(fake_trino) == 3
+
+    client.invalidate_metadata()
+    client.execute_query(QUERY)
+    assert sum(query.startswith("EXPLAIN") for query, _ in fake_trino.queries) == 2
+
+
+def test_result_cache_is_disabled_by_default():
+    assert TrinoConfig(host="localhost", port=8080, user="test").result_cache_max_bytes == 0
@@ -0,0 +1,163 @@
+"""Tests of the result encoders: typed converters and the output formats."""
+
+import base64
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pytest
+
+import result_format
+from result_format import ArrowEncoder, OutputFormatError, RowEncoder, encode_result, value_converter
+
+COLUMNS = [
+    ("id", "bigint"),
+    ("amount", "decimal(10,2)"),
+    ("created", "timestamp(3) with time zone"),
+    ("day", "date"),
+    ("request_id", "uuid"),
+    ("prices", "array(decimal(10,2))"),
+    ("counts", "map(varchar, integer)"),
+    ("source", "row(pkg_name varchar, version integer)"),
+    ("name", "varchar"),
+]
+ROWS = [
+    [
+        1,
+        Decimal("1.50"),
+        datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        date(2024, 5, 1),
+        uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        [Decimal("0.10"), None],
+        {"install": 3},
+        ("com.example.app", 2),
+        "a,b",
+    ],
+    [2, None, None, None, None, None, None, None, 'say "hi"\nbye'],
+]
+MAY_FIRST = "2024-05-01 00:00:00"
+
+
+def legacy_records(columns, rows):
+    """The encoding RowEncoder replaced: one json.dumps(default=str) per row."""
+    names = [name for name, _ in columns]
+    return [json.loads(json.dumps(dict(zip(names, row, strict=True)), default=str)) for row in rows]
+
+
+def test_json_matches_the_per_row_default_str_encoding():
+    assert json.loads(encode_result(COLUMNS, [ROWS[:1], [], ROWS[1:]])) == legacy_records(COLUMNS, ROWS)
+
+
+def test_json_of_an_empty_result_is_an_empty_list():
+    assert encode_result(COLUMNS, [[], []]) == "[]"
+
+
+def test_row_encoder_json_lines_match_records():
+    encoder = RowEncoder(COLUMNS)
+    assert [json.loads(line) for line in encoder.json_lines(ROWS)] == legacy_records(COLUMNS, ROWS)
+
+
+def test_standard_library_fallback_writes_the_same_json(monkeypatch):
+    with_orjson = encode_result(COLUMNS, [ROWS])
+    monkeypatch.setattr(result_format, "orjson", None)
+    assert encode_result(COLUMNS, [ROWS]) == with_orjson
+
+
+def test_row_encoder_leaves_rows_of_native_types_untouched():
+    rows = [[1, "a"], [2, None]]
+    assert RowEncoder([("id", "bigint"), ("name", "varchar")]).convert(rows) is rows
+
+
+@pytest.mark.parametrize(
+    ("type_name", "value", "expected"),
+    [
+        ("array(varchar)", ["a", None], None),
+        ("array(array(date))", [[date(2024, 5, 1)], None], [["2024-05-01"], None]),
+        ("map(date, array(decimal(4,1)))", {date(2024, 5, 1): [Decimal("1.0")]}, {"2024-05-01": ["1.0"]}),
+        ("row(a varchar, b bigint)", ("x", 1), ["x", 1]),
+        ('row("x y" timestamp(3) with time zone, "z""" date)', (datetime(2024, 5, 1), None), [MAY_FIRST, None]),
+        ("row(timestamp(3) with time zone, interval day to second)", (datetime(2024, 5, 1), None), [MAY_FIRST, None]),
+    ],
+)
+def test_converters_follow_nested_types(type_name, value, expected):
+    converter = value_converter(type_name)
+    if expected is None:
+        assert converter is None
+    else:
+        assert converter(value) == expected
+
+
+def test_columns_format_stores_values_by_column():
+    result = json.loads(encode_result(COLUMNS, [ROWS], "columns", ["id", "amount"]))
+    assert result == {
+        "columns": ["id", "amount"],
+        "types": ["bigint", "decimal(10,2)"],
+        "data": [[1, 2], ["1.50", None]],
+    }
+
+
+def test_columns_format_of_an_empty_result():
+    result = json.loads(encode_result([("id", "bigint")], [], "columns"))
+    assert result == {"columns": ["id"], "types": ["bigint"], "data": [[]]}
+
+
+@pytest.mark.parametrize(
+    ("output_format", "expected"),
+    [
+        (
+            "csv",
+            'id,prices,source,name\n1,"[""0.10"",null]","[""com.example.app"",2]","a,b"\n2,,,"say ""hi""\nbye"\n',
+        ),
+        (
+            "tsv",
+            'id\tprices\tsource\tname\n1\t"[""0.10"",null]"\t"[""com.example.app"",2]"\ta,b\n'
+            '2\t\t\t"say ""hi""\nbye"\n',
+        ),
+    ],
+)
+def test_delimited_formats_quote_fields_and_write_nested_values_as_compact_json(output_format, expected):
+    assert encode_result(COLUMNS, [ROWS], output_format, ["id", "prices", "source", "name"]) == expected
+
+
+def test_arrow_format_keeps_the_column_types():
+    result = encode_result(COLUMNS, [ROWS], "arrow", ["id", "amount", "day", "prices"])
+    table = pa.ipc.open_stream(base64.b64decode(result)).read_all()
+    assert table.column_names == ["id", "amount", "day", "prices"]
+    assert table.to_pylist() == [
+        {"id": 1, "amount": Decimal("1.50"), "day": date(2024, 5, 1), "prices": [Decimal("0.10"), None]},
+        {"id": 2, "amount": None, "day": None, "prices": None},
+    ]
+
+
+def test_arrow_format_stores_maps_and_rows_as_json_and_other_types_as_strings():
+    result = encode_result(COLUMNS, [ROWS], "arrow", ["created", "request_id", "counts", "source"])
+    table = pa.ipc.open_stream(base64.b64decode(result)).read_all()
+    assert [str(field.type) for field in table.schema] == ["timestamp[us, tz=UTC]", "string", "string", "string"]
+    assert ArrowEncoder.columns(table.schema) == [
+        ("created", "timestamp(3) with time zone"),
+        ("request_id", "uuid"),
+        ("counts", "map(varchar, integer)"),
+        ("source", "row(pkg_name varchar, version integer)"),
+    ]
+    _, request_id, counts, source = ArrowEncoder.rows(table)[0]
+    assert request_id == "12345678-1234-5678-1234-567812345678"
+    assert (counts, source) == ({"install": 3}, ["com.example.app", 2])
+
+
+def test_arrow_format_of_an_empty_result_has_the_schema():
+    table = pa.ipc.open_stream(base64.b64decode(encode_result([("id", "bigint")], [[]], "arrow"))).read_all()
+    assert table.num_rows == 0
+    assert table.schema.field("id").type == pa.int64()
+
+
+def test_projection_reorders_columns():
+    assert json.loads(encode_result(COLUMNS, [ROWS[:1]], "json", ["name", "id"])) == [{"name": "a,b", "id": 1}]
+
+
+def test_unknown_format_and_column_are_rejected():
+    with pytest.raises(OutputFormatError):
+        encode_result(COLUMNS, [ROWS], "xml")
+    with pytest.raises(OutputFormatError, match="Unknown columns: missing"):
+        encode_result(COLUMNS, [ROWS], "json", ["id", "missing"])
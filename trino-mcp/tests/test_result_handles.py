@@ -0,0 +1,86 @@
+"""Tests of paginated result handles."""
+
+import json
+import os
+import time
+
+import pytest
+import trino
+
+from result_handles import ResultHandleError, ResultHandleStore
+
+
+@pytest.fixture
+def store(client, tmp_path):
+    return ResultHandleStore(client, str(tmp_path / "handles"), ttl=600, page_size=2)
+
+
+def test_result_is_served_page_by_page(store, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(i,) for i in range(5)])
+    first = json.loads(store.open("SELECT id FROM t", wait=5))
+    assert first["columns"] == [{"name": "id", "type": "bigint"}]
+    assert first["rows"] == [{"id": 0}, {"id": 1}]
+    assert first["has_more"]
+
+    last = json.loads(store.fetch_page(first["handle"], 2, wait=5))
+    assert last["complete"]
+    assert last["row_count"] == 5
+    assert last["rows"] == [{"id": 4}]
+    assert not last["has_more"]
+
+
+def test_query_errors_are_reported_through_the_handle(store, fake_trino):
+    fake_trino.results["FROM missing"] = trino.exceptions.TrinoUserError({"message": "Table 'missing' does not exist"})
+    page = json.loads(store.open("SELECT * FROM missing", wait=5))
+    assert page["complete"]
+    assert "does not exist" in page["error"]
+    assert page["rows"] == []
+
+
+def test_closed_handle_is_unknown_and_its_file_removed(store, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+    handle = json.loads(store.open("SELECT id FROM t", wait=5))["handle"]
+    assert store.close(handle)
+    assert os.listdir(store.directory) == []
+    assert not store.close(handle)
+    with pytest.raises(ResultHandleError):
+        store.fetch_page(handle, 0)
+
+
+def test_idle_handles_expire(client, fake_trino, tmp_path):
+    store = ResultHandleStore(client, str(tmp_path), ttl=0, page_size=2)
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+    handle = json.loads(store.open("SELECT id FROM t", wait=5))["handle"]
+    with pytest.raises(ResultHandleError):
+        store.fetch_page(handle, 0)
+
+
+def test_first_page_returns_before_the_spool_completes(store, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+    fake_trino.fetch_delay = 0.5
+    page = json.loads(store.open("SELECT id FROM t", wait=0.05))
+    assert not page["complete"]
+    assert page["has_more"]
+    assert page["rows"] == []
+
+    page = json.loads(store.fetch_page(page["handle"], 0, wait=5))
+    assert page["rows"] == [{"id": 1}]
+
+
+def test_closing_a_running_spool_cancels_the_query(store, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(1,)])
+    fake_trino.fetch_delay = 0.2
+    handle = json.loads(store.open("SELECT id FROM t", wait=0.01))["handle"]
+    while not fake_trino.fetches:
+        time.sleep(0.005)
+    assert store.close(handle)
+    assert fake_trino.cancelled >= 1
+
+
+def test_page_past_the_end_is_empty(store, fake_trino):
+    fake_trino.results["FROM t"] = ([("id", "bigint")], [(i,) for i in range(4)])
+    handle = json.loads(store.open("SELECT id FROM t", wait=5))["handle"]
+    page = json.loads(store.fetch_page(handle, 5, wait=5))
+    assert page["rows"] == []
+    assert not page["has_more"]
+    assert json.loads(store.fetch_page(handle, 1, wait=5))["has_more"] is False
@@ -0,0 +1,172 @@
+"""Tests of the partition-pruned scan estimate and the scan budget."""
+
+import pytest
+import trino
+
+from config import TrinoConfig
+from metadata_cache import MetadataCache
+from scan_estimator import ScanBudgetExceededError, ScanEstimator, format_bytes
+
+GIB = 1024**3
+
+DAY_CONSTRAINT = {
+    "columnName": "day",
+    "type": "varchar",
+    "domain": {
+        "nullsAllowed": False,
+        "ranges": [
+            {"low": {"value": "2024-05-02", "bound": "EXACTLY"}, "high": {"value": "2024-05-03", "bound": "BELOW"}}
+        ],
+    },
+}
+
+
+class FakeClient:
+    """Answers ``EXPLAIN (TYPE IO)`` and ``$partitions`` queries from fixed data."""
+
+    def __init__(self, plan, partitions):
+        self.plan = plan
+        self.partitions = partitions
+        self.metadata_cache = MetadataCache(ttl=60)
+        self.partition_queries = 0
+
+    def explain_io(self, query, params=None):
+        return self.plan
+
+    def open_result(self, query, batch_size=None, params=None):
+        self.partition_queries += 1
+        if self.partitions is None:
+            raise trino.exceptions.TrinoUserError({"message": "Table 'events$partitions' does not exist"})
+        return None, iter([self.partitions])
+
+
+def io_plan(constraints=None, none=False, planner_bytes=None):
+    return {
+        "inputTableColumnInfos": [
+            {
+                "table": {"catalog": "iceberg", "schemaTable": {"schema": "db", "table": "events"}},
+                "constraint": {"none": none, "columnConstraints": constraints or []},
+                "estimate": {"outputSizeInBytes": planner_bytes},
+            }
+        ]
+    }
+
+
+PARTITIONS = [
+    ('{"day":"2024-05-01"}', 100, 2, 3 * GIB),
+    ('{"day":"2024-05-02"}', 200, 4, 5 * GIB),
+    ('{"day":"2024-05-03"}', 300, 6, 7 * GIB),
+]
+
+
+def make_estimator(plan, budget_gib=0, partitions=PARTITIONS):
+    config = TrinoConfig(host="localhost", port=8080, user="test", scan_budget_bytes=budget_gib * GIB)
+    return ScanEstimator(FakeClient(plan, partitions), config)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(512, "512 B"), (1536, "1.5 KiB"), (5 * GIB, "5.0 GiB"), (3 * 1024 * GIB, "3.0 TiB")],
+)
+def test_format_bytes(value, expected):
+    assert format_bytes(value) == expected
+
+
+def test_constraints_prune_partitions():
+    estimate = make_estimator(io_plan([DAY_CONSTRAINT])).estimate("SELECT * FROM events")
+
+    (table,) = estimate["tables"]
+    assert table["source"] == "$partitions"
+    assert table["partitions"] == 3
+    assert table["partitions_scanned"] == 1
+    assert (table["files"], table["rows"], table["bytes"]) == (4, 200, 5 * GIB)
+    assert estimate["estimated_bytes"] == 5 * GIB
+    assert estimate["within_budget"] is None
+
+
+def test_unconstrained_query_reads_every_partition():
+    estimate = make_estimator(io_plan()).estimate("SELECT * FROM events")
+
+    assert estimate["tables"][0]["partitions_scanned"] == 3
+    assert estimate["estimated_bytes"] == 15 * GIB
+
+
+def test_contradictory_predicate_reads_nothing():
+    estimator = make_estimator(io_plan(none=True))
+    estimate = estimator.estimate("SELECT * FROM events WHERE 1 = 0")
+
+    assert estimate["estimated_bytes"] == 0
+    assert estimator.client.partition_queries == 0
+
+
+def test_partitions_are_cached():
+    estimator = make_estimator(io_plan())
+    estimator.estimate("SELECT * FROM events")
+    estimator.estimate("SELECT count(*) FROM events")
+
+    assert estimator.client.partition_queries == 1
+
+
+@pytest.mark.parametrize(
+    "value, ranges, numeric, expected",
+    [
+        (5, [{"low": {"value": 5, "bound": "EXACTLY"}, "high": {"value": 5, "bound": "EXACTLY"}}], True, True),
+        (5, [{"low": {"value": 5, "bound": "ABOVE"}}], True, False),
+        (10, [{"low": {"value": 9, "bound": "EXACTLY"}}], True, True),
+        # Compared as numbers, not as strings where "10" < "9".
+        (10, [{"high": {"value": 9, "bound": "EXACTLY"}}], True, False),
+        ("b", [{"high": {"value": "b", "bound": "BELOW"}}], False, False),
+        (None, [{}], False, False),
+    ],
+)
+def test_in_domain(value, ranges, numeric, expected):
+    constraint = {"type": "bigint" if numeric else "varchar", "domain": {"nullsAllowed": False, "ranges": ranges}}
+    assert ScanEstimator._in_domain(value, constraint) is expected
+
+
+def test_check_rejects_queries_over_budget():
+    estimator = make_estimator(io_plan(), budget_gib=10)
+
+    with pytest.raises(ScanBudgetExceededError) as error:
+        estimator.check("SELECT * FROM events")
+    assert error.value.estimated_bytes == 15 * GIB
+    estimator.check("DELETE FROM events")
+
+
+def test_check_passes_queries_within_budget():
+    estimator = make_estimator(io_plan([DAY_CONSTRAINT]), budget_gib=10)
+
+    estimator.check("SELECT * FROM events")
+    assert estimator.estimate("SELECT * FROM events")["within_budget"] is True
+
+
+def test_tables_without_partitions_use_the_planner_estimate():
+    estimator = make_estimator(io_plan(planner_bytes=2 * GIB), partitions=None)
+    estimate = estimator.estimate("SELECT * FROM events")
+
+    assert estimate["tables"][0]["source"] == "planner"
+    assert estimate["estimated_bytes"] == 2 * GIB
+    # Both the partitioned and the unpartitioned $partitions query were tried.
+    assert estimator.client.partition_queries == 2
+
+
+def test_queries_of_unknown_size_pass_the_budget():
+    estimator = make_estimator(io_plan(planner_bytes=float("nan")), budget_gib=1, partitions=None)
+
+    assert estimator.estimate("SELECT * FROM events")["estimated_bytes"] is None
+    estimator.check("SELECT * FROM events")
+
+
+def test_null_partition_values_follow_the_domain():
+    constraint = {"type": "varchar", "domain": {"nullsAllowed": True, "ranges": []}}
+    assert ScanEstimator._partition_matches({"day": None}, {"day": constraint}) is True
+    assert ScanEstimator._partition_matches({"day": "2024-05-01"}, {"day": constraint}) is False
+    # Constraints on columns that are not partition columns do not prune.
+    assert ScanEstimator._partition_matches({"day": "2024-05-01"}, {"user_id": constraint}) is True
+
+
+def test_client_plans_the_query_without_running_it(client, fake_trino):
+    fake_trino.results["EXPLAIN (TYPE IO, FORMAT JSON)"] = ([("Query Plan", "varchar")], [('{"a": 1}',)])
+
+    assert client.explain_io("SELECT * FROM events") == {"a": 1}
+    assert fake_trino.queries == [("EXPLAIN (TYPE IO, FORMAT JSON) SELECT * FROM events", None)]
@@ -0,0 +1,197 @@
+"""Tests of the cached schema digest."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from config import TrinoConfig
+import server
+from schema_digest import SchemaDigest
+
+CREATE_TABLE = """CREATE TABLE hive.ads.events (
+   day varchar,
+   event_name varchar
+)
+WITH (
+   format = 'ORC',
+   partitioned_by = ARRAY['day','hour']
+)"""
+
+STATS_COLUMNS = [("column_name", "varchar"), ("data_size", "double"), ("row_count", "double")]
+
+
+class FakeClient:
+    """Answers the metadata, statistics and sample queries of a digest."""
+
+    def __init__(self):
+        self.queries = []
+
+    def open_result(self, query, batch_size=None, params=None):
+        self.queries.append(query)
+        if "information_schema.columns" in query:
+            rows = [("events", "day", "varchar"), ("events", "event_name", "varchar"), ("users", "id", "bigint")]
+            return None, iter([rows])
+        if query.startswith("SHOW STATS"):
+            if "users" in query:
+                raise RuntimeError("statistics unavailable")
+            return STATS_COLUMNS, iter([[("day", 10.0, None), (None, None, 1234.0)]])
+        if "TABLESAMPLE" in query:
+            return None, iter([[("click",), ("view",)]])
+        raise AssertionError(query)
+
+    def show_create_table(self, catalog, schema, table):
+        if table == "users":
+            raise RuntimeError("not a table")
+        return CREATE_TABLE
+
+
+@pytest.fixture
+def config(tmp_path):
+    return TrinoConfig(
+        host="localhost",
+        port=8080,
+        user="test",
+        schema_digest_schema="ads",
+        schema_digest_domain_columns=["event_name"],
+        schema_digest_file=str(tmp_path / "digest.json"),
+    )
+
+
+def test_build(config):
+    digest = SchemaDigest(FakeClient(), config).refresh()
+
+    events, users = digest["tables"]
+    assert events["partition_keys"] == ["day", "hour"]
+    assert events["row_count"] == 1234
+    assert events["domains"] == {"event_name": ["click", "view"]}
+    assert users == {
+        "table": "users",
+        "columns": [{"name": "id", "type": "bigint"}],
+        "partition_keys": [],
+        "row_count": None,
+        "domains": {},
+    }
+
+
+def test_render():
+    digest = {
+        "catalog": "hive",
+        "schema": "ads",
+        "built_at": 0,
+        "tables": [
+            {
+                "table": "events",
+                "columns": [{"name": "day", "type": "varchar"}, {"name": "event_name", "type": "varchar"}],
+                "partition_keys": ["day"],
+                "row_count": 1234567,
+                "domains": {"event_name": ["click", "view"], "pkg_name": []},
+            }
+        ],
+    }
+
+    assert SchemaDigest.render(digest).splitlines() == [
+        "# hive.ads (as of 1970-01-01 00:00 UTC)",
+        "## events (~1,234,567 rows; partitioned by day)",
+        "columns: day varchar, event_name varchar",
+        "event_name values (most frequent in a sample): click, view",
+    ]
+
+
+def test_digest_is_shared_through_the_file(config):
+    SchemaDigest(FakeClient(), config).refresh()
+    client = FakeClient()
+
+    digest = SchemaDigest(client, config).get()
+
+    assert [table["table"] for table in digest["tables"]] == ["events", "users"]
+    assert client.queries == []
+
+
+def test_file_of_other_tables_is_ignored(config):
+    SchemaDigest(FakeClient(), config).refresh()
+    config.schema_digest_tables = ["events"]
+    client = FakeClient()
+
+    SchemaDigest(client, config).get()
+
+    assert "AND table_name IN (?)" in client.queries[0]
+
+
+def test_stale_digest_is_served_and_refreshed(config, monkeypatch):
+    SchemaDigest(FakeClient(), config).refresh()
+    with open(config.schema_digest_file, encoding="utf-8") as f:
+        stale = json.load(f)
+    stale["built_at"] = time.time() - config.schema_digest_ttl - 1
+    with open(config.schema_digest_file, "w", encoding="utf-8") as f:
+        json.dump(stale, f)
+    digest = SchemaDigest(FakeClient(), config)
+    refreshed = []
+    monkeypatch.setattr(digest, "refresh_in_background", lambda: refreshed.append(True))
+
+    assert digest.get()["built_at"] == stale["built_at"]
+    assert refreshed == [True]
+
+
+def test_concurrent_refreshes_build_once(config):
+    client = FakeClient()
+    digest = SchemaDigest(client, config)
+    threads = [threading.Thread(target=digest.refresh) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum("information_schema.columns" in query for query in client.queries) == 1
+
+
+def test_forced_refresh_rebuilds_a_fresh_digest(config):
+    client = FakeClient()
+    digest = SchemaDigest(client, config)
+    first = digest.refresh()
+    assert digest.refresh()["built_at"] == first["built_at"]
+    rebuilt = digest.refresh(force=True)
+
+    assert sum("information_schema.columns" in query for query in client.queries) == 2
+    assert rebuilt["built_at"] > first["built_at"]
+    assert SchemaDigest(FakeClient(), config).get()["built_at"] == rebuilt["built_at"]
+
+
+class InlineRunner:
+    """Runs the blocking calls of a tool in the calling thread."""
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        return func(*args, **kwargs)
+
+
+def test_refresh_tool_forces_a_rebuild(config, monkeypatch):
+    client = FakeClient()
+    digest = SchemaDigest(client, config)
+    digest.refresh()
+    monkeypatch.setattr(server, "schema_digest", digest)
+    monkeypatch.setattr(server, "async_client", InlineRunner())
+
+    asyncio.run(server.show_schema_digest(refresh=False))
+    assert sum("information_schema.columns" in query for query in client.queries) == 1
+    asyncio.run(server.show_schema_digest(refresh=True))
+    assert sum("information_schema.columns" in query for query in client.queries) == 2
+
+
+def test_identifiers_are_quoted_in_the_statistics_and_sample_queries(config):
+    config.schema_digest_catalog = 'my"hive'
+    config.schema_digest_domain_columns = ["event_name"]
+    client = FakeClient()
+
+    SchemaDigest(client, config).refresh()
+
+    assert 'FROM "my""hive".information_schema.columns' in client.queries[0]
+    assert 'SHOW STATS FOR "my""hive"."ads"."events"' in client.queries
+    sample = next(query for query in client.queries if "TABLESAMPLE" in query)
+    assert sample.startswith('SELECT CAST("event_name" AS varchar) FROM "my""hive"."ads"."events" TABLESAMPLE')
+
+
+def test_render_of_an_empty_schema():
+    digest = {"catalog": "hive", "schema": "empty", "built_at": 0, "tables": []}
+    assert SchemaDigest.render(digest).splitlines() == ["# hive.empty (as of 1970-01-01 00:00 UTC)", "No tables found"]
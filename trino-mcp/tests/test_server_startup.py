@@ -0,0 +1,49 @@
+"""Tests of the lazy creation of the server's Trino client and services."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+from server import LazyService
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_server_loads_no_client_or_columnar_modules():
+    probe = (
+        "import sys, server; "
+        "print(','.join(m for m in ('trino', 'trino_client', 'numpy', 'pyarrow') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SERVER_DIR, capture_output=True, text=True, check=True, timeout=60
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_service_is_created_once_on_first_use():
+    created = []
+
+    def factory():
+        time.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    service = LazyService(factory)
+    assert created == []
+    threads = [threading.Thread(target=service) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert service() is created[0]
+
+
+def test_attributes_are_forwarded_to_the_service():
+    service = LazyService(lambda: types.SimpleNamespace(pool_size=4, get=lambda: "digest"))
+    assert service.pool_size == 4
+    # Services may have a get method of their own, such as the schema digest.
+    assert service.get() == "digest"
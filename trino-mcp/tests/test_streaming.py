@@ -0,0 +1,61 @@
+"""Tests of batched query execution and streaming of results."""
+
+import datetime
+import decimal
+import json
+
+import pytest
+
+from trino_client import TrinoError
+
+COLUMNS = [("id", "bigint"), ("name", "varchar")]
+ROWS = [(i, f"row-{i}") for i in range(5)]
+
+
+def test_stream_query_fetches_lazily(client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, ROWS)
+    stream = client.stream_query("SELECT * FROM t", batch_size=2)
+    assert fake_trino.fetches == []
+
+    first = next(stream)
+    assert fake_trino.fetches == [2]
+    assert [json.loads(line) for line in first.splitlines()] == [{"id": 0, "name": "row-0"}, {"id": 1, "name": "row-1"}]
+
+    rest = list(stream)
+    # The third batch holds the last row; the fourth, empty fetch ends the stream.
+    assert fake_trino.fetches == [2, 2, 2, 2]
+    assert len(rest) == 2
+
+
+def test_stream_query_in_columns_format(client, fake_trino):
+    fake_trino.results["FROM t"] = (COLUMNS, ROWS[:2])
+    chunks = list(client.stream_query("SELECT * FROM t", output_format="columns"))
+    assert [json.loads(chunk) for chunk in chunks] == [
+        {"columns": ["id", "name"], "data": [[0, 1], ["row-0", "row-1"]]}
+    ]
+
+
+def test_statement_without_result_set_yields_nothing(client, fake_trino):
+    assert list(client.stream_query("CREATE TABLE t (id bigint)")) == []
+    assert client.execute_query("CREATE TABLE t (id bigint)") == "Query executed successfully (no results to display)"
+
+
+def test_unsupported_stream_format_runs_nothing(client, fake_trino):
+    with pytest.raises(TrinoError, match="Unsupported output format"):
+        list(client.stream_query("SELECT * FROM t", output_format="csv"))
+    assert fake_trino.queries == []
+
+
+@pytest.mark.parametrize("rows", [[], ROWS[:1], ROWS])
+def test_execute_query_writes_compact_json(client, fake_trino, rows):
+    fake_trino.results["FROM t"] = (COLUMNS, rows)
+    expected = json.dumps([dict(zip(["id", "name"], row, strict=True)) for row in rows], separators=(",", ":"))
+    assert client.execute_query("SELECT * FROM t") == expected
+
+
+def test_values_without_a_json_type_are_encoded_as_strings(client, fake_trino):
+    fake_trino.results["FROM t"] = (
+        [("day", "date"), ("amount", "decimal(10,2)")],
+        [(datetime.date(2024, 5, 1), decimal.Decimal("1.50"))],
+    )
+    assert json.loads(client.execute_query("SELECT * FROM t")) == [{"day": "2024-05-01", "amount": "1.50"}]
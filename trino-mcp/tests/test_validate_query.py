@@ -0,0 +1,114 @@
+"""Tests of query validation with EXPLAIN and of the distributed plan summary."""
+
+import json
+
+import pytest
+import trino
+
+from trino_client import TrinoClient
+
+
+def node(name, estimates=None, descriptor=None, children=()):
+    return {"name": name, "descriptor": descriptor or {}, "estimates": [estimates or {}], "children": list(children)}
+
+
+PLAN = {
+    "0": node(
+        "Output",
+        {"outputRowCount": 10, "outputSizeInBytes": 90, "cpuCost": 500, "memoryCost": 20, "networkCost": "NaN"},
+        children=[node("RemoteSource")],
+    ),
+    "1": node(
+        "InnerJoin",
+        {"outputRowCount": 10, "cpuCost": 400},
+        {"distribution": "REPLICATED", "criteria": "(pkg_name = pkg_name_0)"},
+        children=[
+            node("ScanProject", {"outputRowCount": 1000, "outputSizeInBytes": 8000}, {"table": "hive:default:t1"}),
+            node("ScanFilterProject", {"outputRowCount": 50}, {"table": "hive:default:t2"}),
+            node("TableScan", {"outputRowCount": "NaN"}, {"table": "hive:default:t3"}),
+        ],
+    ),
+}
+
+
+def test_plan_estimate_is_the_root_estimate_not_a_sum():
+    summary = TrinoClient._summarize_plan(PLAN)
+    assert summary["estimate"] == {"rows": 10, "bytes": 90, "cpu_cost": 500, "memory_cost": 20, "network_cost": None}
+    assert summary["fragments"] == 2
+
+
+def test_every_scan_node_is_listed():
+    scans = TrinoClient._summarize_plan(PLAN)["scans"]
+    assert sorted(scans, key=lambda scan: scan["table"]) == [
+        {"table": "hive:default:t1", "rows": 1000, "bytes": 8000},
+        {"table": "hive:default:t2", "rows": 50, "bytes": None},
+        {"table": "hive:default:t3", "rows": None, "bytes": None},
+    ]
+
+
+@pytest.mark.parametrize(("value", "expected"), [(5, 5), ("7.5", 7.5), ("NaN", None), ("Infinity", None), (None, None)])
+def test_unknown_estimates_are_none(value, expected):
+    assert TrinoClient._estimate({"cpuCost": value}, "cpuCost") == expected
+
+
+def test_joins_report_their_distribution():
+    assert TrinoClient._summarize_plan(PLAN)["joins"] == [
+        {"type": "InnerJoin", "distribution": "REPLICATED", "criteria": "(pkg_name = pkg_name_0)", "rows": 10}
+    ]
+
+
+def test_invalid_query_reports_the_error_position(client):
+    def fetch_rows(query, params=None):
+        raise trino.exceptions.TrinoQueryError(
+            {
+                "message": "line 1:8: Column 'pkg' cannot be resolved",
+                "errorName": "COLUMN_NOT_FOUND",
+                "errorType": "USER_ERROR",
+                "errorLocation": {"lineNumber": 1, "columnNumber": 8},
+            }
+        )
+
+    client._fetch_rows = fetch_rows
+    result = client.validate_query("SELECT pkg FROM t_event")
+    assert result == {
+        "valid": False,
+        "error": {
+            "message": "line 1:8: Column 'pkg' cannot be resolved",
+            "error_name": "COLUMN_NOT_FOUND",
+            "error_type": "USER_ERROR",
+            "line": 1,
+            "column": 8,
+        },
+    }
+
+
+def test_valid_query_is_validated_then_planned_without_running(client):
+    queries = []
+
+    def fetch_rows(query, params=None):
+        queries.append(query)
+        return [(json.dumps(PLAN),)] if "DISTRIBUTED" in query else [(True,)]
+
+    client._fetch_rows = fetch_rows
+    result = client.validate_query("SELECT * FROM t_event")
+    assert queries == [
+        "EXPLAIN (TYPE VALIDATE) SELECT * FROM t_event",
+        "EXPLAIN (TYPE DISTRIBUTED, FORMAT JSON) SELECT * FROM t_event",
+    ]
+    assert result["valid"] is True
+    assert result["estimate"]["cpu_cost"] == 500
+
+
+def test_plan_error_of_a_valid_query_is_reported(client):
+    queries = []
+
+    def fetch_rows(query, params=None):
+        queries.append((query, params))
+        if "DISTRIBUTED" in query:
+            raise trino.exceptions.TrinoQueryError({"message": "Catalog 'x' does not support planning"})
+        return [(True,)]
+
+    client._fetch_rows = fetch_rows
+    result = client.validate_query("SELECT * FROM t_event WHERE day = ?", params=["2024-05-01"])
+    assert result == {"valid": True, "error": None, "plan_error": "Catalog 'x' does not support planning"}
+    assert [params for _, params in queries] == [["2024-05-01"], ["2024-05-01"]]
@@ -4,11 +4,54 @@ This module provides a client for executing queries and managing operations on T
 including specific support for Iceberg table operations.
 """
 
+import hashlib
 import json
-
+import math
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+
+import requests
 import trino
 
 from config import TrinoConfig
+from admission import AdmissionController
+from coordinator_router import CoordinatorRouter
+from metadata_cache import MetadataCache
+from query_stats import QueryStatsRecorder, query_tags
+from result_cache import ResultCache
+from result_format import RowEncoder, check_output_format, dumps, encode_result
+
+
+# Number of rows requested from the coordinator per fetchmany() call when streaming results.
+DEFAULT_FETCH_SIZE = 1000
+
+# Returned by execute_query for statements without a result set.
+NO_RESULTS_MESSAGE = "Query executed successfully (no results to display)"
+
+# Output formats whose results are embedded as JSON values in a batch response.
+JSON_OUTPUT_FORMATS = ("json", "columns")
+
+# Statements that change catalog metadata or table statistics, and the object they target.
+METADATA_CHANGE_PATTERN = re.compile(
+    r"^\s*(CREATE|DROP|ALTER|COMMENT|TRUNCATE|INSERT|DELETE|UPDATE|MERGE)\b", re.IGNORECASE
+)
+METADATA_TARGET_PATTERN = re.compile(
+    r"\b(TABLE|VIEW|SCHEMA|INTO|FROM|UPDATE)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.\"]+)", re.IGNORECASE
+)
+
+# Read-only statements whose results may be served from the result cache, unless they call
+# functions that return a different value on every run.
+CACHEABLE_QUERY_PATTERN = re.compile(r"^\s*(SELECT|WITH|VALUES|TABLE)\b", re.IGNORECASE)
+NONDETERMINISTIC_PATTERN = re.compile(
+    r"\b(now|rand|random|uuid|shuffle|current_date|current_time|current_timestamp|localtime|localtimestamp)\b",
+    re.IGNORECASE,
+)
+STRING_LITERAL_PATTERN = re.compile(r"('(?:[^']|'')*')")
+SQL_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
 
 
 class TrinoError(Exception):
@@ -27,6 +70,56 @@ class CatalogSchemaError(TrinoError):
         super().__init__("Both catalog and schema must be specified")
 
 
+class QueryCancelledError(TrinoError):
+    """Error raised when a query is cancelled through its cancel scope."""
+
+    def __init__(self):
+        super().__init__("Query was cancelled")
+
+
+class QueryCancelScope:
+    """Tracks the cursors started by one logical call so they can be cancelled from another thread.
+
+    A scope is activated by setting :data:`current_cancel_scope`; every cursor the client
+    opens while it is active registers itself, and :meth:`cancel` stops those queries on the
+    coordinator and makes further queries under the scope fail.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursors: set[trino.dbapi.Cursor] = set()
+        self.cancelled = False
+
+    def register(self, cur: trino.dbapi.Cursor) -> None:
+        """Track a cursor, failing immediately if the scope is already cancelled."""
+        with self._lock:
+            self.raise_if_cancelled()
+            self._cursors.add(cur)
+
+    def unregister(self, cur: trino.dbapi.Cursor) -> None:
+        """Stop tracking a cursor whose query has finished."""
+        with self._lock:
+            self._cursors.discard(cur)
+
+    def raise_if_cancelled(self) -> None:
+        """Raise QueryCancelledError if the scope has been cancelled."""
+        if self.cancelled:
+            raise QueryCancelledError
+
+    def cancel(self) -> None:
+        """Cancel every query running under this scope."""
+        with self._lock:
+            self.cancelled = True
+            cursors = list(self._cursors)
+        for cur in cursors:
+            # A query that has not been submitted yet is stopped at its next batch by the flag.
+            TrinoClient._cancel_cursor(cur)
+
+
+# Cancel scope of the call currently running in this context, if any.
+current_cancel_scope: ContextVar[QueryCancelScope | None] = ContextVar("current_cancel_scope", default=None)
+
+
 class TrinoClient:
     """A client for interacting with Trino server.
 
@@ -35,7 +128,12 @@ class TrinoClient:
 
     Attributes:
         config (TrinoConfig): Configuration object containing Trino connection settings.
-        client (trino.dbapi.Connection): Active connection to the Trino server.
+        router (CoordinatorRouter): Connection pools of the coordinators, and the choice of
+            coordinator for each query.
+        metadata_cache (MetadataCache): Cache for catalog, schema and table lookups.
+        result_cache (ResultCache | None): On-disk cache of query results, None when disabled.
+        query_stats (QueryStatsRecorder): Runtime statistics of the queries run by this client.
+        admission (AdmissionController): Caps the queries this client has in flight.
     """
 
     def __init__(self, config: TrinoConfig):
@@ -45,57 +143,706 @@ class TrinoClient:
             config (TrinoConfig): Configuration object containing Trino connection settings.
         """
         self.config = config
-        self.client = self._create_client()
+        self.router = self._create_router()
+        self.metadata_cache = MetadataCache(config.metadata_cache_size, config.metadata_cache_ttl)
+        self.result_cache = (
+            ResultCache(config.result_cache_dir, config.result_cache_max_bytes)
+            if config.result_cache_max_bytes > 0
+            else None
+        )
+        self.query_stats = QueryStatsRecorder(config.query_stats_capacity)
+        self.admission = AdmissionController(
+            config.admission_max_limit or config.pool_size,
+            min_limit=config.admission_min_limit,
+            target_queue_ms=config.admission_target_queue_ms,
+            target_latency_ms=config.admission_target_latency_ms,
+            timeout=config.admission_timeout,
+        )
 
-    def _create_client(self) -> trino.dbapi.Connection:
-        """Create a new Trino DB API connection.
+    def _create_router(self) -> CoordinatorRouter:
+        """Create the router holding a pool of Trino DB API connections per coordinator.
 
         Returns:
-            trino.dbapi.Connection: A new connection to the Trino server.
+            CoordinatorRouter: Routes queries to the configured coordinators.
         """
-        return trino.dbapi.connect(
-            host=self.config.host,
-            port=self.config.port,
-            user=self.config.user,
-            catalog=self.config.catalog,
-            schema=self.config.schema,
-            http_scheme=self.config.http_scheme,
-            auth=self.config.auth,
-            source=self.config.source,
+        return CoordinatorRouter(
+            self.config.coordinators or [(self.config.host, self.config.port)],
+            {
+                "user": self.config.user,
+                "catalog": self.config.catalog,
+                "schema": self.config.schema,
+                "http_scheme": self.config.http_scheme,
+                "auth": self.config.auth,
+                "source": self.config.source,
+            },
+            pool_size=self.config.pool_size,
+            checkout_timeout=self.config.pool_timeout,
+            health_check_interval=self.config.pool_health_check_interval,
+            probe_interval=self.config.coordinator_probe_interval,
+            sticky_ttl=self.config.routing_sticky_ttl,
         )
 
-    def execute_query(self, query: str) -> str:
+    def stream_query(
+        self,
+        query: str,
+        output_format: str = "ndjson",
+        batch_size: int = DEFAULT_FETCH_SIZE,
+        params: list | None = None,
+    ) -> Iterator[str]:
+        """Execute a SQL query and yield the results in chunks as they arrive.
+
+        Rows are pulled from the coordinator with ``fetchmany`` so that only one batch is
+        held in memory at a time and the first chunk is available before the query finishes.
+
+        Args:
+            query (str): The SQL query to execute.
+            output_format (str): ``"ndjson"`` yields one JSON object per row, newline separated;
+                ``"columns"`` yields one ``{"columns": [...], "data": [[...], ...]}`` object per
+                batch with the values stored column by column.
+            batch_size (int): Number of rows fetched per round trip.
+            params (list | None): Values bound to the ``?`` placeholders of the query, in order.
+
+        Yields:
+            str: A chunk of encoded rows. Statements without a result set yield nothing.
+
+        Raises:
+            TrinoError: If the output format is not supported.
+        """
+        if output_format not in ("ndjson", "columns"):
+            msg = f"Unsupported output format: {output_format}"
+            raise TrinoError(msg)
+        columns, batches = self.open_result(query, batch_size, params)
+        if columns is None:
+            return
+        encoder = RowEncoder(columns)
+        for rows in batches:
+            if output_format == "ndjson":
+                yield "".join(f"{record}\n" for record in encoder.json_lines(rows))
+            else:
+                data = [list(values) for values in zip(*encoder.convert(rows), strict=True)]
+                yield dumps({"columns": encoder.names, "data": data}) + "\n"
+
+    def execute_query(
+        self,
+        query: str,
+        use_cache: bool = True,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+        params: list | None = None,
+    ) -> str:
         """Execute a SQL query against Trino and return results as a formatted string.
 
+        Built on the same batched execution as :meth:`stream_query`: the result is encoded
+        incrementally from ``fetchmany`` batches rather than from a full ``fetchall``, so only
+        the encoded output is held in memory.
+
+        Read-only queries over Iceberg tables are served from the result cache when the
+        same query already ran against the current snapshots of all its tables.
+
+        Values passed in ``params`` are bound to the ``?`` placeholders of the query through
+        the client's prepared statement support instead of being spliced into the SQL text,
+        so one templated statement serves every set of values.
+
         Args:
             query (str): The SQL query to execute.
-            params (Optional[dict]): Dictionary of query parameters with primitive types.
+            use_cache (bool): Whether the result cache may be used for this query.
+            output_format (str): Result encoding, one of ``OUTPUT_FORMATS``; see
+                :func:`result_format.encode_result`.
+            columns (list[str] | None): Result columns to return, in this order; defaults to all.
+            params (list | None): Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            str: Query results in the requested encoding, or a success message.
+
+        Raises:
+            OutputFormatError: If the format is not supported or a requested column is unknown.
+        """
+        check_output_format(output_format)
+        cache_key = (
+            self._result_cache_key(query, output_format, columns, params)
+            if use_cache and self.result_cache is not None
+            else None
+        )
+        if cache_key is not None:
+            cached = self.result_cache.get(*cache_key)
+            if cached is not None:
+                return cached
+        result_columns, batches = self.open_result(query, DEFAULT_FETCH_SIZE, params)
+        if result_columns is None:
+            return NO_RESULTS_MESSAGE
+        try:
+            result = encode_result(result_columns, batches, output_format, columns)
+        finally:
+            batches.close()
+        if cache_key is not None:
+            self.result_cache.put(*cache_key, result)
+        return result
+
+    def execute_batch(
+        self,
+        statements: list[str],
+        params: list[list | None] | None = None,
+        output_format: str = "json",
+        check: Callable[[str, list | None], None] | None = None,
+    ) -> str:
+        """Execute several statements concurrently and return all their results in one response.
+
+        Statements run through :meth:`execute_query` with at most ``config.batch_workers``
+        in flight. A failing statement does not stop the others; its error is reported in
+        its entry instead.
+
+        Args:
+            statements (list[str]): The SQL statements to execute.
+            params (list[list | None] | None): Values bound to the ``?`` placeholders of each
+                statement, by position; shorter lists leave the remaining statements unbound.
+            output_format (str): Result encoding of every statement, one of ``OUTPUT_FORMATS``.
+            check (Callable | None): Called with each statement and its values before it runs,
+                e.g. the scan budget check; an error it raises fails that statement.
 
         Returns:
-            str: JSON-formatted string containing query results or success message.
+            str: JSON array with, per statement in the given order, its index, status
+            (``ok`` or ``error``), elapsed milliseconds, and the result or the error. Results
+            in the ``json`` and ``columns`` formats are embedded as JSON, others as strings.
+
+        Raises:
+            OutputFormatError: If the format is not supported.
         """
-        cur: trino.dbapi.Cursor = self.client.cursor()
-        cur.execute(query)
-        if cur.description:
-            return json.dumps(
-                [dict(zip([col[0] for col in cur.description], row, strict=True)) for row in cur.fetchall()],
-                default=str,
+        check_output_format(output_format)
+        if not statements:
+            return "[]"
+        params = list(params or [])
+        params += [None] * (len(statements) - len(params))
+        workers = max(1, min(self.config.batch_workers, self.config.pool_size, len(statements)))
+        # Each worker call runs in a copy of this context, so the cancel scope and query tags apply to it.
+        contexts = [copy_context() for _ in statements]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            entries = list(
+                executor.map(
+                    lambda context, index, query, values: context.run(
+                        self._execute_batch_statement, index, query, values, output_format, check
+                    ),
+                    contexts,
+                    range(len(statements)),
+                    statements,
+                    params[: len(statements)],
+                )
             )
-        return "Query executed successfully (no results to display)"
+        return dumps(entries)
+
+    def _execute_batch_statement(
+        self,
+        index: int,
+        query: str,
+        params: list | None,
+        output_format: str,
+        check: Callable[[str, list | None], None] | None,
+    ) -> dict:
+        """Execute one statement of a batch and describe its outcome."""
+        started = time.perf_counter()
+        entry = {"index": index, "status": "ok", "elapsed_ms": 0, "result": None, "error": None, "error_name": None}
+        try:
+            if check is not None:
+                check(query, params)
+            result = self.execute_query(query, output_format=output_format, params=params)
+            if output_format in JSON_OUTPUT_FORMATS and result != NO_RESULTS_MESSAGE:
+                result = json.loads(result)
+            entry["result"] = result
+        except Exception as e:  # noqa: BLE001 - reported per statement, the batch goes on
+            entry["status"] = "error"
+            entry["error"] = getattr(e, "message", None) or str(e)
+            entry["error_name"] = getattr(e, "error_name", None)
+        entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+        return entry
+
+    def _result_cache_key(
+        self,
+        query: str,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+        params: list | None = None,
+    ) -> tuple[str, str] | None:
+        """Build the result cache key of a query, or return None if it must not be cached.
+
+        The key is made of a hash of the normalized SQL and a hash of the current snapshot
+        ID of every table the query reads, so a new snapshot of any of them yields a new key.
+        Each encoding, projection and set of bound parameters of the same query is cached
+        separately.
+        Queries that read non-Iceberg tables, metadata tables or nothing at all are not cached.
+        """
+        normalized = self._normalize_sql(query)
+        if not CACHEABLE_QUERY_PATTERN.match(normalized) or NONDETERMINISTIC_PATTERN.search(normalized):
+            return None
+        if "$" in normalized:
+            return None
+        try:
+            tables = self._cacheable_tables(normalized, query, params)
+            if tables is None:
+                return None
+            snapshots = [self._current_snapshot_id(*table) for table in tables]
+        except trino.exceptions.TrinoQueryError:
+            return None
+        if None in snapshots:
+            return None
+        variant = f"{output_format}|{','.join(columns or [])}|{dumps(params or [])}"
+        scope = f"{self.config.user}|{self.config.catalog}|{self.config.schema}|{variant}|{normalized}"
+        group = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:32]
+        state = json.dumps([[".".join(table), snapshot] for table, snapshot in zip(tables, snapshots, strict=True)])
+        version = hashlib.sha256(state.encode("utf-8")).hexdigest()[:16]
+        return group, version
+
+    def _cacheable_tables(
+        self, normalized: str, query: str, params: list | None = None
+    ) -> tuple[tuple[str, str, str], ...] | None:
+        """Return the tables a query reads if its result can be cached, or None if it cannot.
+
+        The answer is kept in the metadata cache per normalized SQL text, so the IO plan is
+        requested once per query rather than before every run, and a query over non-Iceberg
+        tables is not planned again until the entry expires or a DDL statement invalidates it.
+        """
+
+        def load() -> tuple[tuple[str, str, str], ...] | None:
+            tables = self._input_tables(query, params)
+            if not tables or not all(self._is_iceberg_table(*table) for table in tables):
+                return None
+            return tuple(tables)
+
+        return self.metadata_cache.get_or_load(("cacheable_tables", None, None, None, normalized), load)
+
+    @staticmethod
+    def _normalize_sql(query: str) -> str:
+        """Strip comments, surrounding whitespace and a trailing semicolon, and collapse whitespace.
+
+        String literals are kept verbatim.
+        """
+        parts = STRING_LITERAL_PATTERN.split(query)
+        for i in range(0, len(parts), 2):
+            parts[i] = re.sub(r"\s+", " ", SQL_COMMENT_PATTERN.sub(" ", parts[i]))
+        return "".join(parts).strip().rstrip(";").strip()
+
+    def explain_io(self, query: str, params: list | None = None) -> dict:
+        """Plan a query without running it and return its input and output tables.
+
+        Uses ``EXPLAIN (TYPE IO, FORMAT JSON)``. Each entry of ``inputTableColumnInfos``
+        holds a table, the constraint the planner derived for its columns, and the
+        planner's estimate of the data read from it.
+
+        Args:
+            query (str): The SQL query to plan.
+            params (list | None): Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            dict: The parsed IO plan.
+        """
+        rows = self._fetch_rows(f"EXPLAIN (TYPE IO, FORMAT JSON) {query}", params)
+        return json.loads(rows[0][0]) if rows else {}
+
+    def validate_query(self, query: str, params: list | None = None) -> dict:
+        """Check a query and summarize its distributed plan, without running it or reading data.
+
+        The query is first analyzed with ``EXPLAIN (TYPE VALIDATE)``, which reports syntax
+        and semantic errors such as unknown columns or mismatched types. A valid query is then
+        planned with ``EXPLAIN (TYPE DISTRIBUTED, FORMAT JSON)`` to read the planner's
+        estimates and the distribution chosen for each join. Estimates are missing (None)
+        for tables without statistics.
+
+        Args:
+            query (str): The SQL query to validate.
+            params (list | None): Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            dict: ``valid`` and, if invalid, the ``error`` with its message, Trino error name
+            and position. For a valid query also the ``estimate`` of the root fragment (output
+            rows and bytes, and the CPU, memory and network cost of the whole plan), the
+            estimated ``scans`` per table, the ``joins`` with their type, distribution and
+            criteria, and the number of plan ``fragments``; or a ``plan_error`` if the
+            distributed plan could not be produced.
+        """
+        try:
+            self._fetch_rows(f"EXPLAIN (TYPE VALIDATE) {query}", params)
+        except trino.exceptions.TrinoQueryError as e:
+            line, column = e.error_location if e.error_location else (None, None)
+            return {
+                "valid": False,
+                "error": {
+                    "message": e.message,
+                    "error_name": e.error_name,
+                    "error_type": e.error_type,
+                    "line": line,
+                    "column": column,
+                },
+            }
+        result = {"valid": True, "error": None}
+        try:
+            rows = self._fetch_rows(f"EXPLAIN (TYPE DISTRIBUTED, FORMAT JSON) {query}", params)
+        except trino.exceptions.TrinoQueryError as e:
+            return {**result, "plan_error": e.message}
+        plan = json.loads(rows[0][0]) if rows else {}
+        return {**result, **self._summarize_plan(plan)}
+
+    @classmethod
+    def _summarize_plan(cls, plan: dict) -> dict:
+        """Summarize the estimates, table scans and joins of a JSON distributed plan.
+
+        The cost estimates of a plan node already include those of its children, so the
+        estimate of the whole plan is the one of the root node of the root fragment.
+        """
+        nodes = []
+        pending = list(plan.values())
+        while pending:
+            node = pending.pop()
+            nodes.append(node)
+            pending.extend(node.get("children", []))
+        root = ((plan.get("0") or {}).get("estimates") or [{}])[0]
+        scans = [
+            {
+                "table": (node.get("descriptor") or {}).get("table"),
+                "rows": cls._estimate((node.get("estimates") or [{}])[0], "outputRowCount"),
+                "bytes": cls._estimate((node.get("estimates") or [{}])[0], "outputSizeInBytes"),
+            }
+            for node in nodes
+            if node.get("name", "").startswith(("TableScan", "Scan"))
+        ]
+        joins = [
+            {
+                "type": node["name"],
+                "distribution": (node.get("descriptor") or {}).get("distribution"),
+                "criteria": (node.get("descriptor") or {}).get("criteria"),
+                "rows": cls._estimate((node.get("estimates") or [{}])[0], "outputRowCount"),
+            }
+            for node in nodes
+            if node.get("name", "").endswith("Join")
+        ]
+        return {
+            "estimate": {
+                "rows": cls._estimate(root, "outputRowCount"),
+                "bytes": cls._estimate(root, "outputSizeInBytes"),
+                "cpu_cost": cls._estimate(root, "cpuCost"),
+                "memory_cost": cls._estimate(root, "memoryCost"),
+                "network_cost": cls._estimate(root, "networkCost"),
+            },
+            "scans": scans,
+            "joins": joins,
+            "fragments": len(plan),
+        }
+
+    @staticmethod
+    def _estimate(estimates: dict, field: str) -> float | None:
+        """Return a planner estimate, or None if it is unknown (NaN)."""
+        value = estimates.get(field)
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+        if not isinstance(value, (int, float)) or math.isnan(value) or math.isinf(value):
+            return None
+        return value
+
+    def _input_tables(self, query: str, params: list | None = None) -> list[tuple[str, str, str]]:
+        """Return the tables a query reads, as planned by the coordinator.
+
+        Returns:
+            list[tuple[str, str, str]]: Sorted ``(catalog, schema, table)`` triples.
+        """
+        plan = self.explain_io(query, params)
+        tables = {
+            (info["table"]["catalog"], info["table"]["schemaTable"]["schema"], info["table"]["schemaTable"]["table"])
+            for info in plan.get("inputTableColumnInfos", [])
+        }
+        return sorted(tables)
+
+    def _is_iceberg_table(self, catalog: str, schema: str, table: str) -> bool:
+        """Check whether a table is an Iceberg table, remembering the answer in the metadata cache."""
+        table_identifier = f'"{catalog}"."{schema}"."{table}$history"'
+        return self.metadata_cache.get_or_load(
+            ("is_iceberg", catalog, schema, table), lambda: self._table_exists(table_identifier)
+        )
+
+    def _current_snapshot_id(self, catalog: str, schema: str, table: str) -> int | None:
+        """Return the current snapshot ID of an Iceberg table, or None for other tables.
+
+        The current snapshot is the latest entry of ``$history`` that is an ancestor of the
+        table's current state, which stays correct after a rollback.
+        """
+        table_identifier = f'"{catalog}"."{schema}"."{table}$history"'
+        if not self._is_iceberg_table(catalog, schema, table):
+            return None
+        rows = self._fetch_rows(
+            f"SELECT snapshot_id FROM {table_identifier} "
+            "WHERE is_current_ancestor ORDER BY made_current_at DESC LIMIT 1"
+        )
+        return rows[0][0] if rows else None
+
+    def _table_exists(self, table_identifier: str) -> bool:
+        """Check whether a (metadata) table can be read."""
+        try:
+            self._fetch_rows(f"SELECT 1 FROM {table_identifier} LIMIT 0")
+        except trino.exceptions.TrinoQueryError:
+            return False
+        return True
+
+    def get_query_stats(self, limit: int = 20) -> str:
+        """Summarize the runtime statistics of recent queries run by this client.
+
+        Args:
+            limit: Number of most recent per-query records to include.
+
+        Returns:
+            str: JSON-formatted percentile summaries overall, per tool and per agent, the state
+            of the admission controller, and the most recent records.
+        """
+        return json.dumps(
+            {
+                **self.query_stats.summary(),
+                "admission": self.admission.status(),
+                "recent": self.query_stats.recent(limit),
+            }
+        )
+
+    def coordinator_status(self) -> str:
+        """Report the health, load and pool occupancy of each coordinator.
+
+        Returns:
+            str: JSON-formatted list with one entry per coordinator.
+        """
+        return json.dumps(self.router.status())
+
+    def result_cache_stats(self) -> str:
+        """Report hit/miss counters of the result cache.
+
+        Returns:
+            str: JSON-formatted cache counters.
+        """
+        return json.dumps(self.result_cache.stats() if self.result_cache is not None else {"enabled": False})
+
+    def open_result(
+        self, query: str, batch_size: int = DEFAULT_FETCH_SIZE, params: list | None = None
+    ) -> tuple[list[tuple[str, str]] | None, Iterator[list]]:
+        """Execute a query and return its columns with a lazy iterator over row batches.
+
+        Args:
+            query (str): The SQL query to execute.
+            batch_size (int): Number of rows fetched per round trip.
+            params (list | None): Values bound to the ``?`` placeholders of the query, in order.
+
+        Returns:
+            tuple: ``(name, type)`` pairs of the result columns, or None if the statement has
+            no result set, and an iterator yielding lists of rows until the result set is
+            exhausted. The pooled connection is held until the iterator is exhausted or closed.
+        """
+        batches = self._run_query(query, batch_size, params)
+        columns = next(batches)
+        if METADATA_CHANGE_PATTERN.match(query):
+            self._invalidate_for_statement(query)
+        if columns is None:
+            batches.close()
+        return columns, batches
+
+    def _execute_batches(
+        self, query: str, batch_size: int, params: list | None = None
+    ) -> tuple[list[str] | None, Iterator[list]]:
+        """Execute a query and return its column names with a lazy iterator over row batches."""
+        columns, batches = self.open_result(query, batch_size, params)
+        return ([name for name, _ in columns] if columns is not None else None), batches
+
+    def _run_query(self, query: str, batch_size: int, params: list | None = None) -> Iterator:
+        """Execute a query on a pooled connection, yielding its columns first and then row batches.
+
+        With ``params`` the query is sent as a prepared statement, ``EXECUTE IMMEDIATE ... USING``
+        on coordinators that support it and ``PREPARE``/``EXECUTE`` on older ones.
+
+        The query first waits for a slot of the admission controller, which it holds until the
+        generator finishes and then feeds the query's queue and elapsed time back to. The
+        coordinator is chosen by the router, honoring the routing key of the current
+        context. If the generator is closed before the result set is exhausted, or the active
+        cancel scope is cancelled, the query is cancelled on the coordinator as well.
+        """
+        scope = current_cancel_scope.get()
+        with self.admission.slot(scope.raise_if_cancelled if scope is not None else None) as ticket:
+            address, pool = self.router.pool()
+            with pool.connection() as conn:
+                cur: trino.dbapi.Cursor = conn.cursor()
+                if scope is not None:
+                    scope.register(cur)
+                exhausted = False
+                error_name = None
+                try:
+                    try:
+                        cur.execute(query, params)
+                    except requests.exceptions.ConnectionError as e:
+                        self.router.mark_unhealthy(address, e)
+                        raise
+                    if not cur.description:
+                        exhausted = True
+                        yield None
+                        return
+                    yield [(col[0], col[1]) for col in cur.description]
+                    while True:
+                        if scope is not None:
+                            scope.raise_if_cancelled()
+                        rows = cur.fetchmany(batch_size)
+                        if not rows:
+                            exhausted = True
+                            return
+                        yield rows
+                except trino.exceptions.TrinoQueryError as e:
+                    error_name = e.error_name
+                    raise
+                finally:
+                    if scope is not None:
+                        scope.unregister(cur)
+                    if not exhausted:
+                        self._cancel_cursor(cur)
+                    self.query_stats.record(cur.stats, {"agent": self.config.agent_name, **query_tags.get()})
+                    ticket.record(cur.stats, error_name)
+
+    @staticmethod
+    def _cancel_cursor(cur: trino.dbapi.Cursor) -> None:
+        """Cancel the query of a cursor, ignoring cursors that never started or already finished."""
+        try:
+            cur.cancel()
+        except trino.exceptions.Error:
+            pass
+
+    def _invalidate_for_statement(self, query: str) -> None:
+        """Drop cached metadata affected by a DDL or data-changing statement."""
+        match = METADATA_TARGET_PATTERN.search(query)
+        if not match:
+            self.metadata_cache.invalidate()
+            return
+        kind = match.group(1).upper()
+        parts = [part.strip('"') for part in match.group(2).split(".")]
+        if kind == "SCHEMA":
+            catalog, schema = ([self.config.catalog, *parts] if len(parts) < 2 else parts)[-2:]
+            self.invalidate_metadata(catalog, schema)
+            return
+        parts = [self.config.catalog, self.config.schema][: max(0, 3 - len(parts))] + parts
+        self.invalidate_metadata(*parts[-3:])
+
+    def invalidate_metadata(
+        self,
+        catalog: str | None = None,
+        schema: str | None = None,
+        table: str | None = None,
+    ) -> int:
+        """Drop cached metadata for an object and the listings that contain it.
+
+        Called automatically after DDL run through this client; call it explicitly after
+        changes made elsewhere. Without arguments the whole cache is cleared.
+
+        Args:
+            catalog: The catalog name.
+            schema: The schema name.
+            table: The table or view name.
+
+        Returns:
+            int: Number of cache entries removed.
+        """
+        return self.metadata_cache.invalidate(catalog, schema, table)
+
+    def metadata_cache_stats(self) -> str:
+        """Report hit/miss counters of the metadata cache.
+
+        Returns:
+            str: JSON-formatted cache counters.
+        """
+        return json.dumps(self.metadata_cache.stats())
 
-    def get_query_history(self, limit: int) -> str:
+    def get_query_history(
+        self,
+        limit: int | None,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+        user: str | None = None,
+        source: str | None = None,
+        state: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        watermark: str | None = None,
+        tail: bool = False,
+    ) -> str:
         """Retrieve the history of executed queries.
 
+        Filters are applied in the ``WHERE`` clause, so the coordinator only returns the
+        matching queries. Queries are returned oldest first; with a limit and no watermark,
+        the most recent ``limit`` queries are returned.
+
+        To tail the history, call with ``tail=True`` and pass the returned watermark to the
+        next call, which then only returns queries created after the last one seen, oldest
+        first and at most ``limit`` of them.
+
         Args:
             limit (Optional[int]): Maximum number of queries to return. If None, returns all queries.
+            output_format (str): Result encoding, one of ``OUTPUT_FORMATS``.
+            columns (list[str] | None): Columns of ``system.runtime.queries`` to return; defaults to all.
+            user (str | None): Only return queries of this user.
+            source (str | None): Only return queries from this client source.
+            state (str | None): Only return queries in this state, e.g. ``RUNNING`` or ``FAILED``.
+            since (str | None): Only return queries created at or after this ISO 8601 timestamp.
+            until (str | None): Only return queries created before this ISO 8601 timestamp.
+            watermark (str | None): Watermark returned by a previous call; implies ``tail``.
+            tail (bool): Wrap the result with the watermark to pass to the next call.
 
         Returns:
-            str: JSON-formatted string containing query history.
+            str: Query history in the requested encoding. When tailing, a JSON object with the
+            ``watermark``, the ``count`` of queries and the ``queries`` themselves; for the csv,
+            tsv and arrow formats ``queries`` is the encoded result as a string.
+
+        Raises:
+            OutputFormatError: If the format is not supported or a requested column is unknown.
+            TrinoError: If the watermark is malformed.
         """
-        query = "SELECT * FROM system.runtime.queries"
+        check_output_format(output_format)
+        tail = tail or watermark is not None
+        conditions = []
+        params = []
+        for column, value in (("user", user), ("source", source), ("state", state)):
+            if value is not None:
+                conditions.append(f"{self._quote_identifier(column)} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created >= from_iso8601_timestamp(?)")
+            params.append(since)
+        if until is not None:
+            conditions.append("created < from_iso8601_timestamp(?)")
+            params.append(until)
+        if watermark:
+            created, separator, query_id = watermark.rpartition("|")
+            if not separator:
+                msg = f"Invalid query history watermark: {watermark}"
+                raise TrinoError(msg)
+            # Several queries can share a creation time; the query ID breaks the tie.
+            conditions.append(
+                "(created > from_iso8601_timestamp(?) OR (created = from_iso8601_timestamp(?) AND query_id > ?))"
+            )
+            params.extend([created, created, query_id])
+
+        # The watermark needs the creation time and ID of the last query even if they are not projected.
+        selected = list(dict.fromkeys([*columns, "created", "query_id"])) if columns and tail else columns
+        query = f"SELECT {self._select_list(selected)} FROM system.runtime.queries"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        newest_first = limit is not None and not watermark
+        order = "DESC" if newest_first else "ASC"
+        query += f" ORDER BY created {order}, query_id {order}"
         if limit is not None:
-            query += f" LIMIT {limit}"
-        return self.execute_query(query)
+            query += f" LIMIT {int(limit)}"
+
+        result_columns, batches = self.open_result(query, DEFAULT_FETCH_SIZE, params)
+        rows = [row for batch in batches for row in batch]
+        if newest_first:
+            rows.reverse()
+        result = encode_result(result_columns, [rows], output_format, columns)
+        if not tail:
+            return result
+        if rows:
+            names = [name for name, _ in result_columns]
+            last = rows[-1]
+            created = last[names.index("created")]
+            created = created.isoformat() if hasattr(created, "isoformat") else str(created)
+            watermark = f"{created}|{last[names.index('query_id')]}"
+        queries = result if output_format in ("json", "columns") else dumps(result)
+        return f'{{"watermark":{dumps(watermark)},"count":{len(rows)},"queries":{queries}}}'
 
     def list_catalogs(self) -> str:
         """List all available catalogs.
@@ -103,8 +850,10 @@ class TrinoClient:
         Returns:
             str: Newline-separated list of catalog names.
         """
-        catalogs = [row["Catalog"] for row in json.loads(self.execute_query("SHOW CATALOGS"))]
-        return "\n".join(catalogs)
+        return self.metadata_cache.get_or_load(
+            ("catalogs", None, None, None),
+            lambda: "\n".join(row["Catalog"] for row in json.loads(self.execute_query("SHOW CATALOGS"))),
+        )
 
     def list_schemas(self, catalog: str) -> str:
         """List all schemas in a catalog.
@@ -123,8 +872,10 @@ class TrinoClient:
             msg = "Catalog must be specified"
             raise CatalogSchemaError(msg)
         query = f"SHOW SCHEMAS FROM {catalog}"
-        schemas = [row["Schema"] for row in json.loads(self.execute_query(query))]
-        return "\n".join(schemas)
+        return self.metadata_cache.get_or_load(
+            ("schemas", catalog, None, None),
+            lambda: "\n".join(row["Schema"] for row in json.loads(self.execute_query(query))),
+        )
 
     def list_tables(self, catalog: str, schema: str) -> str:
         """List all tables in a schema.
@@ -145,16 +896,27 @@ class TrinoClient:
             msg = "Both catalog and schema must be specified"
             raise CatalogSchemaError(msg)
         query = f"SHOW TABLES FROM {catalog}.{schema}"
-        tables = [row["Table"] for row in json.loads(self.execute_query(query))]
-        return "\n".join(tables)
+        return self.metadata_cache.get_or_load(
+            ("tables", catalog, schema, None),
+            lambda: "\n".join(row["Table"] for row in json.loads(self.execute_query(query))),
+        )
 
-    def describe_table(self, catalog: str, schema: str, table: str) -> str:
+    def describe_table(
+        self,
+        catalog: str,
+        schema: str,
+        table: str,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
         """Describe the structure of a table.
 
         Args:
             catalog (str): The catalog name. If None, uses configured default.
             schema (str): The schema name. If None, uses configured default.
             table (str): The name of the table.
+            output_format (str): Result encoding, one of ``OUTPUT_FORMATS``.
+            columns (list[str] | None): Columns of the description to return; defaults to all.
 
         Returns:
             str: JSON-formatted string containing table description.
@@ -167,7 +929,90 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         query = f"DESCRIBE {catalog}.{schema}.{table}"
-        return self.execute_query(query)
+        return self.metadata_cache.get_or_load(
+            ("describe", catalog, schema, table, output_format, tuple(columns or ())),
+            lambda: self.execute_query(query, output_format=output_format, columns=columns),
+        )
+
+    def describe_tables(
+        self,
+        catalog: str,
+        schema: str | None = None,
+        tables: list[str] | None = None,
+        schema_pattern: str | None = None,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
+        """Describe the columns of several tables with one ``information_schema.columns`` query.
+
+        Args:
+            catalog (str): The catalog name. If None, uses configured default.
+            schema (str | None): Schema of the unqualified names in ``tables``. If None, uses
+                configured default.
+            tables (list[str] | None): Names of the tables, optionally qualified as ``schema.table``.
+            schema_pattern (str | None): SQL LIKE pattern; describes every table of the matching
+                schemas, or restricts ``tables`` to them.
+            output_format (str): Result encoding, one of ``OUTPUT_FORMATS``.
+            columns (list[str] | None): Columns of the description to return; defaults to all.
+
+        Returns:
+            str: One row per table column with ``table_schema``, ``table_name``, ``column_name``,
+            ``data_type`` and ``is_nullable``, ordered by table and column position.
+
+        Raises:
+            CatalogSchemaError: If the catalog, or the schema of an unqualified table, is not
+                specified and not configured.
+            TrinoError: If neither tables nor a schema pattern is given.
+        """
+        catalog = catalog or self.config.catalog
+        schema = schema or self.config.schema
+        if not catalog:
+            raise CatalogSchemaError
+        if not tables and not schema_pattern:
+            msg = "Either tables or a schema pattern must be specified"
+            raise TrinoError(msg)
+
+        names_by_schema: dict[str, list[str]] = {}
+        for name in tables or []:
+            table_schema, _, table = name.rpartition(".")
+            table_schema = table_schema or schema
+            if not table_schema:
+                raise CatalogSchemaError
+            names_by_schema.setdefault(table_schema.strip('"'), []).append(table.strip('"'))
+
+        conditions = []
+        params = []
+        if names_by_schema:
+            selections = []
+            for table_schema, names in sorted(names_by_schema.items()):
+                selections.append(f"(table_schema = ? AND table_name IN ({', '.join('?' for _ in names)}))")
+                params.extend([table_schema, *names])
+            conditions.append("(" + " OR ".join(selections) + ")")
+        if schema_pattern:
+            conditions.append("table_schema LIKE ?")
+            params.append(schema_pattern)
+        query = (
+            "SELECT table_schema, table_name, column_name, data_type, is_nullable "
+            f"FROM {self._quote_identifier(catalog)}.information_schema.columns "
+            f"WHERE {' AND '.join(conditions)} ORDER BY table_schema, table_name, ordinal_position"
+        )
+        key = (
+            "describe_tables",
+            catalog,
+            None,
+            None,
+            tuple((table_schema, tuple(names)) for table_schema, names in sorted(names_by_schema.items())),
+            schema_pattern,
+            output_format,
+            tuple(columns or ()),
+        )
+        # information_schema is never served from the result cache; skipping it saves the EXPLAIN round trip.
+        return self.metadata_cache.get_or_load(
+            key,
+            lambda: self.execute_query(
+                query, use_cache=False, output_format=output_format, columns=columns, params=params
+            ),
+        )
 
     def show_create_table(self, catalog: str, schema: str, table: str) -> str:
         """Show the CREATE TABLE statement for a table.
@@ -188,8 +1033,9 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         query = f"SHOW CREATE TABLE {catalog}.{schema}.{table}"
-        result = json.loads(self.execute_query(query))
-        return result[0]["Create Table"] if result else ""
+        return self.metadata_cache.get_or_load(
+            ("create_table", catalog, schema, table), lambda: self._first_value(query, "Create Table")
+        )
 
     def show_create_view(
         self,
@@ -215,16 +1061,26 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         query = f"SHOW CREATE VIEW {catalog}.{schema}.{view}"
-        result = json.loads(self.execute_query(query))
-        return result[0]["Create View"] if result else ""
+        return self.metadata_cache.get_or_load(
+            ("create_view", catalog, schema, view), lambda: self._first_value(query, "Create View")
+        )
 
-    def show_stats(self, catalog: str, schema: str, table: str) -> str:
+    def show_stats(
+        self,
+        catalog: str,
+        schema: str,
+        table: str,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
         """Show statistics for a table.
 
         Args:
             catalog (str): The catalog name. If None, uses configured default.
             schema (str): The schema name. If None, uses configured default.
             table (str): The name of the table.
+            output_format (str): Result encoding, one of ``OUTPUT_FORMATS``.
+            columns (list[str] | None): Columns of the statistics to return; defaults to all.
 
         Returns:
             str: JSON-formatted string containing table statistics.
@@ -237,15 +1093,25 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         query = f"SHOW STATS FOR {catalog}.{schema}.{table}"
-        return self.execute_query(query)
+        return self.metadata_cache.get_or_load(
+            ("stats", catalog, schema, table, output_format, tuple(columns or ())),
+            lambda: self.execute_query(query, output_format=output_format, columns=columns),
+        )
+
+    def _first_value(self, query: str, column: str) -> str:
+        """Return one column of the first result row, or an empty string if there is none."""
+        result = json.loads(self.execute_query(query))
+        return result[0][column] if result else ""
 
-    def optimize(self, catalog: str, schema: str, table: str) -> str:
+    def optimize(self, catalog: str, schema: str, table: str, file_size_threshold: str | None = None) -> str:
         """Optimize an Iceberg table by compacting small files.
 
         Args:
             catalog (str): The catalog name. If None, uses configured default.
             schema (str): The schema name. If None, uses configured default.
             table (str): The name of the table to optimize.
+            file_size_threshold (str | None): Only files smaller than this size (e.g. "100MB")
+                are rewritten; defaults to the connector default.
 
         Returns:
             str: Success message indicating the table was optimized.
@@ -258,6 +1124,8 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         query = f"ALTER TABLE {catalog}.{schema}.{table} EXECUTE optimize"
+        if file_size_threshold:
+            query += f"(file_size_threshold => {self._quote_literal(file_size_threshold)})"
         self.execute_query(query)
         return f"Table {catalog}.{schema}.{table} optimized successfully"
 
@@ -317,44 +1185,159 @@ class TrinoClient:
             raise CatalogSchemaError(msg)
         query = (
             f"ALTER TABLE {catalog}.{schema}.{table} "
-            f"EXECUTE expire_snapshots(retention_threshold => '{retention_threshold}')"
+            f"EXECUTE expire_snapshots(retention_threshold => {self._quote_literal(retention_threshold)})"
         )
         self.execute_query(query)
         return f"Snapshots older than {retention_threshold} expired for table {catalog}.{schema}.{table}"
 
-    def show_catalog_tree(self) -> str:
+    def show_catalog_tree(
+        self,
+        depth: int = 3,
+        catalog_pattern: str | None = None,
+        schema_pattern: str | None = None,
+        table_pattern: str | None = None,
+    ) -> str:
         """Show a hierarchical tree view of all catalogs, schemas, and tables.
 
+        Each catalog is read with a single ``information_schema`` query, and catalogs are
+        read concurrently with at most ``config.catalog_tree_workers`` queries in flight.
+        The rendered tree is kept in the metadata cache.
+
+        Args:
+            depth: 1 lists catalogs only, 2 adds schemas, 3 adds tables.
+            catalog_pattern: Optional SQL LIKE pattern restricting catalog names.
+            schema_pattern: Optional SQL LIKE pattern restricting schema names.
+            table_pattern: Optional SQL LIKE pattern restricting table names.
+
         Returns:
             A formatted string showing the catalog > schema > table hierarchy.
         """
-        tree = []
-        catalogs = [row["Catalog"] for row in json.loads(self.execute_query("SHOW CATALOGS"))]
-        for catalog in sorted(catalogs):
-            tree.append(f"{catalog}")
-            try:
-                schemas = [row["Schema"] for row in json.loads(self.execute_query(f"SHOW SCHEMAS FROM {catalog}"))]
-                for schema in sorted(schemas):
-                    tree.append(f"{schema}")
-                    try:
-                        tables = [
-                            row["Table"]
-                            for row in json.loads(self.execute_query(f"SHOW TABLES FROM {catalog}.{schema}"))
-                        ]
-                        tree.extend(f" {table}" for table in sorted(tables))
-                    except (trino.dbapi.TrinoQueryError, KeyError):
-                        tree.append(" Unable to list tables")
-            except (trino.dbapi.TrinoQueryError, KeyError):
-                tree.append("Unable to list schemas")
+        key = ("catalog_tree", None, None, None, depth, catalog_pattern, schema_pattern, table_pattern)
+        return self.metadata_cache.get_or_load(
+            key, lambda: self._build_catalog_tree(depth, catalog_pattern, schema_pattern, table_pattern)
+        )
+
+    def _build_catalog_tree(
+        self,
+        depth: int,
+        catalog_pattern: str | None,
+        schema_pattern: str | None,
+        table_pattern: str | None,
+    ) -> str:
+        """Render the catalog tree, querying catalogs concurrently."""
+        query = "SELECT catalog_name FROM system.metadata.catalogs"
+        if catalog_pattern:
+            query += " WHERE catalog_name LIKE ?"
+        catalogs = sorted(row[0] for row in self._fetch_rows(query, [catalog_pattern] if catalog_pattern else None))
+        if depth <= 1:
+            return "\n".join(catalogs) if catalogs else "No catalogs found"
+
+        workers = max(1, min(self.config.catalog_tree_workers, self.config.pool_size, len(catalogs)))
+        # Each worker call runs in a copy of this context, so the cancel scope and query tags apply to it.
+        contexts = [copy_context() for _ in catalogs]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            branches = executor.map(
+                lambda context, catalog: context.run(
+                    self._catalog_branch, catalog, depth, schema_pattern, table_pattern
+                ),
+                contexts,
+                catalogs,
+            )
+            tree = [line for branch in branches for line in branch]
         return "\n".join(tree) if tree else "No catalogs found"
 
-    def show_table_properties(self, table: str, catalog: str, schema: str) -> str:
+    def _catalog_branch(
+        self,
+        catalog: str,
+        depth: int,
+        schema_pattern: str | None,
+        table_pattern: str | None,
+    ) -> list[str]:
+        """Render one catalog of the tree from a single information_schema query."""
+        conditions = []
+        params = []
+        if schema_pattern:
+            conditions.append("s.schema_name LIKE ?")
+            params.append(schema_pattern)
+        if depth <= 2:
+            query = f"SELECT s.schema_name, NULL FROM {catalog}.information_schema.schemata s"
+        else:
+            query = (
+                f"SELECT s.schema_name, t.table_name FROM {catalog}.information_schema.schemata s "
+                f"LEFT JOIN {catalog}.information_schema.tables t ON t.table_schema = s.schema_name"
+            )
+            if table_pattern:
+                conditions.append("t.table_name LIKE ?")
+                params.append(table_pattern)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        try:
+            rows = self._fetch_rows(query, params)
+        except trino.exceptions.TrinoQueryError:
+            return [catalog, "Unable to list schemas"]
+        tables_by_schema: dict[str, list[str]] = {}
+        for schema, table in rows:
+            tables = tables_by_schema.setdefault(schema, [])
+            if table is not None:
+                tables.append(table)
+        branch = [catalog]
+        for schema in sorted(tables_by_schema):
+            branch.append(schema)
+            branch.extend(f" {table}" for table in sorted(tables_by_schema[schema]))
+        return branch
+
+    def _fetch_rows(self, query: str, params: list | None = None) -> list:
+        """Execute a query and return its rows as tuples, without JSON encoding."""
+        columns, batches = self._execute_batches(query, DEFAULT_FETCH_SIZE, params)
+        return [tuple(row) for rows in batches for row in rows]
+
+    @staticmethod
+    def _quote_literal(value: str) -> str:
+        """Quote a value as a SQL string literal."""
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+
+    @staticmethod
+    def _quote_identifier(name: str) -> str:
+        """Quote a name as a SQL identifier."""
+        escaped = name.replace('"', '""')
+        return f'"{escaped}"'
+
+    @classmethod
+    def _select_list(cls, columns: list[str] | None) -> str:
+        """Build the select list for a projection, ``*`` if no columns are given."""
+        return ", ".join(cls._quote_identifier(column) for column in columns) if columns else "*"
+
+    def _select_metadata_table(
+        self,
+        catalog: str,
+        schema: str,
+        table: str,
+        output_format: str,
+        columns: list[str] | None,
+    ) -> str:
+        """Read an Iceberg metadata table such as ``orders$files``.
+
+        The projection is pushed into the query, so unrequested columns, such as the
+        per-column metric maps of ``$files``, are never transferred from the coordinator.
+        """
+        table_identifier = ".".join(self._quote_identifier(part) for part in (catalog, schema, table))
+        return self.execute_query(
+            f"SELECT {self._select_list(columns)} FROM {table_identifier}", output_format=output_format
+        )
+
+    def show_table_properties(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table properties.
 
         Args:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table properties
@@ -363,11 +1346,11 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        query = 'SELECT * FROM "{}$properties"'
-        table_identifier = f"{catalog}.{schema}.{table}"
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$properties", output_format, columns)
 
-    def show_table_history(self, table: str, catalog: str, schema: str) -> str:
+    def show_table_history(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table history/changelog.
 
         The history contains:
@@ -380,6 +1363,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table history
@@ -388,11 +1373,11 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_identifier = f"{catalog}.{schema}.{table}"
-        query = 'SELECT * FROM "{}$history"'
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$history", output_format, columns)
 
-    def show_metadata_log_entries(self, table: str, catalog: str, schema: str) -> str:
+    def show_metadata_log_entries(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table metadata log entries.
 
         The metadata log contains:
@@ -406,6 +1391,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing metadata log entries
@@ -414,11 +1401,11 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        query = 'SELECT * FROM "{}$metadata_log_entries"'
-        table_identifier = f"{catalog}.{schema}.{table}"
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$metadata_log_entries", output_format, columns)
 
-    def show_snapshots(self, table: str, catalog: str, schema: str) -> str:
+    def show_snapshots(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table snapshots.
 
         The snapshots table contains:
@@ -433,6 +1420,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table snapshots
@@ -441,11 +1430,17 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_identifier = f"{catalog}.{schema}.{table}$snapshots"
-        query = 'SELECT * FROM "{}"'
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$snapshots", output_format, columns)
 
-    def show_manifests(self, table: str, catalog: str, schema: str, all_snapshots: bool = False) -> str:
+    def show_manifests(
+        self,
+        table: str,
+        catalog: str,
+        schema: str,
+        all_snapshots: bool = False,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
         """Show Iceberg table manifests for current or all snapshots.
 
         The manifests table contains:
@@ -466,6 +1461,8 @@ class TrinoClient:
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
             all_snapshots: If True, show manifests from all snapshots
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table manifests
@@ -475,11 +1472,11 @@ class TrinoClient:
         if not catalog or not schema:
             raise CatalogSchemaError
         table_type = "all_manifests" if all_snapshots else "manifests"
-        query = 'SELECT * FROM "{}${}"'
-        table_identifier = f"{catalog}.{schema}.{table}"
-        return self.execute_query(query.format(table_identifier, table_type))
+        return self._select_metadata_table(catalog, schema, f"{table}${table_type}", output_format, columns)
 
-    def show_partitions(self, table: str, catalog: str, schema: str) -> str:
+    def show_partitions(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table partitions.
 
         The partitions table contains:
@@ -493,6 +1490,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table partitions
@@ -501,11 +1500,11 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_identifier = f"{catalog}.{schema}.{table}$partitions"
-        query = 'SELECT * FROM "{}"'
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$partitions", output_format, columns)
 
-    def show_files(self, table: str, catalog: str, schema: str) -> str:
+    def show_files(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table data files in current snapshot.
 
         The files table contains:
@@ -528,6 +1527,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table files info
@@ -536,11 +1537,17 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_identifier = f"{catalog}.{schema}.{table}$files"
-        query = 'SELECT * FROM "{}"'
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$files", output_format, columns)
 
-    def show_entries(self, table: str, catalog: str, schema: str, all_snapshots: bool = False) -> str:
+    def show_entries(
+        self,
+        table: str,
+        catalog: str,
+        schema: str,
+        all_snapshots: bool = False,
+        output_format: str = "json",
+        columns: list[str] | None = None,
+    ) -> str:
         """Show Iceberg table manifest entries for current or all snapshots.
 
         The entries table contains:
@@ -556,6 +1563,8 @@ class TrinoClient:
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
             all_snapshots: If True, show entries from all snapshots
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing manifest entries
@@ -564,11 +1573,12 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_name = f"{catalog}.{schema}.{table}${'all_' if all_snapshots else ''}entries"
-        query = 'SELECT * FROM "{}"'
-        return self.execute_query(query.format(table_name))
+        table_type = "all_entries" if all_snapshots else "entries"
+        return self._select_metadata_table(catalog, schema, f"{table}${table_type}", output_format, columns)
 
-    def show_refs(self, table: str, catalog: str, schema: str) -> str:
+    def show_refs(
+        self, table: str, catalog: str, schema: str, output_format: str = "json", columns: list[str] | None = None
+    ) -> str:
         """Show Iceberg table references (branches and tags).
 
         The refs table contains:
@@ -583,6 +1593,8 @@ class TrinoClient:
             table: The name of the table
             catalog: Optional catalog name (defaults to configured catalog)
             schema: Optional schema name (defaults to configured schema)
+            output_format: Result encoding, one of OUTPUT_FORMATS (json, columns, csv, tsv, arrow)
+            columns: Optional list of columns to return, defaults to all columns
 
         Returns:
             str: JSON-formatted string containing table references
@@ -591,6 +1603,4 @@ class TrinoClient:
         schema = schema or self.config.schema
         if not catalog or not schema:
             raise CatalogSchemaError
-        table_identifier = f"{catalog}.{schema}.{table}$refs"
-        query = 'SELECT * FROM "{}"'
-        return self.execute_query(query.format(table_identifier))
+        return self._select_metadata_table(catalog, schema, f"{table}$refs", output_format, columns)